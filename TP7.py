@@ -1,12 +1,19 @@
+import collections
+import math
+
 class Fraction:
     """Class representing a fraction and operations on it
 
     Author : V. Van den Schrieck
     Date : October 2021
     This class allows fraction manipulations through several operations.
+    Fractions are immutable and hashable : they are always stored in their reduced form, with a positive denominator.
+    The constructor shares the instances of small fractions (intern table, see configure_intern).
     """
 
-    def __init__(self, num=0, den=1):
+    __slots__ = ("_numerator", "_denominator")
+
+    def __new__(cls, num=0, den=1):
         """This builds a fraction based on some numerator and denominator.
 
         PRE : num is an integer, den is an integer except 0
@@ -14,17 +21,27 @@ class Fraction:
         """
         if not isinstance(num, int) or not isinstance(den, int):
             raise ValueError("Numerator and denominator must be integers")
-        if den == 0:
-            raise ValueError("Denominator cannot be zero")
-        
-        def pgcd(a, b):
-            while b:
-                a, b = b, a % b
-            return a
-        
-        common_divisor = pgcd(num, den)
-        self._numerator = num // common_divisor
-        self._denominator = den // common_divisor
+
+        # Small fractions are shared through the intern table (see configure_intern)
+        limit = _intern_limit
+        if -limit <= num <= limit and -limit <= den <= limit and den and cls is Fraction:
+            key = (num, den)
+            fraction = _intern_table.get(key)
+            if fraction is not None:
+                _intern_table.move_to_end(key)
+                _intern_counts[0] += 1
+                return fraction
+            return _intern(key)
+
+        if den <= 0:
+            if not den:
+                raise ValueError("Denominator cannot be zero")
+            num, den = -num, -den
+        common_divisor = _gcd(num, den)
+        fraction = _new_object(cls)
+        _set_numerator(fraction, num // common_divisor)
+        _set_denominator(fraction, den // common_divisor)
+        return fraction
 
     @property
     def numerator(self):
@@ -33,6 +50,21 @@ class Fraction:
     def denominator(self):
         return self._denominator
 
+    def __setattr__(self, name, value):
+        raise AttributeError("Fraction objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Fraction objects are immutable")
+
+    def __reduce__(self):
+        return (type(self), (self._numerator, self._denominator))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
 # ------------------ Textual representations ------------------
 
     def __str__(self) :
@@ -80,22 +112,22 @@ class Fraction:
         if not isinstance(self, Fraction) or not isinstance(other, Fraction):
             raise TypeError("It must be fractions")
 
-        num_part1 = self.numerator
-        num_part2 = other.numerator
-        den_part1 = self.denominator
-        den_part2 = other.denominator
-
-        # If the denominators are the same, add the numerators
-        if den_part1 == den_part2:
-            new_num = num_part1 + num_part2
-            new_den = den_part1
-        else:
-            # Find a common denominator and adjust numerators
-            new_den = den_part1 * den_part2
-            new_num = (num_part1 * den_part2) + (num_part2 * den_part1)
+        num_part1 = self._numerator
+        num_part2 = other._numerator
+        den_part1 = self._denominator
+        den_part2 = other._denominator
 
-        # Create and return a new Fraction object, reduced to simplest form
-        return Fraction(new_num, new_den)
+        # Henrici : the common denominator is lcm(den_part1, den_part2) instead of their product,
+        # and only the gcd of the numerator with g is left to divide out
+        g = math.gcd(den_part1, den_part2)
+        if g == 1:
+            return _make(num_part1 * den_part2 + num_part2 * den_part1, den_part1 * den_part2)
+        cofactor = den_part1 // g
+        new_num = num_part1 * (den_part2 // g) + num_part2 * cofactor
+        g2 = math.gcd(new_num, g)
+        if g2 == 1:
+            return _make(new_num, cofactor * den_part2)
+        return _make(new_num // g2, cofactor * (den_part2 // g2))
 
 
     def __sub__(self, other):
@@ -107,22 +139,21 @@ class Fraction:
         if not isinstance(self, Fraction) or not isinstance(other, Fraction):
             raise TypeError("It must be fractions")
 
-        num_part1 = self.numerator
-        num_part2 = other.numerator
-        den_part1 = self.denominator
-        den_part2 = other.denominator
-
-        # If the denominators are the same, substract the numerators
-        if den_part1 == den_part2:
-            new_num = num_part1 - num_part2
-            new_den = den_part1
-        else:
-            # Find a common denominator and adjust numerators
-            new_den = den_part1 * den_part2
-            new_num = (num_part1 * den_part2) - (num_part2 * den_part1)
+        num_part1 = self._numerator
+        num_part2 = other._numerator
+        den_part1 = self._denominator
+        den_part2 = other._denominator
 
-        # Create and return a new Fraction object, reduced to simplest form
-        return Fraction(new_num, new_den)
+        # Same reduction as __add__
+        g = math.gcd(den_part1, den_part2)
+        if g == 1:
+            return _make(num_part1 * den_part2 - num_part2 * den_part1, den_part1 * den_part2)
+        cofactor = den_part1 // g
+        new_num = num_part1 * (den_part2 // g) - num_part2 * cofactor
+        g2 = math.gcd(new_num, g)
+        if g2 == 1:
+            return _make(new_num, cofactor * den_part2)
+        return _make(new_num // g2, cofactor * (den_part2 // g2))
 
 
     def __mul__(self, other):
@@ -134,12 +165,22 @@ class Fraction:
         if not isinstance(self, Fraction) or not isinstance(other, Fraction):
             raise TypeError("It must be fractions")
 
-        num_part1 = self.numerator
-        num_part2 = other.numerator
-        den_part1 = self.denominator
-        den_part2 = other.denominator
+        num_part1 = self._numerator
+        num_part2 = other._numerator
+        den_part1 = self._denominator
+        den_part2 = other._denominator
+
+        # Cross-cancel before multiplying : both factors are reduced, so the product is too
+        g1 = math.gcd(num_part1, den_part2)
+        if g1 != 1:
+            num_part1 //= g1
+            den_part2 //= g1
+        g2 = math.gcd(num_part2, den_part1)
+        if g2 != 1:
+            num_part2 //= g2
+            den_part1 //= g2
 
-        return Fraction(num_part1*num_part2, den_part1*den_part2)
+        return _make(num_part1 * num_part2, den_part1 * den_part2)
 
 
     def __truediv__(self, other):
@@ -150,8 +191,14 @@ class Fraction:
         """
         if not isinstance(self, Fraction) or not isinstance(other, Fraction):
             raise TypeError("It must be fractions")
+        if other._numerator == 0:
+            raise ValueError("Denominator cannot be zero")
 
-        reversed_other = Fraction(other.denominator, other.numerator)
+        # The inverse of a reduced fraction is reduced : only its sign has to move to the numerator
+        if other._numerator < 0:
+            reversed_other = _make(-other._denominator, -other._numerator)
+        else:
+            reversed_other = _make(other._denominator, other._numerator)
 
         return self.__mul__(reversed_other)
 
@@ -159,29 +206,54 @@ class Fraction:
     def __pow__(self, other):
         """Overloading of the ** operator for fractions
 
-        PRE : it must be be 2 fractions
-        POST : the result is the first fraction exponent the second one
+        Integer exponents are computed exactly (a reduced fraction raised to a power stays reduced).
+        A fraction p/q as exponent is exact when both parts of the fraction are perfect q-th powers ;
+        otherwise the result is the float approximation (ValueError if it does not fit in a float).
+
+        PRE : other is an integer or a fraction ; a null fraction cannot have a negative exponent,
+              a negative fraction cannot have an exponent with an even denominator
+        POST : the result is the first fraction exponent the second one (a Fraction when it is rational)
         """
         if not isinstance(self, Fraction):
             raise TypeError("It must be fractions")
+        if isinstance(other, int):
+            return self._int_pow(other)
+        if not isinstance(other, Fraction):
+            raise TypeError("The exponent must be an integer or a fraction")
+
+        num_part, den_part = self._numerator, self._denominator
+        power, root = other._numerator, other._denominator
+        if root == 1:
+            return self._int_pow(power)
+        if num_part < 0 and root % 2 == 0:
+            raise ValueError("Even root of a negative fraction")
+
+        num_root = _iroot(abs(num_part), root)
+        den_root = _iroot(den_part, root)
+        if num_root ** root != abs(num_part) or den_root ** root != den_part:
+            # Irrational result : float approximation
+            value = _float_pow(abs(num_part), den_part, power / root)
+            return -value if num_part < 0 and power % 2 else value
+        if num_part < 0:
+            num_root = -num_root
+        return _make(num_root, den_root)._int_pow(power)
+
+    def _int_pow(self, exponent):
+        """Exact power with an integer exponent
+
+        PRE : exponent is an integer, it is not negative if the fraction is null
+        POST : returns the reduced fraction self ** exponent
+        """
+        # The parts are coprime, so are their powers : no reduction is needed
+        if exponent >= 0:
+            return _make(self._numerator ** exponent, self._denominator ** exponent)
+        if self._numerator == 0:
+            raise ValueError("Denominator cannot be zero")
+        if self._numerator < 0:
+            return _make((-self._denominator) ** -exponent, (-self._numerator) ** -exponent)
+        return _make(self._denominator ** -exponent, self._numerator ** -exponent)
 
-        num_part1 = self.numerator
-        num_part2 = other.numerator
-        den_part1 = self.denominator
-        den_part2 = other.denominator
-
-        base = Fraction(num_part1, den_part1)
-        exponent = Fraction(num_part2, den_part2)
-
-        inter_num = base.numerator ** exponent.numerator
-        inter_den = base.denominator ** exponent.numerator
-
-        num_root = round(inter_num ** (1 / exponent.denominator)) 
-        den_root = round(inter_den ** (1 / exponent.denominator))
 
-        return (num_root/den_root)
-    
-    
     def __eq__(self, other) : 
         """Overloading of the == operator for fractions
         
@@ -193,6 +265,14 @@ class Fraction:
 
         return (self.numerator == other.numerator and self.denominator == other.denominator)
         
+    def __hash__(self):
+        """Hash of the fraction, so that it can be used in sets and as a dictionary key
+
+        PRE : it must be a fraction
+        POST : equal fractions have the same hash
+        """
+        return hash((self._numerator, self._denominator))
+
     def __float__(self) :
         """Returns the decimal value of the fraction
 
@@ -276,7 +356,138 @@ class Fraction:
         diff2 = reduced_fraction2 - reduced_fraction1
 
         return diff1.is_unit() or diff2.is_unit()
-        
+
+
+# Trusted constructor used by the operators : the fraction is built without any check nor reduction
+_set_numerator = Fraction._numerator.__set__
+_set_denominator = Fraction._denominator.__set__
+_new_object = object.__new__
+_gcd = math.gcd
+
+
+def _make(num, den):
+    """Build a fraction which is already in its reduced form
+
+    PRE : num and den are coprime integers, den > 0
+    POST : returns the fraction num/den
+    """
+    fraction = _new_object(Fraction)
+    _set_numerator(fraction, num)
+    _set_denominator(fraction, den)
+    return fraction
+
+
+def _build(cls, num, den):
+    """Build the reduced form of num/den
+
+    PRE : num and den are integers, den is not 0
+    POST : returns a new instance of cls, reduced and with a positive denominator
+    """
+    if den < 0:
+        num, den = -num, -den
+
+    common_divisor = _gcd(num, den)
+    fraction = _new_object(cls)
+    _set_numerator(fraction, num // common_divisor)
+    _set_denominator(fraction, den // common_divisor)
+    return fraction
+
+
+# Intern table : (numerator, denominator) as given to the constructor, and in reduced form -> shared Fraction
+INTERN_LIMIT = 100  # Largest absolute value of an interned numerator or denominator (percentages)
+# Entries kept in the table (the least recently used ones are evicted) : one per pair allowed by INTERN_LIMIT,
+# so that the pairs under the limit are never evicted (the reduced pairs are among them)
+INTERN_SIZE = (2 * INTERN_LIMIT + 1) * 2 * INTERN_LIMIT
+
+_intern_table = collections.OrderedDict()
+_intern_limit = INTERN_LIMIT
+_intern_size = INTERN_SIZE
+_intern_counts = [0, 0]  # Hits, misses
+
+
+def _intern(key):
+    """Add a fraction to the intern table, after a miss of the constructor : the reduction is only computed once
+
+    PRE : key is a pair of integers (num, den), den is not 0, key is not in the table
+    POST : returns the reduced fraction num/den, which the constructor shares while it stays in the table
+    """
+    _intern_counts[1] += 1
+    fraction = _build(Fraction, *key)
+    reduced_key = (fraction._numerator, fraction._denominator)
+    if reduced_key != key:
+        # Another form of the same value may already be interned (ex : 2/4 after 1/2)
+        fraction = _intern_table.setdefault(reduced_key, fraction)
+    _intern_table[key] = fraction
+    while len(_intern_table) > _intern_size:
+        _intern_table.popitem(last=False)
+    return fraction
+
+
+def configure_intern(limit=INTERN_LIMIT, size=None):
+    """Configure the intern table of the constructor (and empty it)
+
+    PRE : limit and size are positive or null integers (0 for either of them disables the table),
+          size defaults to the number of pairs allowed by limit
+    POST : fractions whose numerator and denominator are at most limit in absolute value are shared,
+           the size least recently used entries are kept
+    """
+    global _intern_limit, _intern_size
+    if size is None:
+        size = (2 * limit + 1) * 2 * limit
+    _intern_limit = limit if size else 0
+    _intern_size = size
+    clear_intern()
+
+
+def clear_intern():
+    """Empty the intern table and reset its counters"""
+    _intern_table.clear()
+    _intern_counts[:] = [0, 0]
+
+
+def intern_info():
+    """Return the statistics of the intern table
+
+    PRE : /
+    POST : returns a dict with the hits, the misses, the number of entries, the limit and the size of the table
+    """
+    return {"hits": _intern_counts[0], "misses": _intern_counts[1], "entries": len(_intern_table),
+            "limit": _intern_limit, "size": _intern_size}
+
+
+def _float_pow(num, den, exponent):
+    """Float approximation of (num/den) ** exponent, also when num/den itself does not fit in a float
+
+    PRE : num and den are integers > 0, exponent is a float
+    POST : returns the approximation ; raises ValueError if it is too large for a float
+    """
+    try:
+        base = num / den
+        if base != 0.0:  # 0.0 : num/den is too small for a float
+            return base ** exponent
+    except OverflowError:
+        pass
+    try:
+        return math.exp((math.log(num) - math.log(den)) * exponent)
+    except OverflowError:
+        raise ValueError("The result is too large for a float approximation") from None
+
+
+def _iroot(value, k):
+    """Integer k-th root, by Newton's method on integers
+
+    PRE : value is a positive or null integer, k is an integer >= 1
+    POST : returns the largest integer r such that r ** k <= value
+    """
+    if value < 2 or k == 1:
+        return value
+    # Start above the root : the iterates then decrease to it
+    root = 1 << -(-value.bit_length() // k)
+    while True:
+        new_root = ((k - 1) * root + value // root ** (k - 1)) // k
+        if new_root >= root:
+            return root
+        root = new_root
 
 
 if __name__ == '__main__':
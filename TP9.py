@@ -1,14 +1,25 @@
+import collections
+import math
 import unittest
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 class Fraction:
     """Class representing a fraction and operations on it
 
     Author : V. Van den Schrieck
     Date : October 2021
     This class allows fraction manipulations through several operations.
+    Fractions are immutable and hashable : they are always stored in their reduced form, with a positive denominator.
+    The constructor shares the instances of small fractions (intern table, see configure_intern).
     """
 
-    def __init__(self, num=0, den=1):
+    __slots__ = ("_numerator", "_denominator")
+
+    def __new__(cls, num=0, den=1):
         """This builds a fraction based on some numerator and denominator.
 
         PRE : num is an integer, den is an integer except 0
@@ -16,17 +27,27 @@ class Fraction:
         """
         if not isinstance(num, int) or not isinstance(den, int):
             raise ValueError("Numerator and denominator must be integers")
-        if den == 0:
-            raise ValueError("Denominator cannot be zero")
-        
-        def pgcd(a, b):
-            while b:
-                a, b = b, a % b
-            return a
-        
-        common_divisor = pgcd(num, den)
-        self._numerator = num // common_divisor
-        self._denominator = den // common_divisor
+
+        # Small fractions are shared through the intern table (see configure_intern)
+        limit = _intern_limit
+        if -limit <= num <= limit and -limit <= den <= limit and den and cls is Fraction:
+            key = (num, den)
+            fraction = _intern_table.get(key)
+            if fraction is not None:
+                _intern_table.move_to_end(key)
+                _intern_counts[0] += 1
+                return fraction
+            return _intern(key)
+
+        if den <= 0:
+            if not den:
+                raise ValueError("Denominator cannot be zero")
+            num, den = -num, -den
+        common_divisor = _gcd(num, den)
+        fraction = _new_object(cls)
+        _set_numerator(fraction, num // common_divisor)
+        _set_denominator(fraction, den // common_divisor)
+        return fraction
 
     @property
     def numerator(self):
@@ -35,6 +56,21 @@ class Fraction:
     def denominator(self):
         return self._denominator
 
+    def __setattr__(self, name, value):
+        raise AttributeError("Fraction objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Fraction objects are immutable")
+
+    def __reduce__(self):
+        return (type(self), (self._numerator, self._denominator))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
 # ------------------ Textual representations ------------------
 
     def __str__(self) :
@@ -79,25 +115,27 @@ class Fraction:
          PRE : it must be 2 fractions
          POST : the result is the result of an addition between 2 fractions
          """
+        if isinstance(other, FractionArray):
+            return NotImplemented  # Elementwise operation of the array
         if not isinstance(self, Fraction) or not isinstance(other, Fraction):
             raise TypeError("It must be fractions")
 
-        num_part1 = self.numerator
-        num_part2 = other.numerator
-        den_part1 = self.denominator
-        den_part2 = other.denominator
-
-        # If the denominators are the same, add the numerators
-        if den_part1 == den_part2:
-            new_num = num_part1 + num_part2
-            new_den = den_part1
-        else:
-            # Find a common denominator and adjust numerators
-            new_den = den_part1 * den_part2
-            new_num = (num_part1 * den_part2) + (num_part2 * den_part1)
+        num_part1 = self._numerator
+        num_part2 = other._numerator
+        den_part1 = self._denominator
+        den_part2 = other._denominator
 
-        # Create and return a new Fraction object, reduced to simplest form
-        return Fraction(new_num, new_den)
+        # Henrici : the common denominator is lcm(den_part1, den_part2) instead of their product,
+        # and only the gcd of the numerator with g is left to divide out
+        g = math.gcd(den_part1, den_part2)
+        if g == 1:
+            return _make(num_part1 * den_part2 + num_part2 * den_part1, den_part1 * den_part2)
+        cofactor = den_part1 // g
+        new_num = num_part1 * (den_part2 // g) + num_part2 * cofactor
+        g2 = math.gcd(new_num, g)
+        if g2 == 1:
+            return _make(new_num, cofactor * den_part2)
+        return _make(new_num // g2, cofactor * (den_part2 // g2))
 
 
     def __sub__(self, other):
@@ -106,25 +144,26 @@ class Fraction:
         PRE : it must be 2 fractions
         POST : the result is the first fraction minus the second one
          """
+        if isinstance(other, FractionArray):
+            return NotImplemented  # Elementwise operation of the array
         if not isinstance(self, Fraction) or not isinstance(other, Fraction):
             raise TypeError("It must be fractions")
 
-        num_part1 = self.numerator
-        num_part2 = other.numerator
-        den_part1 = self.denominator
-        den_part2 = other.denominator
-
-        # If the denominators are the same, substract the numerators
-        if den_part1 == den_part2:
-            new_num = num_part1 - num_part2
-            new_den = den_part1
-        else:
-            # Find a common denominator and adjust numerators
-            new_den = den_part1 * den_part2
-            new_num = (num_part1 * den_part2) - (num_part2 * den_part1)
+        num_part1 = self._numerator
+        num_part2 = other._numerator
+        den_part1 = self._denominator
+        den_part2 = other._denominator
 
-        # Create and return a new Fraction object, reduced to simplest form
-        return Fraction(new_num, new_den)
+        # Same reduction as __add__
+        g = math.gcd(den_part1, den_part2)
+        if g == 1:
+            return _make(num_part1 * den_part2 - num_part2 * den_part1, den_part1 * den_part2)
+        cofactor = den_part1 // g
+        new_num = num_part1 * (den_part2 // g) - num_part2 * cofactor
+        g2 = math.gcd(new_num, g)
+        if g2 == 1:
+            return _make(new_num, cofactor * den_part2)
+        return _make(new_num // g2, cofactor * (den_part2 // g2))
 
 
     def __mul__(self, other):
@@ -133,15 +172,27 @@ class Fraction:
         PRE : it must be be 2 fractions
         POST : the result is the multiplication of the 2 fractions
         """
+        if isinstance(other, FractionArray):
+            return NotImplemented  # Elementwise operation of the array
         if not isinstance(self, Fraction) or not isinstance(other, Fraction):
             raise TypeError("It must be fractions")
 
-        num_part1 = self.numerator
-        num_part2 = other.numerator
-        den_part1 = self.denominator
-        den_part2 = other.denominator
+        num_part1 = self._numerator
+        num_part2 = other._numerator
+        den_part1 = self._denominator
+        den_part2 = other._denominator
 
-        return Fraction(num_part1*num_part2, den_part1*den_part2)
+        # Cross-cancel before multiplying : both factors are reduced, so the product is too
+        g1 = math.gcd(num_part1, den_part2)
+        if g1 != 1:
+            num_part1 //= g1
+            den_part2 //= g1
+        g2 = math.gcd(num_part2, den_part1)
+        if g2 != 1:
+            num_part2 //= g2
+            den_part1 //= g2
+
+        return _make(num_part1 * num_part2, den_part1 * den_part2)
 
 
     def __truediv__(self, other):
@@ -150,10 +201,18 @@ class Fraction:
         PRE : it must be be 2 fractions
         POST : the result is the division of the 2 fractions
         """
+        if isinstance(other, FractionArray):
+            return NotImplemented  # Elementwise operation of the array
         if not isinstance(self, Fraction) or not isinstance(other, Fraction):
             raise TypeError("It must be fractions")
+        if other._numerator == 0:
+            raise ValueError("Denominator cannot be zero")
 
-        reversed_other = Fraction(other.denominator, other.numerator)
+        # The inverse of a reduced fraction is reduced : only its sign has to move to the numerator
+        if other._numerator < 0:
+            reversed_other = _make(-other._denominator, -other._numerator)
+        else:
+            reversed_other = _make(other._denominator, other._numerator)
 
         return self.__mul__(reversed_other)
 
@@ -161,35 +220,62 @@ class Fraction:
     def __pow__(self, other):
         """Overloading of the ** operator for fractions
 
-        PRE : it must be be 2 fractions
-        POST : the result is the first fraction exponent the second one
+        Integer exponents are computed exactly (a reduced fraction raised to a power stays reduced).
+        A fraction p/q as exponent is exact when both parts of the fraction are perfect q-th powers ;
+        otherwise the result is the float approximation (ValueError if it does not fit in a float).
+
+        PRE : other is an integer or a fraction ; a null fraction cannot have a negative exponent,
+              a negative fraction cannot have an exponent with an even denominator
+        POST : the result is the first fraction exponent the second one (a Fraction when it is rational)
         """
-        if not isinstance(self, Fraction) or not isinstance(other, Fraction):
+        if not isinstance(self, Fraction):
             raise TypeError("It must be fractions")
+        if isinstance(other, int):
+            return self._int_pow(other)
+        if not isinstance(other, Fraction):
+            raise TypeError("The exponent must be an integer or a fraction")
+
+        num_part, den_part = self._numerator, self._denominator
+        power, root = other._numerator, other._denominator
+        if root == 1:
+            return self._int_pow(power)
+        if num_part < 0 and root % 2 == 0:
+            raise ValueError("Even root of a negative fraction")
+
+        num_root = _iroot(abs(num_part), root)
+        den_root = _iroot(den_part, root)
+        if num_root ** root != abs(num_part) or den_root ** root != den_part:
+            # Irrational result : float approximation
+            value = _float_pow(abs(num_part), den_part, power / root)
+            return -value if num_part < 0 and power % 2 else value
+        if num_part < 0:
+            num_root = -num_root
+        return _make(num_root, den_root)._int_pow(power)
+
+    def _int_pow(self, exponent):
+        """Exact power with an integer exponent
+
+        PRE : exponent is an integer, it is not negative if the fraction is null
+        POST : returns the reduced fraction self ** exponent
+        """
+        # The parts are coprime, so are their powers : no reduction is needed
+        if exponent >= 0:
+            return _make(self._numerator ** exponent, self._denominator ** exponent)
+        if self._numerator == 0:
+            raise ValueError("Denominator cannot be zero")
+        if self._numerator < 0:
+            return _make((-self._denominator) ** -exponent, (-self._numerator) ** -exponent)
+        return _make(self._denominator ** -exponent, self._numerator ** -exponent)
 
-        num_part1 = self.numerator
-        num_part2 = other.numerator
-        den_part1 = self.denominator
-        den_part2 = other.denominator
-
-        base = Fraction(num_part1, den_part1)
-        exponent = Fraction(num_part2, den_part2)
-
-        inter_num = base.numerator ** exponent.numerator
-        inter_den = base.denominator ** exponent.numerator
-
-        num_root = round(inter_num ** (1 / exponent.denominator)) 
-        den_root = round(inter_den ** (1 / exponent.denominator))
 
-        return (num_root/den_root)
-    
-    
     def __eq__(self, other) : 
         """Overloading of the == operator for fractions
         
         PRE : it must be be 2 fractions
         POST : returns true if they are equal
         """
+        if isinstance(other, FractionArray):
+            return NotImplemented  # Elementwise comparison of the array
         if not isinstance(other, Fraction):
             return False
 
@@ -201,14 +287,17 @@ class Fraction:
         PRE : it must be a fraction
         POST : returns a new fraction which is the absolute value of the original fraction
         """
-        num_part = self.numerator
-        den_part = self.denominator
+        if self._numerator >= 0:
+            return self
+        return _make(-self._numerator, self._denominator)
+
+    def __hash__(self):
+        """Hash of the fraction, so that it can be used in sets and as a dictionary key
 
-        if num_part < 0 and den_part > 0:
-            num_part *= -1
-        elif den_part < 0 and num_part > 0:
-            den_part *= -1
-        return Fraction(num_part, den_part)
+        PRE : it must be a fraction
+        POST : equal fractions have the same hash
+        """
+        return hash((self._numerator, self._denominator))
 
     def __float__(self) :
         """Returns the decimal value of the fraction
@@ -295,6 +384,457 @@ class Fraction:
         return diff1.is_unit() or diff2.is_unit()
             
 
+# Trusted constructor used by the operators : the fraction is built without any check nor reduction
+_set_numerator = Fraction._numerator.__set__
+_set_denominator = Fraction._denominator.__set__
+_new_object = object.__new__
+_gcd = math.gcd
+
+
+def _make(num, den):
+    """Build a fraction which is already in its reduced form
+
+    PRE : num and den are coprime integers, den > 0
+    POST : returns the fraction num/den
+    """
+    fraction = _new_object(Fraction)
+    _set_numerator(fraction, num)
+    _set_denominator(fraction, den)
+    return fraction
+
+
+def _build(cls, num, den):
+    """Build the reduced form of num/den
+
+    PRE : num and den are integers, den is not 0
+    POST : returns a new instance of cls, reduced and with a positive denominator
+    """
+    if den < 0:
+        num, den = -num, -den
+
+    common_divisor = _gcd(num, den)
+    fraction = _new_object(cls)
+    _set_numerator(fraction, num // common_divisor)
+    _set_denominator(fraction, den // common_divisor)
+    return fraction
+
+
+# Intern table : (numerator, denominator) as given to the constructor, and in reduced form -> shared Fraction
+INTERN_LIMIT = 100  # Largest absolute value of an interned numerator or denominator (percentages)
+# Entries kept in the table (the least recently used ones are evicted) : one per pair allowed by INTERN_LIMIT,
+# so that the pairs under the limit are never evicted (the reduced pairs are among them)
+INTERN_SIZE = (2 * INTERN_LIMIT + 1) * 2 * INTERN_LIMIT
+
+_intern_table = collections.OrderedDict()
+_intern_limit = INTERN_LIMIT
+_intern_size = INTERN_SIZE
+_intern_counts = [0, 0]  # Hits, misses
+
+
+def _intern(key):
+    """Add a fraction to the intern table, after a miss of the constructor : the reduction is only computed once
+
+    PRE : key is a pair of integers (num, den), den is not 0, key is not in the table
+    POST : returns the reduced fraction num/den, which the constructor shares while it stays in the table
+    """
+    _intern_counts[1] += 1
+    fraction = _build(Fraction, *key)
+    reduced_key = (fraction._numerator, fraction._denominator)
+    if reduced_key != key:
+        # Another form of the same value may already be interned (ex : 2/4 after 1/2)
+        fraction = _intern_table.setdefault(reduced_key, fraction)
+    _intern_table[key] = fraction
+    while len(_intern_table) > _intern_size:
+        _intern_table.popitem(last=False)
+    return fraction
+
+
+def configure_intern(limit=INTERN_LIMIT, size=None):
+    """Configure the intern table of the constructor (and empty it)
+
+    PRE : limit and size are positive or null integers (0 for either of them disables the table),
+          size defaults to the number of pairs allowed by limit
+    POST : fractions whose numerator and denominator are at most limit in absolute value are shared,
+           the size least recently used entries are kept
+    """
+    global _intern_limit, _intern_size
+    if size is None:
+        size = (2 * limit + 1) * 2 * limit
+    _intern_limit = limit if size else 0
+    _intern_size = size
+    clear_intern()
+
+
+def clear_intern():
+    """Empty the intern table and reset its counters"""
+    _intern_table.clear()
+    _intern_counts[:] = [0, 0]
+
+
+def intern_info():
+    """Return the statistics of the intern table
+
+    PRE : /
+    POST : returns a dict with the hits, the misses, the number of entries, the limit and the size of the table
+    """
+    return {"hits": _intern_counts[0], "misses": _intern_counts[1], "entries": len(_intern_table),
+            "limit": _intern_limit, "size": _intern_size}
+
+
+def _float_pow(num, den, exponent):
+    """Float approximation of (num/den) ** exponent, also when num/den itself does not fit in a float
+
+    PRE : num and den are integers > 0, exponent is a float
+    POST : returns the approximation ; raises ValueError if it is too large for a float
+    """
+    try:
+        base = num / den
+        if base != 0.0:  # 0.0 : num/den is too small for a float
+            return base ** exponent
+    except OverflowError:
+        pass
+    try:
+        return math.exp((math.log(num) - math.log(den)) * exponent)
+    except OverflowError:
+        raise ValueError("The result is too large for a float approximation") from None
+
+
+def _iroot(value, k):
+    """Integer k-th root, by Newton's method on integers
+
+    PRE : value is a positive or null integer, k is an integer >= 1
+    POST : returns the largest integer r such that r ** k <= value
+    """
+    if value < 2 or k == 1:
+        return value
+    # Start above the root : the iterates then decrease to it
+    root = 1 << -(-value.bit_length() // k)
+    while True:
+        new_root = ((k - 1) * root + value // root ** (k - 1)) // k
+        if new_root >= root:
+            return root
+        root = new_root
+
+
+INT64_MAX = 2**63 - 1
+
+
+def _int_array(values):
+    """Array of integers in int64 storage, or in object storage (Python integers) if one of them does not fit
+
+    -2**63 does not fit either : its opposite (negation, inverse, sign normalisation) would wrap around.
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind == "u" and values.size and int(values.max()) > INT64_MAX:
+        return values.astype(object)
+    try:
+        array = np.asarray(values, dtype=np.int64)
+    except OverflowError:
+        return np.asarray(values, dtype=object)
+    if array.size and array.min() == -INT64_MAX - 1:
+        return array.astype(object)
+    return array
+
+
+def _max_abs(values):
+    """Largest absolute value of an array of integers, as a Python integer"""
+    if values.size == 0:
+        return 0
+    return max(-int(values.min()), int(values.max()))
+
+
+def _fits(bound):
+    return bound <= INT64_MAX
+
+
+class FractionArray:
+    """Array of fractions stored as two parallel NumPy arrays of numerators and denominators
+
+    Denominators are always positive, but the fractions are only reduced when needed : operations multiply
+    the parts, and the gcd normalisation is done in one batch on the whole array before an int64 overflow,
+    on conversion to Fraction objects and at the end of a reduction. Values that do not fit in int64 even
+    when reduced are promoted to object storage (Python integers), which is then kept reduced after each operation.
+    Operations are elementwise, with NumPy broadcasting (a Fraction or an int is a 0-d array).
+    """
+
+    __slots__ = ("numerators", "denominators", "reduced")
+
+    def __init__(self, values=()):
+        """Build an array from fractions and integers
+
+        PRE : values is an iterable of Fraction or int, NumPy is installed
+        POST : the array holds the values, in the same order
+        """
+        if np is None:
+            raise ImportError("FractionArray requires NumPy")
+        values = [value if isinstance(value, Fraction) else Fraction(value) for value in values]
+        self.numerators = _int_array([value._numerator for value in values])
+        self.denominators = _int_array([value._denominator for value in values])
+        self.reduced = True
+
+    @classmethod
+    def from_arrays(cls, numerators, denominators):
+        """Build an array from numerators and denominators
+
+        PRE : numerators and denominators are integer arrays of the same shape, without null denominator
+        POST : returns the array of the fractions numerators[i]/denominators[i]
+        """
+        numerators = _int_array(numerators)
+        denominators = _int_array(denominators)
+        if (denominators == 0).any():
+            raise ValueError("Denominator cannot be zero")
+        sign = np.where(denominators < 0, -1, 1)
+        return cls._from_parts(sign * numerators, sign * denominators)
+
+    @classmethod
+    def _from_parts(cls, numerators, denominators, reduced=False):
+        """Build an array from parts with positive denominators (no check)"""
+        array = object.__new__(cls)
+        array.numerators = numerators
+        array.denominators = denominators
+        array.reduced = reduced
+        return array
+
+    def normalise(self):
+        """Reduce every fraction of the array, in one batch
+
+        PRE : /
+        POST : numerators and denominators are coprime ; returns the array itself
+        """
+        if not self.reduced:
+            common_divisor = np.gcd(self.numerators, self.denominators)
+            self.numerators = self.numerators // common_divisor
+            self.denominators = self.denominators // common_divisor
+            self.reduced = True
+        return self
+
+    @staticmethod
+    def _operand(other):
+        """FractionArray of an operand (FractionArray, Fraction or int), None if unsupported"""
+        if isinstance(other, FractionArray):
+            return other
+        if isinstance(other, int):
+            other = Fraction(other)
+        if isinstance(other, Fraction):
+            return FractionArray._from_parts(_int_array(other._numerator), _int_array(other._denominator), True)
+        return None
+
+    def to_list(self):
+        """Return the fractions of the array
+
+        PRE : /
+        POST : returns a list of Fraction, equal to the elements of the array
+        """
+        self.normalise()
+        return [_make(int(num), int(den)) for num, den in zip(self.numerators.tolist(), self.denominators.tolist())]
+
+    def __len__(self):
+        return len(self.numerators)
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __getitem__(self, index):
+        numerators = self.numerators[index]
+        denominators = self.denominators[index]
+        if np.ndim(numerators) == 0:
+            return Fraction(int(numerators), int(denominators))
+        return FractionArray._from_parts(numerators, denominators, self.reduced)
+
+    def __repr__(self):
+        return f"FractionArray([{', '.join(str(value) for value in self.to_list())}])"
+
+    def _storage(self, other, bound):
+        """Make sure that an operation whose intermediate results are bounded by bound(self, other) cannot overflow
+
+        The operands are normalised first, then promoted to object storage if that is not enough
+        (promoted operands are always normalised, so that object storage stays reduced).
+
+        PRE : other is a FractionArray, bound is a function of two FractionArray returning a Python integer
+        POST : returns (numerators, denominators of self, numerators, denominators of other, object storage used)
+        """
+        promote = self.numerators.dtype == object or other.numerators.dtype == object
+        if not promote and not _fits(bound(self, other)):
+            self.normalise()
+            other.normalise()
+            promote = not _fits(bound(self, other))
+        if promote:
+            self.normalise()
+            other.normalise()
+        parts = (self.numerators, self.denominators, other.numerators, other.denominators)
+        if promote:
+            parts = tuple(part.astype(object) for part in parts)
+        return parts + (promote,)
+
+# ------------------ Elementwise operators ------------------
+
+    @staticmethod
+    def _sum_bound(array1, array2):
+        max_den1, max_den2 = _max_abs(array1.denominators), _max_abs(array2.denominators)
+        return max(_max_abs(array1.numerators) * max_den2 + _max_abs(array2.numerators) * max_den1, max_den1 * max_den2)
+
+    @staticmethod
+    def _product_bound(array1, array2):
+        return max(_max_abs(array1.numerators) * _max_abs(array2.numerators),
+                   _max_abs(array1.denominators) * _max_abs(array2.denominators))
+
+    @staticmethod
+    def _cross_bound(array1, array2):
+        return max(_max_abs(array1.numerators) * _max_abs(array2.denominators),
+                   _max_abs(array2.numerators) * _max_abs(array1.denominators))
+
+    def _add(self, other):
+        num_part1, den_part1, num_part2, den_part2, promoted = self._storage(other, FractionArray._sum_bound)
+        if promoted:
+            # Python integers : cross-reduction of Fraction.__add__, the result stays reduced
+            g = np.gcd(den_part1, den_part2)
+            cofactor = den_part1 // g
+            new_num = num_part1 * (den_part2 // g) + num_part2 * cofactor
+            g2 = np.gcd(new_num, g)
+            return FractionArray._from_parts(new_num // g2, cofactor * (den_part2 // g2), True)
+        return FractionArray._from_parts(num_part1 * den_part2 + num_part2 * den_part1, den_part1 * den_part2)
+
+    def _mul(self, other):
+        num_part1, den_part1, num_part2, den_part2, promoted = self._storage(other, FractionArray._product_bound)
+        if promoted:
+            # Python integers : cross-cancellation of Fraction.__mul__, the result stays reduced
+            g1 = np.gcd(num_part1, den_part2)
+            g2 = np.gcd(num_part2, den_part1)
+            return FractionArray._from_parts((num_part1 // g1) * (num_part2 // g2), (den_part1 // g2) * (den_part2 // g1), True)
+        return FractionArray._from_parts(num_part1 * num_part2, den_part1 * den_part2)
+
+    def _inverse(self):
+        if (self.numerators == 0).any():
+            raise ValueError("Denominator cannot be zero")
+        sign = np.where(self.numerators < 0, -1, 1)
+        return FractionArray._from_parts(sign * self.denominators, sign * self.numerators, self.reduced)
+
+    def __add__(self, other):
+        """Elementwise + (with a FractionArray, a Fraction or an int)
+
+        PRE : the shapes can be broadcast
+        POST : returns the FractionArray of the sums
+        """
+        other = self._operand(other)
+        if other is None:
+            return NotImplemented
+        return self._add(other)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return FractionArray._from_parts(-self.numerators, self.denominators, self.reduced)
+
+    def __sub__(self, other):
+        """Elementwise - (with a FractionArray, a Fraction or an int)
+
+        PRE : the shapes can be broadcast
+        POST : returns the FractionArray of the differences
+        """
+        other = self._operand(other)
+        if other is None:
+            return NotImplemented
+        return self._add(-other)
+
+    def __rsub__(self, other):
+        other = self._operand(other)
+        if other is None:
+            return NotImplemented
+        return other._add(-self)
+
+    def __mul__(self, other):
+        """Elementwise * (with a FractionArray, a Fraction or an int)
+
+        PRE : the shapes can be broadcast
+        POST : returns the FractionArray of the products
+        """
+        other = self._operand(other)
+        if other is None:
+            return NotImplemented
+        return self._mul(other)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        """Elementwise / (with a FractionArray, a Fraction or an int)
+
+        PRE : the shapes can be broadcast, other has no null element
+        POST : returns the FractionArray of the quotients
+        """
+        other = self._operand(other)
+        if other is None:
+            return NotImplemented
+        return self._mul(other._inverse())
+
+    def __rtruediv__(self, other):
+        other = self._operand(other)
+        if other is None:
+            return NotImplemented
+        return other._mul(self._inverse())
+
+# ------------------ Reductions ------------------
+
+    def _reduce(self, operation, neutral):
+        """Pairwise (tree) reduction : log2(n) vectorised operations instead of n scalar ones"""
+        array = self
+        if len(array) == 0:
+            return neutral
+        while len(array) > 1:
+            if len(array) % 2:
+                array = FractionArray._from_parts(np.append(array.numerators, neutral._numerator),
+                                                  np.append(array.denominators, neutral._denominator), array.reduced)
+            even = FractionArray._from_parts(array.numerators[::2], array.denominators[::2], array.reduced)
+            odd = FractionArray._from_parts(array.numerators[1::2], array.denominators[1::2], array.reduced)
+            array = operation(even, odd)
+        return array[0]
+
+    def sum(self):
+        """Sum of the elements
+
+        PRE : the array is one-dimensional
+        POST : returns the sum as a Fraction (0 for an empty array)
+        """
+        return self._reduce(FractionArray._add, Fraction(0))
+
+    def prod(self):
+        """Product of the elements
+
+        PRE : the array is one-dimensional
+        POST : returns the product as a Fraction (1 for an empty array)
+        """
+        return self._reduce(FractionArray._mul, Fraction(1))
+
+# ------------------ Comparisons ------------------
+
+    def _compare(self, other, comparison):
+        """Compare n1 * d2 with n2 * d1 (denominators are positive), elementwise"""
+        other = self._operand(other)
+        if other is None:
+            return NotImplemented
+        num_part1, den_part1, num_part2, den_part2, _ = self._storage(other, FractionArray._cross_bound)
+        return comparison(num_part1 * den_part2, num_part2 * den_part1)
+
+    def __eq__(self, other):
+        """Elementwise == : returns a boolean NumPy array"""
+        return self._compare(other, np.equal)
+
+    def __ne__(self, other):
+        return self._compare(other, np.not_equal)
+
+    def __lt__(self, other):
+        return self._compare(other, np.less)
+
+    def __le__(self, other):
+        return self._compare(other, np.less_equal)
+
+    def __gt__(self, other):
+        return self._compare(other, np.greater)
+
+    def __ge__(self, other):
+        return self._compare(other, np.greater_equal)
+
+    __hash__ = None
+
+
 class FractionTestCase(unittest.TestCase):
 
     def test_initialization(self):
@@ -313,6 +853,84 @@ class FractionTestCase(unittest.TestCase):
         with self.assertRaises(ValueError):
             Fraction(1.5, 2)
 
+    def test_sign_normalisation(self):
+        """The sign is always carried by the numerator"""
+        f = Fraction(3, -4)
+        self.assertEqual((f.numerator, f.denominator), (-3, 4))
+
+        f = Fraction(-6, -8)
+        self.assertEqual((f.numerator, f.denominator), (3, 4))
+
+        f = Fraction(0, -5)
+        self.assertEqual((f.numerator, f.denominator), (0, 1))
+
+    def test_immutable_and_hashable(self):
+        """Fractions cannot be modified and can be used as dictionary keys"""
+        import copy
+        import pickle
+
+        f = Fraction(2, 4)
+        with self.assertRaises(AttributeError):
+            f._numerator = 3
+        with self.assertRaises(AttributeError):
+            f.other = 3
+        self.assertFalse(hasattr(f, "__dict__"))
+
+        self.assertEqual(hash(f), hash(Fraction(1, 2)))
+        self.assertEqual(len({f, Fraction(1, 2), Fraction(-1, -2)}), 1)
+        self.assertIs(copy.deepcopy(f), f)
+        self.assertEqual(pickle.loads(pickle.dumps(f)), f)
+
+    def test_division_by_zero(self):
+        """Dividing by a null fraction raises the same error as a null denominator"""
+        with self.assertRaises(ValueError):
+            Fraction(1, 2) / Fraction(0, 3)
+
+        result = Fraction(1, 2) / Fraction(-3, 4)
+        self.assertEqual((result.numerator, result.denominator), (-2, 3))
+
+    def test_intern_table(self):
+        """Small fractions are shared, large ones are not, and the table is bounded"""
+        try:
+            configure_intern(limit=100, size=4)
+            half = Fraction(1, 2)
+            self.assertIs(Fraction(1, 2), half)
+            self.assertIs(Fraction(-3, -6), half)
+            self.assertIsNot(Fraction(1000, 2000), half)
+            self.assertEqual(Fraction(1000, 2000), half)
+            self.assertEqual(intern_info()["hits"], 1)
+            self.assertEqual(intern_info()["misses"], 2)
+
+            for den in range(3, 10):
+                Fraction(1, den)
+            self.assertEqual(intern_info()["entries"], 4)
+            self.assertIsNot(Fraction(1, 2), half)  # Evicted (least recently used)
+
+            configure_intern(size=0)
+            self.assertIsNot(Fraction(1, 2), Fraction(1, 2))
+            self.assertEqual(intern_info()["entries"], 0)
+        finally:
+            configure_intern()
+
+    def test_intern_default_size(self):
+        """With the default configuration, a sweep of all the pairs under INTERN_LIMIT evicts nothing"""
+        try:
+            configure_intern()
+            pairs = [(num, den) for num in range(-INTERN_LIMIT, INTERN_LIMIT + 1)
+                     for den in range(-INTERN_LIMIT, INTERN_LIMIT + 1) if den]
+            for num, den in pairs:
+                Fraction(num, den)
+            first = intern_info()
+            self.assertEqual(first["entries"], len(pairs))
+            self.assertEqual(first["entries"], INTERN_SIZE)
+            for num, den in pairs:
+                Fraction(num, den)
+            second = intern_info()
+            self.assertEqual(second["hits"] - first["hits"], len(pairs))  # No entry was evicted
+            self.assertEqual(second["misses"], first["misses"])
+        finally:
+            configure_intern()
+
     def test_str(self):
         """Test the __str__ method"""
         f = Fraction(3, 4)
@@ -365,12 +983,68 @@ class FractionTestCase(unittest.TestCase):
         result = f1 / f2
         self.assertEqual(result, Fraction(9, 8))
 
+    def test_operators_stay_reduced(self):
+        """Results of the cross-reduced operators are the reduced forms given by the standard library"""
+        import fractions
+        import random
+
+        rng = random.Random(0)
+        for _ in range(2000):
+            n1, d1, n2, d2 = (rng.randint(-60, 60), rng.randint(1, 60), rng.randint(-60, 60), rng.randint(1, 60))
+            f1, f2 = Fraction(n1, d1), Fraction(n2, d2)
+            s1, s2 = fractions.Fraction(n1, d1), fractions.Fraction(n2, d2)
+            for result, expected in ((f1 + f2, s1 + s2), (f1 - f2, s1 - s2), (f1 * f2, s1 * s2)):
+                self.assertEqual((result.numerator, result.denominator), (expected.numerator, expected.denominator))
+
+    def test_harmonic_sum(self):
+        """Long accumulations keep the denominator at the lcm of the terms"""
+        total = Fraction(0)
+        for k in range(1, 31):
+            total = total + Fraction(1, k)
+        self.assertEqual((total.numerator, total.denominator), (9304682830147, 2329089562800))
+
     def test_power(self):
         """Test the __pow__ method"""
         f1 = Fraction(2, 3)
         f2 = Fraction(2, 1)
         result = f1 ** f2
-        self.assertEqual(result, 4/9)
+        self.assertEqual(result, Fraction(4, 9))
+
+        self.assertEqual(Fraction(4, 3) ** 3, Fraction(64, 27))
+        self.assertEqual(Fraction(-2, 3) ** -3, Fraction(-27, 8))
+        self.assertEqual(Fraction(5, 7) ** 0, Fraction(1))
+        self.assertEqual(Fraction(3, 2) ** 2000, Fraction(3**2000, 2**2000))
+        with self.assertRaises(ValueError):
+            Fraction(0) ** -1
+        with self.assertRaises(TypeError):
+            Fraction(1, 2) ** 0.5
+
+    def test_rational_power(self):
+        """Exact roots give fractions, other roots their float approximation"""
+        self.assertEqual(Fraction(4, 9) ** Fraction(1, 2), Fraction(2, 3))
+        self.assertEqual(Fraction(8, 27) ** Fraction(-2, 3), Fraction(9, 4))
+        self.assertEqual(Fraction(-8, 27) ** Fraction(1, 3), Fraction(-2, 3))
+        self.assertEqual(Fraction(-8, 27) ** Fraction(2, 3), Fraction(4, 9))
+        self.assertEqual(Fraction(3**3000, 7**1500) ** Fraction(1, 1500), Fraction(9, 7))
+        self.assertAlmostEqual(Fraction(2) ** Fraction(1, 2), 2 ** 0.5)
+        self.assertAlmostEqual(Fraction(-2) ** Fraction(1, 3), -(2 ** (1 / 3)))
+        with self.assertRaises(ValueError):
+            Fraction(-4, 9) ** Fraction(1, 2)
+
+        # Parts too large for a float : approximation through logarithms
+        self.assertAlmostEqual((Fraction(10**400 + 1) ** Fraction(1, 2)) / 1e200, 1.0)
+        self.assertAlmostEqual((Fraction(1, 10**400 + 1) ** Fraction(-1, 2)) / 1e200, 1.0)
+        self.assertAlmostEqual(Fraction(10**400 + 1, 10**399) ** Fraction(1, 2), 10 ** 0.5)
+        self.assertAlmostEqual(-(Fraction(-(10**401 + 1)) ** Fraction(1, 3)) / 10 ** (401 / 3), 1.0)
+        with self.assertRaises(ValueError):
+            Fraction(10**400 + 1) ** Fraction(3, 2)
+
+    def test_iroot(self):
+        """_iroot is the floor of the k-th root"""
+        for value in (0, 1, 2, 7, 8, 9, 10**40, 10**40 - 1, 2**4000 + 12345):
+            for k in (1, 2, 3, 7, 64):
+                root = _iroot(value, k)
+                self.assertTrue(root ** k <= value < (root + 1) ** k)
 
     def test_equality(self):
         """Test the __eq__ method"""
@@ -430,6 +1104,80 @@ class FractionTestCase(unittest.TestCase):
         self.assertFalse(f1.is_adjacent_to(f4))
 
 
+@unittest.skipIf(np is None, "FractionArray requires NumPy")
+class FractionArrayTestCase(unittest.TestCase):
+
+    def test_round_trip(self):
+        """Lists of fractions go through a FractionArray without any loss"""
+        values = [Fraction(1, 2), Fraction(-3, 4), Fraction(5), Fraction(2**70, 3), 7]
+        array = FractionArray(values)
+        self.assertEqual(array.numerators.dtype, object)
+        self.assertEqual(array.to_list(), [Fraction(1, 2), Fraction(-3, 4), Fraction(5), Fraction(2**70, 3), Fraction(7)])
+        self.assertEqual(array[1], Fraction(-3, 4))
+        self.assertEqual(array[1:3].to_list(), [Fraction(-3, 4), Fraction(5)])
+
+        array = FractionArray.from_arrays([2, 3, -4], [4, -9, 6])
+        self.assertEqual(array.numerators.dtype, np.int64)
+        self.assertEqual(array.to_list(), [Fraction(1, 2), Fraction(-1, 3), Fraction(-2, 3)])
+        with self.assertRaises(ValueError):
+            FractionArray.from_arrays([1], [0])
+
+    def test_elementwise_operators(self):
+        """Elementwise results are the ones of the scalar class"""
+        import random
+
+        rng = random.Random(1)
+        left = [Fraction(rng.randint(-50, 50), rng.randint(1, 50)) for _ in range(500)]
+        right = [Fraction(rng.choice([-1, 1]) * rng.randint(1, 50), rng.randint(1, 50)) for _ in range(500)]
+        array1, array2 = FractionArray(left), FractionArray(right)
+
+        self.assertEqual((array1 + array2).to_list(), [a + b for a, b in zip(left, right)])
+        self.assertEqual((array1 - array2).to_list(), [a - b for a, b in zip(left, right)])
+        self.assertEqual((array1 * array2).to_list(), [a * b for a, b in zip(left, right)])
+        self.assertEqual((array1 / array2).to_list(), [a / b for a, b in zip(left, right)])
+        self.assertEqual((array1 * Fraction(2, 3)).to_list(), [a * Fraction(2, 3) for a in left])
+        self.assertEqual((1 - array1).to_list(), [Fraction(1) - a for a in left])
+        third = Fraction(1, 3)
+        self.assertEqual((third + array1).to_list(), [third + a for a in left])
+        self.assertEqual((third - array1).to_list(), [third - a for a in left])
+        self.assertEqual((third * array1).to_list(), [third * a for a in left])
+        self.assertEqual((third / array2).to_list(), [third / b for b in right])
+        self.assertEqual((third == array1).tolist(), [third == a for a in left])
+        self.assertEqual((array1 < array2).tolist(), [float(a) < float(b) for a, b in zip(left, right)])
+        self.assertEqual((array1 == array1[::-1][::-1]).tolist(), [True] * 500)
+        with self.assertRaises(ValueError):
+            array1 / FractionArray([0])
+
+    def test_reductions_and_overflow(self):
+        """Sums and products promote to Python integers instead of overflowing"""
+        terms = FractionArray([Fraction(1, k) for k in range(1, 101)])
+        total = Fraction(0)
+        for k in range(1, 101):
+            total = total + Fraction(1, k)
+        self.assertEqual(terms.sum(), total)
+        self.assertEqual(terms.prod(), Fraction(1, math.factorial(100)))
+        self.assertEqual(FractionArray([]).sum(), Fraction(0))
+        self.assertEqual(FractionArray([Fraction(2, 3)]).prod(), Fraction(2, 3))
+
+        array = FractionArray([Fraction(1, 3), Fraction(2, 3)])
+        for _ in range(100):
+            array = array * Fraction(6, 5) / Fraction(6, 5)
+        self.assertEqual(array.numerators.dtype, np.int64)  # Normalised before each overflow
+        self.assertEqual(array.to_list(), [Fraction(1, 3), Fraction(2, 3)])
+
+        minimum = FractionArray([Fraction(-2**63)])
+        self.assertEqual(minimum.numerators.dtype, object)
+        self.assertEqual((FractionArray([0]) - minimum)[0], Fraction(2**63))
+        self.assertEqual((1 / minimum)[0], Fraction(-1, 2**63))
+        self.assertEqual(FractionArray.from_arrays([1], [-2**63])[0], Fraction(-1, 2**63))
+        self.assertEqual(FractionArray.from_arrays(np.array([-2**63]), np.array([1]))[0], Fraction(-2**63))
+        self.assertEqual(FractionArray.from_arrays(np.array([2**64 - 1], dtype=np.uint64), [1])[0], Fraction(2**64 - 1))
+
+        big = FractionArray([Fraction(2**62, 3)]) * FractionArray([Fraction(4, 5)])
+        self.assertEqual(big[0], Fraction(2**64, 15))
+        self.assertTrue((FractionArray([Fraction(2**62, 3)]) > FractionArray([Fraction(2**61, 3)])).all())
+
+
 if __name__ == '__main__':
     unittest.main(argv=['first-arg-is-ignored'], exit=False)
 
@@ -0,0 +1,291 @@
+"""
+Mesures de performance du démineur (demineur_modif.py)
+Utilisation : python bench_demineur.py {memoire,remplissage,placement,sessions,sans-hasard,relecture,infini,bitboard,branches} [--tailles 100 1000 ...]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+import demineur_modif as dm
+
+
+def benchmark_memory(n:int, m:int, nbr_mines:int):
+    """
+    Compare la mémoire occupée par les plateaux en listes de listes et par le plateau compact
+    Paramètres:
+        n (int): nombre de colonnes
+        m (int): nombre de lignes
+        nbr_mines (int): nombre de mines
+    Returns:
+        Tuple[int, int]: octets alloués (listes de listes, plateau compact)
+    """
+    tracemalloc.start()
+    game_board = dm.create_board(n, m)
+    reference_board = dm.create_board(n, m, 0)
+    dm.place_mines(reference_board, nbr_mines, 0, 0)
+    dm.fill_in_board(reference_board)
+    taille_listes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del game_board, reference_board
+
+    tracemalloc.start()
+    compact = dm.create_compact_board(n, m)
+    dm.place_mines(compact, nbr_mines, 0, 0)
+    dm.fill_in_board(compact)
+    taille_compact = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del compact
+
+    return taille_listes, taille_compact
+
+
+def benchmark_fill(n:int, m:int, densite:float=0.2):
+    """
+    Compare fill_in_board case par case et en une passe sur le même plateau
+    Paramètres:
+        n (int): nombre de colonnes
+        m (int): nombre de lignes
+        densite (float): proportion de mines
+    Returns:
+        Tuple[float, float]: durées en secondes (case par case, en une passe)
+    """
+    rng = random.Random(n * m)
+    reference_board = [['X ' if rng.random() < densite else 0 for _ in range(n)] for _ in range(m)]
+    copie = [ligne[:] for ligne in reference_board]
+
+    debut = time.perf_counter()
+    dm.fill_in_board(copie, batched=False)
+    duree_naive = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    dm.fill_in_board(reference_board)
+    duree_batch = time.perf_counter() - debut
+
+    assert reference_board == copie
+    return duree_naive, duree_batch
+
+
+def benchmark_placement(n:int, m:int, densite:float, rng_seed:int=0):
+    """
+    Compare le tirage par rejet et le tirage sans remise de place_mines
+    Paramètres:
+        n (int): nombre de colonnes
+        m (int): nombre de lignes
+        densite (float): proportion de mines parmi les cases hors zone de départ
+        rng_seed (int): graine des générateurs aléatoires
+    Returns:
+        Tuple[float, float]: durées en secondes (rejet, sans remise)
+    """
+    nbr_mines = int((n * m - 9) * densite)
+
+    plateau_rejet = dm.create_board(n, m, 0)
+    plateau_tirage = dm.create_board(n, m, 0)
+
+    debut = time.perf_counter()
+    dm.place_mines(plateau_rejet, nbr_mines, m // 2, n // 2, rng=random.Random(rng_seed), rejection=True)
+    duree_rejet = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    dm.place_mines(plateau_tirage, nbr_mines, m // 2, n // 2, rng=random.Random(rng_seed))
+    duree_tirage = time.perf_counter() - debut
+
+    return duree_rejet, duree_tirage
+
+
+def benchmark_sessions(n:int, m:int, nbr_mines:int, nbr_parties:int, compact:bool=False):
+    """
+    Joue des parties GameSession en dévoilant des cases au hasard jusqu'à la fin de chaque partie
+    Paramètres:
+        n (int): nombre de colonnes
+        m (int): nombre de lignes
+        nbr_mines (int): nombre de mines
+        nbr_parties (int): nombre de parties à jouer
+        compact (bool): utilise le plateau compact
+    Returns:
+        float: parties jouées par minute
+    """
+    rng = random.Random(0)
+    debut = time.perf_counter()
+    for _ in range(nbr_parties):
+        session = dm.GameSession(n, m, nbr_mines, rng=rng, compact=compact)
+        cases = [(x, y) for x in range(m) for y in range(n)]
+        rng.shuffle(cases)
+        session.apply_moves(("c", x, y) for x, y in cases)
+    return nbr_parties * 60 / (time.perf_counter() - debut)
+
+
+def benchmark_no_guess(n:int, m:int, nbr_mines:int, nbr_plateaux:int):
+    """
+    Mesure le temps de génération d'un plateau sans hasard (premier clic au centre)
+    Returns:
+        Tuple[float, float]: médiane et 99e centile en secondes
+    """
+    import demineur_generation
+
+    rng = random.Random(0)
+    durees = []
+    for _ in range(nbr_plateaux):
+        debut = time.perf_counter()
+        demineur_generation.generate_no_guess(n, m, nbr_mines, m // 2, n // 2, rng=rng)
+        durees.append(time.perf_counter() - debut)
+    durees.sort()
+    return durees[len(durees) // 2], durees[min(len(durees) - 1, len(durees) * 99 // 100)]
+
+
+def benchmark_replay(n:int, m:int, nbr_mines:int, nbr_parties:int):
+    """
+    Archive des parties jouées au hasard dans un fichier temporaire, puis les relit et les rejoue en flux
+    Returns:
+        Tuple[int, float]: taille de l'archive en octets et parties rejouées par minute
+    """
+    import tempfile
+
+    import demineur_sauvegarde as ds
+
+    rng = random.Random(0)
+    with tempfile.TemporaryFile() as f:
+        ds.write_header(f)
+        for i in range(nbr_parties):
+            session = dm.GameSession(n, m, nbr_mines, rng=rng, compact=True)
+            cases = [(x, y) for x in range(m) for y in range(n)]
+            rng.shuffle(cases)
+            session.apply_moves(("c", x, y) for x, y in cases)
+            ds.save_session(f, session, seed=i)
+        taille = f.tell()
+        f.seek(0)
+        return taille, ds.replay_stats(f)["games_per_minute"]
+
+
+def benchmark_chunked(nbr_clics:int, densite:float=0.15):
+    """
+    Dévoile des zones sur un plateau infini en blocs et mesure la mémoire gardée
+    Returns:
+        Tuple[int, int, float]: cases dévoilées, octets alloués et durée en secondes
+    """
+    rng = random.Random(0)
+    tracemalloc.start()
+    debut = time.perf_counter()
+    board = dm.ChunkedBoard(0, densite)
+    board.set_safe_zone(0, 0)
+    total = len(dm.propagate_click(board, board, 0, 0))
+    for _ in range(nbr_clics):
+        x, y = rng.randrange(-10000, 10000), rng.randrange(-10000, 10000)
+        if not board.is_mine(x, y):
+            total += len(dm.propagate_click(board, board, x, y))
+    duree = time.perf_counter() - debut
+    taille = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return total, taille, duree
+
+
+def benchmark_bitboard(cote:int, densite:float=0.15, repetitions:int=20):
+    """
+    Compare comptes et propagation (premier clic) entre listes, plateau compact et plateau en entiers
+    Returns:
+        dict: moteur -> (durée de fill_in_board, durée de propagate_click) en secondes, moyennes sur les répétitions
+    """
+    rng = random.Random(cote)
+    mines = dm.place_mines(dm.create_compact_board(cote, cote), int(cote * cote * densite), cote // 2, cote // 2, rng=rng)
+    fabriques = {
+        "listes": lambda: (dm.create_board(cote, cote), dm.create_board(cote, cote, 0)),
+        "compact": lambda: (dm.create_compact_board(cote, cote),) * 2,
+        "bitboard": lambda: (dm.create_bitboard(cote, cote),) * 2,
+    }
+    durees = {}
+    for moteur, fabrique in fabriques.items():
+        remplissage = propagation = 0.0
+        for _ in range(repetitions):
+            game_board, reference_board = fabrique()
+            for x, y in mines:
+                if isinstance(reference_board, list):
+                    reference_board[x][y] = 'X '
+                else:
+                    reference_board.set_cell(x, y, dm.CASE_MINE)
+            debut = time.perf_counter()
+            dm.fill_in_board(reference_board)
+            milieu = time.perf_counter()
+            dm.propagate_click(game_board, reference_board, cote // 2, cote // 2)
+            fin = time.perf_counter()
+            remplissage += milieu - debut
+            propagation += fin - milieu
+        durees[moteur] = (remplissage / repetitions, propagation / repetitions)
+    return durees
+
+
+def benchmark_branches(cote:int, nbr_cycles:int, options:dict):
+    """
+    Mesure les allers-retours d'une recherche : repère, coup au hasard, retour au repère ; puis copie + coup
+    Returns:
+        Tuple[float, float]: cycles par seconde (snapshot/restore, fork)
+    """
+    rng = random.Random(0)
+    session = dm.GameSession(cote, cote, cote * cote // 6, rng=rng, **options)
+    session.reveal(cote // 2, cote // 2)
+    coups = [(rng.choice("cf"), rng.randrange(cote), rng.randrange(cote)) for _ in range(1000)]
+
+    debut = time.perf_counter()
+    for k in range(nbr_cycles):
+        repere = session.snapshot()
+        session._play(*coups[k % 1000])
+        session.restore(repere)
+    restauration = nbr_cycles / (time.perf_counter() - debut)
+
+    debut = time.perf_counter()
+    for k in range(nbr_cycles):
+        session.fork()._play(*coups[k % 1000])
+    copie = nbr_cycles / (time.perf_counter() - debut)
+    return restauration, copie
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesures de performance du démineur")
+    parser.add_argument("benchmark", choices=["memoire", "remplissage", "placement", "sessions", "sans-hasard", "relecture", "infini", "bitboard", "branches"], help="mesure à effectuer")
+    parser.add_argument("--tailles", type=int, nargs="+", help="côtés des plateaux carrés à mesurer")
+    args = parser.parse_args()
+
+    if args.benchmark == "memoire":
+        for cote in args.tailles or [2000]:
+            listes, compact = benchmark_memory(cote, cote, cote * cote // 10)
+            print(f"Mémoire {cote}x{cote} : listes {listes / 1e6:.1f} Mo, compact {compact / 1e6:.1f} Mo ({listes / compact:.0f}x)")
+    elif args.benchmark == "remplissage":
+        moteur = "NumPy" if dm.np is not None else "Python pur"
+        for cote in args.tailles or [100, 1000, 5000]:
+            naive, batch = benchmark_fill(cote, cote)
+            print(f"fill_in_board {cote}x{cote} : case par case {naive:.3f} s, une passe ({moteur}) {batch:.3f} s ({naive / batch:.1f}x)")
+    elif args.benchmark == "placement":
+        for cote in args.tailles or [100]:
+            for densite in (0.1, 0.25, 0.5, 0.75, 0.9, 0.99):
+                rejet, tirage = benchmark_placement(cote, cote, densite)
+                print(f"place_mines {cote}x{cote} à {densite:.0%} : rejet {rejet:.4f} s, sans remise {tirage:.4f} s ({rejet / tirage:.1f}x)")
+    elif args.benchmark == "sessions":
+        for cote in args.tailles or [9, 16]:
+            for compact in (False, True):
+                debit = benchmark_sessions(cote, cote, cote * cote // 6, 2000, compact)
+                print(f"GameSession {cote}x{cote} ({'compact' if compact else 'listes'}) : {debit:,.0f} parties/min")
+    elif args.benchmark == "sans-hasard":
+        for n, m, nbr_mines in [(9, 9, 10), (16, 16, 40), (30, 16, 99)]:
+            p50, p99 = benchmark_no_guess(n, m, nbr_mines, 300)
+            print(f"Plateau sans hasard {n}x{m}/{nbr_mines} : p50 {p50 * 1e3:.1f} ms, p99 {p99 * 1e3:.1f} ms")
+    elif args.benchmark == "relecture":
+        for cote in args.tailles or [9, 16]:
+            taille, debit = benchmark_replay(cote, cote, cote * cote // 6, 20000)
+            print(f"Relecture {cote}x{cote} : {taille / 20000:.0f} octets/partie, {debit:,.0f} parties/min")
+    elif args.benchmark == "infini":
+        for nbr_clics in args.tailles or [10, 100, 300]:
+            total, taille, duree = benchmark_chunked(nbr_clics)
+            print(f"Plateau infini, {nbr_clics} clics : {total} cases dévoilées, {taille / 1e6:.1f} Mo, {duree:.2f} s")
+    elif args.benchmark == "bitboard":
+        for cote in args.tailles or [16, 32, 64]:
+            for moteur, (remplissage, propagation) in benchmark_bitboard(cote).items():
+                print(f"{moteur:>8} {cote}x{cote} : fill_in_board {remplissage * 1e6:,.0f} µs, propagate_click {propagation * 1e6:,.0f} µs")
+    elif args.benchmark == "branches":
+        for cote in args.tailles or [100]:
+            for moteur, options in [("listes", {}), ("compact", {"compact": True}), ("bitboard", {"bitboard": True})]:
+                restauration, copie = benchmark_branches(cote, 100000, options)
+                print(f"{moteur:>8} {cote}x{cote} : snapshot/restore {restauration:,.0f} cycles/s, fork {copie:,.0f} cycles/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+"""
+Performance measurements of the Fraction class (TP9.py)
+Usage : python bench_fraction.py {constructor,harmonic,array,intern} [--size 100000] [--terms 100000] [--reference-terms 10000]
+"""
+
+import argparse
+import math
+import random
+import time
+import tracemalloc
+
+import TP9
+from TP9 import Fraction, FractionArray
+
+
+class LegacyFraction:
+    """Fraction as it was written before __slots__ : kept as the reference of the measurements
+
+    Every instance has a __dict__ and every result goes through the checks and the Euclid loop of __init__.
+    """
+
+    def __init__(self, num=0, den=1):
+        if not isinstance(num, int) or not isinstance(den, int):
+            raise ValueError("Numerator and denominator must be integers")
+        if den == 0:
+            raise ValueError("Denominator cannot be zero")
+
+        def pgcd(a, b):
+            while b:
+                a, b = b, a % b
+            return a
+
+        common_divisor = pgcd(num, den)
+        self._numerator = num // common_divisor
+        self._denominator = den // common_divisor
+
+    @property
+    def numerator(self):
+        return self._numerator
+    @property
+    def denominator(self):
+        return self._denominator
+
+    def __add__(self, other):
+        if not isinstance(self, LegacyFraction) or not isinstance(other, LegacyFraction):
+            raise TypeError("It must be fractions")
+        if self.denominator == other.denominator:
+            return LegacyFraction(self.numerator + other.numerator, self.denominator)
+        return LegacyFraction(self.numerator * other.denominator + other.numerator * self.denominator,
+                              self.denominator * other.denominator)
+
+    def __mul__(self, other):
+        if not isinstance(self, LegacyFraction) or not isinstance(other, LegacyFraction):
+            raise TypeError("It must be fractions")
+        return LegacyFraction(self.numerator * other.numerator, self.denominator * other.denominator)
+
+
+def _random_pairs(size:int, limit:int=1000, seed:int=0):
+    rng = random.Random(seed)
+    return [(rng.randint(-limit, limit), rng.randint(1, limit)) for _ in range(size)]
+
+
+def benchmark_constructor(size:int, repetitions:int=5):
+    """Compare the memory and the speed of the legacy class and of the current one
+
+    The speeds are the best of repetitions runs : a single run on a busy machine varies by 30 %.
+
+    PRE : size is a positive integer (number of fractions built)
+    POST : returns a dict {class name : (bytes per fraction, constructions per second, operations per second)}
+    """
+    pairs = _random_pairs(size)
+    results = {}
+    for cls in (LegacyFraction, Fraction):
+        tracemalloc.start()
+        fractions = [cls(num, den) for num, den in pairs]
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        construction = operations = 0
+        for _ in range(repetitions):
+            start = time.perf_counter()
+            for num, den in pairs:
+                cls(num, den)
+            construction = max(construction, size / (time.perf_counter() - start))
+
+            start = time.perf_counter()
+            for left, right in zip(fractions, fractions[1:]):
+                left + right
+                left * right
+            operations = max(operations, 2 * (size - 1) / (time.perf_counter() - start))
+
+        results[cls.__name__] = (allocated / size, construction, operations)
+        del fractions
+    return results
+
+
+def harmonic_bits(terms:int, cross_reduced:bool):
+    """Sum 1/1 + ... + 1/terms on plain integers, with the formula of Fraction.__add__ or with the previous one
+
+    The previous formula multiplies the denominators and reduces afterwards ; the cross-reduced one divides
+    by gcd(d1, d2) first and only has to divide out gcd(numerator, g).
+
+    PRE : terms is a positive integer
+    POST : returns (seconds, bit-length of the largest intermediate integer, bit-length of the final denominator)
+    """
+    num, den = 0, 1
+    largest = 0
+    start = time.perf_counter()
+    for k in range(1, terms + 1):
+        if cross_reduced:
+            g = math.gcd(den, k)
+            new_num = num * (k // g) + den // g
+            new_den = den // g * k
+            common_divisor = math.gcd(new_num, g)
+        else:
+            new_num = num * k + den
+            new_den = den * k
+            common_divisor = math.gcd(new_num, new_den)
+        largest = max(largest, new_num.bit_length(), new_den.bit_length())
+        num, den = new_num // common_divisor, new_den // common_divisor
+    return time.perf_counter() - start, largest, den.bit_length()
+
+
+def benchmark_harmonic(terms:int, reference_terms:int):
+    """Time the harmonic sum with the Fraction class and compare the intermediate sizes of both formulas
+
+    The product-then-reduce formula is measured on reference_terms only : its gcd on huge integers makes it
+    impractical on 10^5 terms.
+
+    PRE : terms and reference_terms are positive integers
+    POST : returns a dict {label : (terms, seconds, largest intermediate bits, final denominator bits)}
+    """
+    start = time.perf_counter()
+    total = Fraction(0)
+    for k in range(1, terms + 1):
+        total = total + Fraction(1, k)
+    seconds = time.perf_counter() - start
+
+    results = {"Fraction": (terms, seconds) + harmonic_bits(terms, True)[1:]}
+    for label, cross_reduced in (("cross-reduced", True), ("product-then-reduce", False)):
+        results[label] = (reference_terms,) + harmonic_bits(reference_terms, cross_reduced)
+    return results
+
+
+def benchmark_array(size:int, repetitions:int=5):
+    """Compare elementwise operations and reductions of FractionArray with loops over Fraction objects
+
+    FractionArray results are reduced lazily : "+ reduced" includes the batched gcd normalisation.
+
+    PRE : size is a positive integer, NumPy is installed
+    POST : returns a dict {operation : (seconds with Fraction, seconds with FractionArray)}
+    """
+    pairs = _random_pairs(2 * size, limit=1000, seed=size)
+    left = [Fraction(num, den) for num, den in pairs[:size]]
+    right = [Fraction(num or 1, den) for num, den in pairs[size:]]
+    array1, array2 = FractionArray(left), FractionArray(right)
+    small = [Fraction(1, 1 + k % 12) for k in range(size)]
+    small_array = FractionArray(small)
+
+    def scalar_sum():
+        total = Fraction(0)
+        for value in small:
+            total = total + value
+        return total
+
+    operations = {
+        "+": (lambda: [a + b for a, b in zip(left, right)], lambda: array1 + array2),
+        "+ reduced": (lambda: [a + b for a, b in zip(left, right)], lambda: (array1 + array2).normalise()),
+        "*": (lambda: [a * b for a, b in zip(left, right)], lambda: array1 * array2),
+        "/": (lambda: [a / b for a, b in zip(left, right)], lambda: array1 / array2),
+        "<": (lambda: [float(a) < float(b) for a, b in zip(left, right)], lambda: array1 < array2),
+        "sum": (scalar_sum, small_array.sum),
+    }
+    results = {}
+    for name, (scalar, vectorised) in operations.items():
+        durations = []
+        for function in (scalar, vectorised):
+            start = time.perf_counter()
+            for _ in range(repetitions):
+                function()
+            durations.append((time.perf_counter() - start) / repetitions)
+        results[name] = tuple(durations)
+    return results
+
+
+def skewed_pairs(size:int, seed:int=0):
+    """Draw (numerator, denominator) pairs as produced by our aggregation jobs
+
+    Mostly halves, thirds, quarters and percentages (often not reduced, ex : 50/100), with a Zipf-like skew,
+    plus 5 % of arbitrary fractions too large to be interned.
+
+    PRE : size is a positive integer
+    POST : returns a list of size pairs
+    """
+    rng = random.Random(seed)
+    common = [(1, 2), (1, 3), (2, 3), (1, 4), (3, 4), (2, 4), (2, 6)] + [(k, 100) for k in range(101)]
+    weights = [1 / (rank + 1) for rank in range(len(common))]
+    pairs = rng.choices(common, weights, k=size)
+    for i in rng.sample(range(size), size // 20):
+        pairs[i] = (rng.randint(1, 10**6), rng.randint(1, 10**6))
+    return pairs
+
+
+def benchmark_intern(size:int):
+    """Compare the constructor with and without the intern table on a skewed distribution
+
+    PRE : size is a positive integer
+    POST : returns a dict {"without table" / "with table" : (bytes allocated for the fractions, constructions per second,
+           hit rate)}
+    """
+    pairs = skewed_pairs(size)
+    results = {}
+    for label, table_size in (("without table", 0), ("with table", TP9.INTERN_SIZE)):
+        TP9.configure_intern(size=table_size)
+        tracemalloc.start()
+        fractions = [Fraction(num, den) for num, den in pairs]
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del fractions
+
+        start = time.perf_counter()
+        for num, den in pairs:
+            Fraction(num, den)
+        duration = time.perf_counter() - start
+
+        info = TP9.intern_info()
+        hit_rate = info["hits"] / (info["hits"] + info["misses"]) if info["hits"] + info["misses"] else 0.0
+        results[label] = (allocated, size / duration, hit_rate)
+    TP9.configure_intern()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Performance measurements of the Fraction class")
+    parser.add_argument("benchmark", choices=["constructor", "harmonic", "array", "intern"], help="measurement to run")
+    parser.add_argument("--size", type=int, default=100_000, help="number of fractions")
+    parser.add_argument("--terms", type=int, default=100_000, help="terms of the harmonic sum")
+    parser.add_argument("--reference-terms", type=int, default=10_000, help="terms of the harmonic sum for the formula comparison")
+    args = parser.parse_args()
+
+    if args.benchmark == "constructor":
+        print(f"{'class':>15} | {'bytes/fraction':>14} | {'constructions/s':>15} | {'operations/s':>12}")
+        for name, (octets, construction, operations) in benchmark_constructor(args.size).items():
+            print(f"{name:>15} | {octets:>14.1f} | {construction:>15,.0f} | {operations:>12,.0f}")
+    elif args.benchmark == "harmonic":
+        print(f"{'sum':>19} | {'terms':>7} | {'time (s)':>8} | {'largest intermediate (bits)':>27} | {'denominator (bits)':>18}")
+        for label, (terms, seconds, largest, bits) in benchmark_harmonic(args.terms, args.reference_terms).items():
+            print(f"{label:>19} | {terms:>7} | {seconds:>8.2f} | {largest:>27} | {bits:>18}")
+    elif args.benchmark == "array":
+        print(f"{'operation':>10} | {'Fraction (ms)':>13} | {'FractionArray (ms)':>18} | {'speed-up':>8}")
+        for name, (scalar, vectorised) in benchmark_array(args.size).items():
+            print(f"{name:>10} | {scalar * 1e3:>13.2f} | {vectorised * 1e3:>18.2f} | {scalar / vectorised:>7.0f}x")
+    elif args.benchmark == "intern":
+        print(f"{'constructor':>13} | {'memory (MB)':>11} | {'constructions/s':>15} | {'hit rate':>8}")
+        for label, (allocated, throughput, hit_rate) in benchmark_intern(args.size).items():
+            print(f"{label:>13} | {allocated / 1e6:>11.1f} | {throughput:>15,.0f} | {hit_rate:>8.1%}")
+
+
+if __name__ == '__main__':
+    main()
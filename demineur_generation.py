@@ -0,0 +1,184 @@
+"""
+Génération de plateaux sans hasard : toute la partie se résout depuis le premier clic par déduction
+"""
+
+import random
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import demineur_modif as dm
+import demineur_solveur as ds
+
+MAX_REPAIRS = 400  # Déplacements de mines avant de repartir d'un nouveau tirage
+MAX_FRONTIER_MOVES = 10  # Déplacements à l'intérieur de la frontière (plus de case libre ailleurs) avant un nouveau tirage
+
+
+def _move_mine(board : dm.CompactBoard, source:int, destination:int):
+    """
+    Déplace une mine et met à jour les comptes des voisines des deux cases
+    """
+    table = dm.get_neighbor_table(board.n, board.m)
+    cells = board.cells
+    cells[source] &= ~dm.CASE_MINE
+    compte = 0
+    for d in table.offsets(source // board.n, source % board.n):
+        if cells[source + d] & dm.CASE_MINE:
+            compte += 1
+        else:
+            cells[source + d] -= 1
+    cells[source] = (cells[source] & ~dm.CASE_COMPTE) | compte
+    cells[destination] = (cells[destination] & ~dm.CASE_COMPTE) | dm.CASE_MINE
+    for d in table.offsets(destination // board.n, destination % board.n):
+        if not cells[destination + d] & dm.CASE_MINE:
+            cells[destination + d] += 1
+
+
+def solve_from_state(board : dm.CompactBoard, solver : ds.Solver, changed=None):
+    """
+    Joue toutes les cases sûres trouvées par le solveur, jusqu'à la fin ou jusqu'au blocage
+    Paramètres:
+        board (CompactBoard): plateau (mines connues du générateur, pas du solveur)
+        solver (Solver): solveur à jour des cases déjà dévoilées
+        changed (List[tuple[int, int]]): cases dévoilées depuis la dernière mise à jour du solveur (None : tout relire)
+    Returns:
+        bool: True si toutes les cases sans mine ont été dévoilées
+    """
+    solver.update(board, changed)
+    while solver.safe:
+        revealed = []
+        for idx in list(solver.safe):
+            solver.safe.discard(idx)
+            revealed.extend(dm.propagate_click(board, board, idx // board.n, idx % board.n))
+        solver.update(board, revealed)
+    return all(case & (dm.CASE_DEVOILEE | dm.CASE_MINE) for case in board.cells)
+
+
+def generate_no_guess(n:int, m:int, nbr_mines:int, first_pos_x:int, first_pos_y:int, rng=None, max_repairs:int=MAX_REPAIRS):
+    """
+    Génère un plateau compact qui se résout sans deviner depuis la case (first_pos_x, first_pos_y).
+    Quand le solveur est bloqué, une mine de la frontière indécidable est déplacée vers une case
+    cachée loin des cases dévoilées, puis la résolution reprend depuis l'état courant : les mines
+    déduites restent vraies, seuls les comptes des voisines de l'ancienne position sont relus.
+    Paramètres:
+        n (int): nombre de colonnes
+        m (int): nombre de lignes
+        nbr_mines (int): nombre de mines
+        first_pos_x (int): position en x du premier coup
+        first_pos_y (int): position en y du premier coup
+        rng (random.Random): générateur aléatoire
+        max_repairs (int): déplacements de mines autorisés avant un nouveau tirage
+    Returns:
+        Tuple[CompactBoard, List[tuple[int, int]]]: plateau (toutes cases cachées) et liste des mines
+    """
+    if rng is None:
+        rng = random.Random()
+    zone_depart = {first_pos_x * n + first_pos_y}
+    zone_depart.update(x * n + y for x, y in dm.get_neighbors(dm.CompactBoard(n, m), first_pos_x, first_pos_y))
+    while True:
+        board = dm.CompactBoard(n, m)
+        dm.place_mines(board, nbr_mines, first_pos_x, first_pos_y, rng=rng)
+        dm.fill_in_board(board)
+        solver = ds.Solver(n, m, nbr_mines)
+        changed = dm.propagate_click(board, board, first_pos_x, first_pos_y)
+        deplacements_frontiere = 0
+        for _ in range(max_repairs):
+            if solve_from_state(board, solver, changed):
+                board.cells[:] = bytes(case & (dm.CASE_MINE | dm.CASE_COMPTE) for case in board.cells)
+                mines = [divmod(idx, n) for idx, case in enumerate(board.cells) if case & dm.CASE_MINE]
+                return board, mines
+            changed, dans_frontiere = _repair(board, solver, zone_depart, rng, deplacements_frontiere < MAX_FRONTIER_MOVES)
+            if changed is None:
+                break
+            deplacements_frontiere += dans_frontiere
+        # Pas de réparation possible : nouveau tirage
+
+
+def _repair(board : dm.CompactBoard, solver : ds.Solver, zone_depart:set, rng, frontiere_permise:bool):
+    """
+    Déplace une mine qui bloque la résolution
+    Returns:
+        Tuple[List[tuple[int, int]], bool]: cases visibles modifiées (None si aucune mine ne peut être
+        déplacée) et True si la mine a été déplacée à l'intérieur de la frontière
+    """
+    n = board.n
+    cells = board.cells
+    table = dm.get_neighbor_table(n, board.m)
+    indecises = {v for idx in solver.frontier for v in solver._constraint(idx)[0]}
+    if not indecises:
+        return None, False
+    sources = [idx for idx in indecises if cells[idx] & dm.CASE_MINE]
+    if not sources:  # Cases indécises sans mine : on déplace une mine voisine encore inconnue du solveur
+        sources = [idx + d for idx in indecises for d in table.offsets(idx // n, idx % n)
+                   if cells[idx + d] & dm.CASE_MINE and solver.state[idx + d] == ds.INCONNUE]
+    destinations = []
+    for idx, case in enumerate(cells):
+        if case & (dm.CASE_MINE | dm.CASE_DEVOILEE) or idx in zone_depart or idx in indecises:
+            continue
+        if not any(cells[idx + d] & dm.CASE_DEVOILEE for d in table.offsets(idx // n, idx % n)):
+            destinations.append(idx)
+    dans_frontiere = not destinations
+    if dans_frontiere and frontiere_permise:
+        # Plus de case loin des cases dévoilées : la mine change de place dans la frontière
+        destinations = [idx for idx in indecises if not cells[idx] & dm.CASE_MINE and idx not in zone_depart]
+    if not sources or not destinations:
+        return None, False
+    source = rng.choice(sources)
+    destination = rng.choice(destinations)
+    _move_mine(board, source, destination)
+
+    # Les cases dévoilées voisines ont un nouveau compte (les mines déduites restent vraies)
+    changed = [divmod(destination + d, n) for d in table.offsets(destination // n, destination % n)
+               if cells[destination + d] & dm.CASE_DEVOILEE]
+    for d in table.offsets(source // n, source % n):
+        v = source + d
+        if cells[v] & dm.CASE_DEVOILEE:
+            changed.append(divmod(v, n))
+            if cells[v] & dm.CASE_COMPTE == 0:  # Compte tombé à 0 : les voisines sont dévoilées
+                for d2 in table.offsets(v // n, v % n):
+                    changed.extend(dm.propagate_click(board, board, (v + d2) // n, (v + d2) % n))
+    return changed, dans_frontiere
+
+
+def _generate_task(args):
+    n, m, nbr_mines, first_pos_x, first_pos_y, seed = args
+    return generate_no_guess(n, m, nbr_mines, first_pos_x, first_pos_y, rng=random.Random(seed))[1]
+
+
+def pregenerate(n:int, m:int, nbr_mines:int, first_pos_x:int, first_pos_y:int, count:int, workers:int=1, seed:int=0):
+    """
+    Génère plusieurs plateaux sans hasard, en parallèle sur un ProcessPoolExecutor
+    Returns:
+        List[List[tuple[int, int]]]: liste des mines de chaque plateau (dans l'ordre des graines)
+    """
+    taches = [(n, m, nbr_mines, first_pos_x, first_pos_y, f"{seed}-{i}") for i in range(count)]
+    if workers <= 1:
+        return list(map(_generate_task, taches))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_generate_task, taches, chunksize=max(1, count // (workers * 4))))
+
+
+class GenerationTestCase(unittest.TestCase):
+
+    def test_generated_board_is_solvable(self):
+        """Le plateau généré se résout sans deviner et respecte la zone de départ"""
+        for graine in range(5):
+            board, mines = generate_no_guess(16, 16, 40, 8, 8, rng=random.Random(graine))
+            self.assertEqual(len(mines), 40)
+            self.assertTrue(all(not board.is_revealed(x, y) for x in range(16) for y in range(16)))
+            for x, y in [(8, 8)] + dm.get_neighbors(board, 8, 8):
+                self.assertFalse(board.is_mine(x, y))
+            compteurs = dm.create_board(16, 16, 0)
+            for x, y in mines:
+                compteurs[x][y] = 'X '
+            dm.fill_in_board(compteurs)
+            self.assertEqual([[board.count(x, y) if not board.is_mine(x, y) else 'X ' for y in range(16)] for x in range(16)], compteurs)
+            solver = ds.Solver(16, 16, 40)
+            self.assertTrue(solve_from_state(board, solver, dm.propagate_click(board, board, 8, 8)))
+
+    def test_pregenerate_reproducible(self):
+        """Les plateaux pré-générés ne dépendent que de la graine"""
+        self.assertEqual(pregenerate(9, 9, 10, 4, 4, 3, workers=1, seed=1), pregenerate(9, 9, 10, 4, 4, 3, workers=2, seed=1))
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,214 @@
+"""
+Instrumentation optionnelle des fonctions chaudes du démineur : nombre d'appels, durée cumulée,
+centiles de latence et tailles de résultat (cases dévoilées par propagate_click...), exportables en JSON.
+
+Désactivée, elle ne coûte rien : le décorateur instrumented renvoie la fonction telle quelle.
+Elle s'active avant l'import (variable d'environnement DEMINEUR_PROFILE=1) ou en cours de route
+avec enable(), qui remplace les fonctions enregistrées dans leur module (disable() les remet).
+Avec DEMINEUR_PROFILE_OUT=fichier.json, le rapport est écrit à la fin du programme.
+"""
+
+import atexit
+import json
+import os
+import random
+import sys
+import time
+import unittest
+
+TAILLE_ECHANTILLON = 4096  # Latences gardées par fonction (échantillonnage par réservoir)
+CENTILES = (50, 90, 99)
+
+_registry = []  # (module, nom, fonction d'origine, mesure) de chaque fonction décorée
+_stats = {}  # nom -> CallStats
+_enabled = os.environ.get("DEMINEUR_PROFILE", "") not in ("", "0")
+
+
+class CallStats:
+    """
+    Statistiques d'une fonction : compteurs exacts, latences et tailles échantillonnées
+    """
+    __slots__ = ("calls", "total_ns", "samples", "size_total", "sizes", "rng")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.samples = []  # Durées en nanosecondes
+        self.size_total = 0
+        self.sizes = []  # Tailles de résultat (si la fonction a une mesure)
+        self.rng = random.Random(0)
+
+    def record(self, duree:int, taille:int=None):
+        self.calls += 1
+        self.total_ns += duree
+        if len(self.samples) < TAILLE_ECHANTILLON:
+            self.samples.append(duree)
+            if taille is not None:
+                self.sizes.append(taille)
+        else:
+            j = self.rng.randrange(self.calls)
+            if j < TAILLE_ECHANTILLON:
+                self.samples[j] = duree
+                if taille is not None:
+                    self.sizes[j] = taille
+        if taille is not None:
+            self.size_total += taille
+
+    def to_dict(self):
+        def centiles(valeurs):
+            valeurs = sorted(valeurs)
+            return {f"p{c}": valeurs[min(len(valeurs) - 1, len(valeurs) * c // 100)] for c in CENTILES} if valeurs else {}
+
+        resultat = {"calls": self.calls, "total_ms": self.total_ns / 1e6,
+                    "mean_us": self.total_ns / self.calls / 1e3 if self.calls else 0.0,
+                    "latency_us": {c: v / 1e3 for c, v in centiles(self.samples).items()}}
+        if self.sizes:
+            resultat["size_total"] = self.size_total
+            resultat["size"] = centiles(self.sizes)
+        return resultat
+
+
+def _wrap(func, nom:str, mesure):
+    stats = _stats.setdefault(nom, CallStats())
+    horloge = time.perf_counter_ns
+
+    if mesure is None:
+        def wrapper(*args, **kwargs):
+            debut = horloge()
+            resultat = func(*args, **kwargs)
+            stats.record(horloge() - debut)
+            return resultat
+    else:
+        def wrapper(*args, **kwargs):
+            debut = horloge()
+            resultat = func(*args, **kwargs)
+            stats.record(horloge() - debut, mesure(resultat))
+            return resultat
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+def instrumented(func=None, *, mesure=None):
+    """
+    Enregistre une fonction d'un module pour l'instrumentation (à placer au-dessus des autres décorateurs)
+    Paramètres:
+        func: fonction décorée
+        mesure: fonction qui donne la taille d'un résultat (ex. len pour les cases dévoilées)
+    Returns:
+        la fonction telle quelle si l'instrumentation est désactivée, sinon la fonction chronométrée
+    """
+    if func is None:
+        return lambda f: instrumented(f, mesure=mesure)
+    _registry.append((func.__module__, func.__name__, func, mesure))
+    return _wrap(func, func.__name__, mesure) if _enabled else func
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable():
+    """
+    Active l'instrumentation : les fonctions enregistrées sont remplacées dans leur module
+    (les références déjà copiées ailleurs, ex. from module import fonction, ne sont pas concernées)
+    """
+    global _enabled
+    if _enabled:
+        return
+    _enabled = True
+    for module, nom, func, mesure in _registry:
+        if module in sys.modules:
+            setattr(sys.modules[module], nom, _wrap(func, nom, mesure))
+
+
+def disable():
+    """
+    Désactive l'instrumentation : les fonctions d'origine sont remises (les statistiques sont gardées)
+    """
+    global _enabled
+    if not _enabled:
+        return
+    _enabled = False
+    for module, nom, func, _ in _registry:
+        if module in sys.modules:
+            setattr(sys.modules[module], nom, func)
+
+
+def reset():
+    """
+    Remet les statistiques à zéro
+    """
+    for stats in _stats.values():
+        stats.__init__()
+
+
+def report():
+    """
+    Returns:
+        dict: statistiques de chaque fonction appelée au moins une fois (voir CallStats.to_dict)
+    """
+    return {nom: stats.to_dict() for nom, stats in sorted(_stats.items()) if stats.calls}
+
+
+def export_json(destination):
+    """
+    Écrit le rapport en JSON dans un fichier (chemin ou fichier texte ouvert)
+    """
+    if isinstance(destination, (str, os.PathLike)):
+        with open(destination, "w", encoding="utf-8") as f:
+            json.dump(report(), f, indent=2)
+    else:
+        json.dump(report(), destination, indent=2)
+
+
+if os.environ.get("DEMINEUR_PROFILE_OUT"):
+    atexit.register(lambda: export_json(os.environ["DEMINEUR_PROFILE_OUT"]))
+
+
+class InstrumentationTestCase(unittest.TestCase):
+
+    def test_enable_and_disable(self):
+        """Activée, l'instrumentation compte les appels et les cases dévoilées ; désactivée, les fonctions sont d'origine"""
+        import io
+        import demineur_modif as dm
+
+        etait_active = is_enabled()
+        enable()
+        reset()
+        try:
+            self.assertTrue(hasattr(dm.propagate_click, "__wrapped__"))
+            session = dm.GameSession(9, 9, 10, rng=random.Random(1), compact=True)
+            revealed = session.reveal(4, 4).changed
+            dm.print_board(dm.create_board(3, 3))
+            rapport = report()
+            self.assertEqual(rapport["propagate_click"]["calls"], 1)
+            self.assertEqual(rapport["propagate_click"]["size_total"], len(revealed))
+            self.assertEqual(rapport["create_board"]["calls"], 1)
+            self.assertIn("p99", rapport["apply_move"]["latency_us"])
+            sortie = io.StringIO()
+            export_json(sortie)
+            self.assertEqual(json.loads(sortie.getvalue())["propagate_click"]["calls"], 1)
+        finally:
+            disable()
+        self.assertFalse(hasattr(dm.propagate_click, "__wrapped__"))
+        reset()
+        dm.GameSession(9, 9, 10, compact=True).reveal(4, 4)
+        self.assertEqual(report(), {})
+        if etait_active:
+            enable()
+
+    def test_reservoir(self):
+        """Au-delà de TAILLE_ECHANTILLON appels, les compteurs restent exacts et l'échantillon borné"""
+        stats = CallStats()
+        for i in range(3 * TAILLE_ECHANTILLON):
+            stats.record(i, 1)
+        self.assertEqual(stats.calls, 3 * TAILLE_ECHANTILLON)
+        self.assertEqual(stats.size_total, 3 * TAILLE_ECHANTILLON)
+        self.assertEqual(len(stats.samples), TAILLE_ECHANTILLON)
+        self.assertEqual(len(stats.sizes), TAILLE_ECHANTILLON)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
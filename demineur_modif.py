@@ -2,14 +2,33 @@
 Auteur: Hippolyte Amory
 """
 
+import collections
+import functools
+import itertools
 import random
 import sys
 import re
+import unittest
+
+from demineur_instrumentation import instrumented
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel : repli en Python pur
+    np = None
+
+# Encodage d'une case du plateau compact (un octet par case)
+CASE_COMPTE = 0x0F  # nombre de mines voisines (0 à 8)
+CASE_MINE = 0x10
+CASE_DEVOILEE = 0x20
+CASE_DRAPEAU = 0x40
+_MINE_TABLE = bytes(1 if octet & CASE_MINE else 0 for octet in range(256))  # Octet de case -> 1 si mine
 
 def validate_arguments(func):
     """
     S'assure que des données incorrectes ne sont pas transmises par accident lors d'appels internes
     """
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
         if len(args) >= 2:
             if not all(map(lambda x: isinstance(x, int), args[:2])):
@@ -22,6 +41,7 @@ def safe_execution(func):
     """
     Ajoute une gestion globale des exceptions dans une fonction
     """
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
         try:
             return func(*args, **kwargs)
@@ -30,6 +50,7 @@ def safe_execution(func):
     return wrapper
 
 
+@instrumented
 @validate_arguments
 @safe_execution
 def create_board(n:int, m:int, carac=". "):
@@ -45,69 +66,92 @@ def create_board(n:int, m:int, carac=". "):
     BOARD = [[carac]*n for i in range(m)]  # Par défaut game_board
     return BOARD
 
+@instrumented
 @safe_execution
 def print_board(board : list[list[str]]):
     """
-    Affiche le tableau
+    Affiche le tableau (une seule écriture sur la sortie standard)
     Paramètres :
         board (List[list[str]]): plateau de jeu
     """
+    sys.stdout.write(render_board(board))
 
-    TAILLE = get_size(board)
-    if TAILLE[0] <= 10 >= TAILLE[1]: # Si taille inférieure à 10*10
-        print("  ", end=" ")
-        for i in range(TAILLE[0]):
-            print(str(i)+" ", end = " ")
-        print()
-        print(" ", end=" ")
-        for j in range((TAILLE[0]-(TAILLE[0]//2))*2):
-            print("--", end ="-")
-        print()
-        for k in range(TAILLE[1]):
-            elem = str(k) + " |"
-            for l in range(TAILLE[0]):
-                elem += str(board[k][l]) + " "
-            print(elem + "|")
-        print(" ", end=" ")
-        for j in range((TAILLE[0]-(TAILLE[0]//2))*2):
-            print("--", end ="-")
-    else:   # Si taille supérieure à 10*10
-        n = str(TAILLE[0])
-        unite = int(n[1])  # Chiffre des unites
-        dizaine = int(n[0])  # Chiffre des dizaines
-        print("   "*10, end="    ")
-        for d in range(1, dizaine+1):
-            if d == dizaine:  # Dernière dizaine
-                print((str(d)+"  ")*unite, end='')
-            else:
-                print((str(d)+"  ")*10, end = "")
-        print()
-        print("   ", end=" ")
-        i = 0
-        v = i
-        while v < TAILLE[0]:
-            print(str(i)+" ", end = " ")
-            v += 1
-            i += 1
-            if i == 10:
-                i -= 10
-        print()
-        print("   ", end=" ")
-        for j in range((TAILLE[0]-(TAILLE[0]//2))*2):
-            print("--", end ="-")
-        print()
-        for k in range(TAILLE[1]):
-            if k < 10:
-                elem = " " +str(k) + " |"
-            else:
-                elem = str(k) + " |"
-            for l in range(TAILLE[0]):
-                elem += str(board[k][l]) + " "
-            print(elem + "|")
-        print("   ", end=" ")
-        for j in range((TAILLE[0]-(TAILLE[0]//2))*2):
-            print("--", end ="-")
-        
+
+def _board_lines(board : list[list[str]]):
+    """
+    Construit les lignes de l'affichage du plateau, quelle que soit sa largeur
+    Paramètres :
+        board (List[list[str]]): plateau de jeu (ou plateau compact)
+    Returns :
+        List[str]: en-têtes des colonnes (un chiffre par ligne d'en-tête), séparateurs et lignes du plateau
+    """
+    if isinstance(board, BitBoard):
+        board = board.to_compact()
+    if isinstance(board, CompactBoard):
+        board = board.to_lists()[0]
+    n = len(board[0])
+    m = len(board)
+    largeur = 1 if n <= 10 >= m else max(2, len(str(m - 1)))  # Largeur des numéros de ligne
+    lines = []
+    for p in range(len(str(n - 1)) - 1, -1, -1):  # Une ligne d'en-tête par chiffre, des dizaines... aux unités
+        puissance = 10 ** p
+        lines.append(" " * (largeur + 2) + "".join(f"{c // puissance % 10}  " if c >= puissance or p == 0 else "   "
+                                                  for c in range(n)))
+    separateur = " " * (largeur + 1) + "---" * ((n - (n // 2)) * 2)
+    lines.append(separateur)
+    for k, ligne in enumerate(board):
+        lines.append(f"{k:>{largeur}} |" + "".join([f"{case} " for case in ligne]) + "|")
+    lines.append(separateur)
+    return lines
+
+
+@instrumented
+def render_board(board : list[list[str]]):
+    """
+    Construit l'affichage complet du plateau en une seule chaîne (sans retour à la ligne final)
+    Paramètres :
+        board (List[list[str]]): plateau de jeu
+    Returns :
+        str: affichage du plateau
+    """
+    return "\n".join(_board_lines(board))
+
+
+class BoardRenderer:
+    """
+    Affichage incrémental : après une première image complète, seules les lignes modifiées sont
+    réécrites, en se déplaçant avec les séquences ANSI (le curseur doit être resté à la fin de l'image)
+    """
+
+    def __init__(self, out=None):
+        self.out = out if out is not None else sys.stdout
+        self.lines = None  # Lignes de la dernière image affichée
+
+    def frame(self, board : list[list[str]]):
+        """
+        Renvoie ce qu'il faut écrire pour passer de la dernière image à celle du plateau
+        """
+        lines = _board_lines(board)
+        if self.lines is None or len(lines) != len(self.lines):
+            self.lines = lines
+            return "\n".join(lines)
+        morceaux = ["\0337"]  # Sauvegarde du curseur (fin de l'image)
+        for i, (avant, apres) in enumerate(zip(self.lines, lines)):
+            if avant != apres:
+                morceaux.append(f"\0338\033[{len(lines) - 1 - i}A\r{apres}\033[K" if i < len(lines) - 1
+                                else f"\0338\r{apres}\033[K")
+        morceaux.append("\0338")
+        self.lines = lines
+        return "".join(morceaux) if len(morceaux) > 2 else ""
+
+    def draw(self, board : list[list[str]]):
+        """
+        Écrit la nouvelle image (ou seulement ses lignes modifiées) en un seul appel
+        """
+        self.out.write(self.frame(board))
+        self.out.flush()
+
+@instrumented
 @safe_execution
 def get_size(board: list[list[str]]):
     """
@@ -117,8 +161,427 @@ def get_size(board: list[list[str]]):
     Returns:
         Tuple(int, int): (nombre de colonnes, nombre de lignes)
     """
+    if isinstance(board, (CompactBoard, BitBoard)):
+        return (board.n, board.m)
     return (len(board[0]), len(board))
 
+
+class CompactBoard:
+    """
+    Plateau compact : un octet par case dans un bytearray à plat (indice = ligne * n + colonne).
+    Un même objet remplace game_board et reference_board, l'état de chaque case étant codé
+    par les bits CASE_COMPTE, CASE_MINE, CASE_DEVOILEE et CASE_DRAPEAU.
+    """
+    __slots__ = ("n", "m", "cells")
+
+    def __init__(self, n:int, m:int):
+        self.n = n  # nombre de colonnes
+        self.m = m  # nombre de lignes
+        self.cells = bytearray(n * m)  # Toutes les cases cachées, sans mine
+
+    def __len__(self):
+        return self.m
+
+    def __getitem__(self, ligne:int):
+        """
+        Renvoie une vue (memoryview) sur une ligne
+        """
+        if not 0 <= ligne < self.m:
+            raise IndexError(ligne)
+        return memoryview(self.cells)[ligne * self.n:(ligne + 1) * self.n]
+
+    def index(self, pos_x:int, pos_y:int):
+        return pos_x * self.n + pos_y
+
+    def is_mine(self, pos_x:int, pos_y:int):
+        return bool(self.cells[pos_x * self.n + pos_y] & CASE_MINE)
+
+    def is_revealed(self, pos_x:int, pos_y:int):
+        return bool(self.cells[pos_x * self.n + pos_y] & CASE_DEVOILEE)
+
+    def is_flagged(self, pos_x:int, pos_y:int):
+        return bool(self.cells[pos_x * self.n + pos_y] & CASE_DRAPEAU)
+
+    def count(self, pos_x:int, pos_y:int):
+        return self.cells[pos_x * self.n + pos_y] & CASE_COMPTE
+
+    def cell(self, pos_x:int, pos_y:int):
+        return self.cells[pos_x * self.n + pos_y]
+
+    def copy(self):
+        copie = CompactBoard.__new__(CompactBoard)
+        copie.n = self.n
+        copie.m = self.m
+        copie.cells = self.cells[:]
+        return copie
+
+    def set_cell(self, pos_x:int, pos_y:int, case:int):
+        self.cells[pos_x * self.n + pos_y] = case
+
+    def to_lists(self):
+        """
+        Convertit le plateau compact vers l'ancien format (listes de listes)
+        Returns:
+            Tuple[List[list[str]], List[list]]: game_board, reference_board
+        """
+        r = '\033[91m'  # rouge
+        b = '\033[0m'  # normal (blanc)
+        g = '\033[92m'  # vert
+        game_board = []
+        reference_board = []
+        for i in range(self.m):
+            ligne_jeu = []
+            ligne_ref = []
+            for case in self.cells[i * self.n:(i + 1) * self.n]:
+                ligne_ref.append('X ' if case & CASE_MINE else case & CASE_COMPTE)
+                if case & CASE_DRAPEAU:
+                    ligne_jeu.append(g+'F'+b+" ")
+                elif not case & CASE_DEVOILEE:
+                    ligne_jeu.append('. ')
+                elif case & CASE_MINE:
+                    ligne_jeu.append(r+'X'+b+" ")
+                else:
+                    ligne_jeu.append(f"{case & CASE_COMPTE} ")
+            game_board.append(ligne_jeu)
+            reference_board.append(ligne_ref)
+        return game_board, reference_board
+
+
+@instrumented
+@validate_arguments
+@safe_execution
+def create_compact_board(n:int, m:int):
+    """
+    Construit un plateau compact de taille n x m
+    Paramètres :
+        n (int): nombre de colonnes
+        m (int): nombre de lignes
+    Returns :
+        (CompactBoard): plateau servant à la fois de plateau de jeu et de plateau de reference
+    """
+    return CompactBoard(n, m)
+
+class BitBoard:
+    """
+    Plateau en entiers Python, un bit par case (bit ligne * n + colonne), pour les petits et moyens plateaux
+    (jusqu'à quelques milliers de cases). Comptes et propagation se font sur tout le plateau à la fois par
+    décalages et masques de bord ; le compte de chaque case est stocké en tranches de bits (bit k du compte
+    dans counts[k]). Les entiers étant immuables, copier ou hacher l'état d'une partie ne coûte que quelques
+    appels, quelle que soit la taille du plateau. Comme CompactBoard, un même objet sert de plateau de jeu
+    et de plateau de reference.
+    """
+    __slots__ = ("n", "m", "mines", "revealed", "flags", "counts", "zeros", "full", "not_first_col", "not_last_col")
+
+    def __init__(self, n:int, m:int):
+        self.n = n  # nombre de colonnes
+        self.m = m  # nombre de lignes
+        self.mines = 0
+        self.revealed = 0
+        self.flags = 0
+        self.counts = (0, 0, 0, 0)
+        self.full = (1 << (n * m)) - 1
+        self.zeros = self.full  # Cases sans mine ni mine voisine (tenu à jour par fill_in_board)
+        premiere_colonne = sum(1 << (x * n) for x in range(m))
+        self.not_first_col = self.full & ~premiere_colonne
+        self.not_last_col = self.full & ~(premiere_colonne << (n - 1))
+
+    def index(self, pos_x:int, pos_y:int):
+        return pos_x * self.n + pos_y
+
+    def is_mine(self, pos_x:int, pos_y:int):
+        return bool(self.mines >> (pos_x * self.n + pos_y) & 1)
+
+    def is_revealed(self, pos_x:int, pos_y:int):
+        return bool(self.revealed >> (pos_x * self.n + pos_y) & 1)
+
+    def is_flagged(self, pos_x:int, pos_y:int):
+        return bool(self.flags >> (pos_x * self.n + pos_y) & 1)
+
+    def count(self, pos_x:int, pos_y:int):
+        i = pos_x * self.n + pos_y
+        if self.mines >> i & 1:
+            return 0
+        c0, c1, c2, c3 = self.counts
+        return (c0 >> i & 1) | (c1 >> i & 1) << 1 | (c2 >> i & 1) << 2 | (c3 >> i & 1) << 3
+
+    def cell(self, pos_x:int, pos_y:int):
+        """
+        Renvoie l'octet de la case, codé comme dans CompactBoard
+        """
+        i = pos_x * self.n + pos_y
+        case = (self.revealed >> i & 1) * CASE_DEVOILEE | (self.flags >> i & 1) * CASE_DRAPEAU
+        if self.mines >> i & 1:
+            return case | CASE_MINE
+        return case | self.count(pos_x, pos_y)
+
+    def set_cell(self, pos_x:int, pos_y:int, case:int):
+        """
+        Enregistre les bits CASE_MINE, CASE_DEVOILEE et CASE_DRAPEAU d'une case (les comptes viennent de fill_in_board)
+        """
+        bit = 1 << (pos_x * self.n + pos_y)
+        self.mines = self.mines | bit if case & CASE_MINE else self.mines & ~bit
+        self.revealed = self.revealed | bit if case & CASE_DEVOILEE else self.revealed & ~bit
+        self.flags = self.flags | bit if case & CASE_DRAPEAU else self.flags & ~bit
+
+    def shifts(self, bits:int):
+        """
+        Renvoie les 8 masques décalés : bit i de chacun = bit du voisin de i dans une direction (0 hors du plateau)
+        """
+        n, full = self.n, self.full
+        ouest = (bits << 1) & self.not_first_col
+        est = (bits >> 1) & self.not_last_col
+        return (ouest, est, (ouest << n) & full, (bits << n) & full, (est << n) & full, ouest >> n, bits >> n, est >> n)
+
+    def dilate(self, bits:int):
+        """
+        Étend un masque à toutes les voisines de ses cases (dilatation 3x3)
+        """
+        ligne = bits | (bits << 1) & self.not_first_col | (bits >> 1) & self.not_last_col
+        return ligne | (ligne << self.n) & self.full | ligne >> self.n
+
+    def positions(self, bits:int):
+        """
+        Renvoie les cases (ligne, colonne) d'un masque, dans l'ordre des indices
+        """
+        chiffres = bin(bits)[:1:-1]
+        positions = []
+        i = chiffres.find("1")
+        while i >= 0:
+            positions.append(divmod(i, self.n))
+            i = chiffres.find("1", i + 1)
+        return positions
+
+    def state(self):
+        """
+        Renvoie l'état de la partie (hachable, sans copie)
+        """
+        return (self.mines, self.revealed, self.flags)
+
+    def copy(self):
+        copie = BitBoard.__new__(BitBoard)
+        for attribut in BitBoard.__slots__:
+            setattr(copie, attribut, getattr(self, attribut))
+        return copie
+
+    def to_compact(self):
+        compact = CompactBoard(self.n, self.m)
+        compact.cells[:] = bytes(self.cell(x, y) for x in range(self.m) for y in range(self.n))
+        return compact
+
+
+@validate_arguments
+@safe_execution
+def create_bitboard(n:int, m:int):
+    """
+    Construit un plateau en entiers (un bit par case) de taille n x m
+    Paramètres :
+        n (int): nombre de colonnes
+        m (int): nombre de lignes
+    Returns :
+        (BitBoard): plateau servant à la fois de plateau de jeu et de plateau de reference
+    """
+    return BitBoard(n, m)
+
+
+# En dessous, une zone sans mine peut se propager sans fin sur un plateau infini : les cases à 0 (aucune mine
+# parmi 9 cases, probabilité (1 - d) ** 9) percolent en 8-connexité vers d = 0.095. À 0.15, un clic reste local.
+DENSITE_MIN_INFINIE = 0.15
+
+
+class ChunkedBoard:
+    """
+    Plateau découpé en blocs carrés générés à la demande, très grand ou infini (n et m à None).
+    Les mines d'un bloc ne dépendent que de la graine et des coordonnées du bloc : mines et comptes
+    sont gardés dans des caches LRU, évincés puis régénérés à l'identique au besoin. Seuls les
+    bits du joueur (CASE_DEVOILEE, CASE_DRAPEAU) des blocs où il a joué sont conservés : la mémoire
+    suit la zone dévoilée et non la taille du plateau. Comme CompactBoard, un même objet sert de
+    plateau de jeu et de plateau de reference (cell renvoie les bits CASE_* d'une case).
+    """
+    __slots__ = ("seed", "density", "n", "m", "chunk_size", "cache_size", "safe_zone", "state", "_masks", "_chunks")
+
+    def __init__(self, seed, density:float, n:int=None, m:int=None, chunk_size:int=32, cache_size:int=256):
+        """
+        Paramètres:
+            seed: graine du plateau (avec les coordonnées d'un bloc, elle fixe ses mines)
+            density (float): proportion de mines de chaque bloc
+            n (int): nombre de colonnes (None : plateau infini)
+            m (int): nombre de lignes (None : plateau infini)
+            chunk_size (int): côté d'un bloc
+            cache_size (int): nombre de blocs gardés en cache
+        """
+        if not 0 <= density < 1:
+            raise ValueError("La proportion de mines doit être comprise entre 0 et 1.")
+        if (n is None) != (m is None):
+            raise ValueError("Un plateau est infini dans les deux dimensions ou dans aucune.")
+        if n is None and density < DENSITE_MIN_INFINIE:
+            raise ValueError(f"Un plateau infini demande au moins {DENSITE_MIN_INFINIE:.0%} de mines.")
+        self.seed = seed
+        self.density = density
+        self.n = n  # nombre de colonnes
+        self.m = m  # nombre de lignes
+        self.chunk_size = chunk_size
+        self.cache_size = cache_size
+        self.safe_zone = frozenset()  # Cases sans mine autour du premier clic
+        self.state = {}  # (bloc x, bloc y) -> bits du joueur, un octet par case
+        self._masks = collections.OrderedDict()  # (bloc x, bloc y) -> 1 pour une mine, 0 sinon
+        self._chunks = collections.OrderedDict()  # (bloc x, bloc y) -> CASE_MINE ou compte de chaque case
+
+    def __contains__(self, pos):
+        return self.n is None or (0 <= pos[0] < self.m and 0 <= pos[1] < self.n)
+
+    def set_safe_zone(self, pos_x:int, pos_y:int):
+        """
+        Retire des tirages la case du premier clic et ses voisines (à appeler avant le premier dévoilement)
+        """
+        self.safe_zone = frozenset((pos_x + dx, pos_y + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+        self._masks.clear()
+        self._chunks.clear()
+
+    def total_mines(self):
+        """
+        Renvoie le nombre de mines d'un plateau borné, sans générer ses blocs (None si le plateau est infini)
+        """
+        if self.n is None:
+            return None
+        s = self.chunk_size
+        total = 0
+        for hauteur, nbr_lignes in ((s, self.m // s), (self.m % s, 1)):
+            for largeur, nbr_colonnes in ((s, self.n // s), (self.n % s, 1)):
+                total += nbr_lignes * nbr_colonnes * round(self.density * hauteur * largeur)
+        return total
+
+    def _lru(self, cache, cle, construire):
+        valeur = cache.get(cle)
+        if valeur is None:
+            valeur = cache[cle] = construire(*cle)
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(cle)
+        return valeur
+
+    def _build_mask(self, bloc_x:int, bloc_y:int):
+        """
+        Tire les mines d'un bloc : round(density * cases du bloc dans le plateau), hors zone de départ
+        """
+        s = self.chunk_size
+        x0, y0 = bloc_x * s, bloc_y * s
+        lignes = range(s) if self.m is None else range(max(0, -x0), max(0, min(s, self.m - x0)))
+        colonnes = range(s) if self.n is None else range(max(0, -y0), max(0, min(s, self.n - y0)))
+        if len(lignes) == len(colonnes) == s:
+            candidates = range(s * s)
+        else:
+            candidates = [lx * s + ly for lx in lignes for ly in colonnes]
+        nbr_cases = len(candidates)
+        if any(x // s == bloc_x and y // s == bloc_y for x, y in self.safe_zone):
+            candidates = [i for i in candidates if (x0 + i // s, y0 + i % s) not in self.safe_zone]
+        mask = bytearray(s * s)
+        rng = random.Random(f"{self.seed}:{bloc_x}:{bloc_y}")
+        for i in rng.sample(candidates, min(len(candidates), round(self.density * nbr_cases))):
+            mask[i] = 1
+        return mask
+
+    def _build_chunk(self, bloc_x:int, bloc_y:int):
+        """
+        Calcule mines et comptes d'un bloc à partir de son masque bordé d'une case de chacun de ses voisins
+        """
+        s = self.chunk_size
+        masks = [[self._lru(self._masks, (bloc_x + dx, bloc_y + dy), self._build_mask) for dy in (-1, 0, 1)]
+                 for dx in (-1, 0, 1)]
+        padded = []
+        for lignes, (gauche, centre, droite) in zip(([s - 1], range(s), [0]), masks):
+            for lx in lignes:
+                padded.append([gauche[lx * s + s - 1], *centre[lx * s:(lx + 1) * s], droite[lx * s]])
+        counts = neighbor_counts(padded)
+        mask = masks[1][1]
+        return bytes(CASE_MINE if mask[lx * s + ly] else counts[lx + 1][ly + 1] for lx in range(s) for ly in range(s))
+
+    def cell(self, pos_x:int, pos_y:int):
+        s = self.chunk_size
+        cle = (pos_x // s, pos_y // s)
+        i = pos_x % s * s + pos_y % s
+        etat = self.state.get(cle)
+        return self._lru(self._chunks, cle, self._build_chunk)[i] | (etat[i] if etat is not None else 0)
+
+    def set_cell(self, pos_x:int, pos_y:int, case:int):
+        """
+        Enregistre les bits du joueur d'une case (les mines et les comptes ne dépendent que de la graine)
+        """
+        s = self.chunk_size
+        cle = (pos_x // s, pos_y // s)
+        etat = self.state.get(cle)
+        if etat is None:
+            etat = self.state[cle] = bytearray(s * s)
+        etat[pos_x % s * s + pos_y % s] = case & (CASE_DEVOILEE | CASE_DRAPEAU)
+
+    def is_mine(self, pos_x:int, pos_y:int):
+        return bool(self.cell(pos_x, pos_y) & CASE_MINE)
+
+    def is_revealed(self, pos_x:int, pos_y:int):
+        return bool(self.cell(pos_x, pos_y) & CASE_DEVOILEE)
+
+    def is_flagged(self, pos_x:int, pos_y:int):
+        return bool(self.cell(pos_x, pos_y) & CASE_DRAPEAU)
+
+    def count(self, pos_x:int, pos_y:int):
+        return self.cell(pos_x, pos_y) & CASE_COMPTE
+
+    def neighbors(self, pos_x:int, pos_y:int):
+        return [(pos_x + dx, pos_y + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                if (dx or dy) and (pos_x + dx, pos_y + dy) in self]
+
+    def window(self, pos_x:int, pos_y:int, lignes:int, colonnes:int):
+        """
+        Copie une fenêtre du plateau (coin supérieur gauche en (pos_x, pos_y)) dans un CompactBoard,
+        pour l'afficher ou la donner au solveur
+        """
+        fenetre = CompactBoard(colonnes, lignes)
+        fenetre.cells[:] = bytes(self.cell(pos_x + i, pos_y + j) for i in range(lignes) for j in range(colonnes))
+        return fenetre
+
+
+class NeighborTable:
+    """
+    Table des voisins précalculée pour une taille de plateau.
+    Chaque ligne (resp. colonne) appartient à une classe selon les décalages -1/0/+1 qui restent dans
+    le plateau ; les décalages des voisins d'une case ne dépendent que du couple de classes et sont
+    stockés une seule fois sous forme de tuples (décalages à plat et décalages (dx, dy)).
+    """
+    __slots__ = ("n", "m", "row_class", "col_class", "deltas", "deltas_xy")
+
+    def __init__(self, n:int, m:int):
+        self.n = n  # nombre de colonnes
+        self.m = m  # nombre de lignes
+        classes_lignes = {}
+        classes_colonnes = {}
+        self.row_class = bytes(classes_lignes.setdefault(tuple(d for d in (-1, 0, 1) if 0 <= x + d < m), len(classes_lignes))
+                               for x in range(m))
+        self.col_class = bytes(classes_colonnes.setdefault(tuple(d for d in (-1, 0, 1) if 0 <= y + d < n), len(classes_colonnes))
+                               for y in range(n))
+        self.deltas_xy = [[tuple((dx, dy) for dx in dxs for dy in dys if dx or dy) for dys in classes_colonnes]
+                          for dxs in classes_lignes]
+        self.deltas = [[tuple(dx * n + dy for dx, dy in paires) for paires in ligne] for ligne in self.deltas_xy]
+
+    def offsets(self, pos_x:int, pos_y:int):
+        """
+        Renvoie, sans allocation, le tuple des décalages à plat des voisins de la case (à ajouter à son indice)
+        """
+        return self.deltas[self.row_class[pos_x]][self.col_class[pos_y]]
+
+
+@functools.lru_cache(maxsize=32)
+def get_neighbor_table(n:int, m:int):
+    """
+    Renvoie la table des voisins d'un plateau de taille n x m (construite une seule fois par taille)
+    Paramètres:
+        n (int): nombre de colonnes
+        m (int): nombre de lignes
+    Returns:
+        NeighborTable: table des voisins
+    """
+    return NeighborTable(n, m)
+
+
 def get_neighbors(board : list[list[str]], pos_x:int, pos_y:int):
     """
     Renvoie une liste de cases (tuples) voisines à la case actuelle
@@ -129,33 +592,17 @@ def get_neighbors(board : list[list[str]], pos_x:int, pos_y:int):
     Returns:
         List[tuples]: coordonnées des cases voisines
     """
-    m = len(board)-1
-    n = len(board[0])-1
-    if pos_x == 0:  # Première ligne
-        if pos_y == 0:  # Coin supérieur gauche
-            tuples = [(0,1), (1,0), (1,1)]
-        elif pos_y == n:  # Coin supérieur droit
-            tuples = [(0, n-1), (1, n), (1, n-1)]
-        else:
-            tuples = [(0, pos_y-1), (1, pos_y-1), (1, pos_y), (1, pos_y+1), (0, pos_y+1)]
-    elif pos_y == 0:  # Première colonne
-        if pos_x == m:  # Coin inférieur gauche
-            tuples = [(m-1, 0), (m-1, 1), (m, 1)]
-        else:
-            tuples = [(pos_x-1, 0), (pos_x-1, 1), (pos_x, 1), (pos_x+1, 1), (pos_x+1, 0)]
-    elif pos_x == m:  # Dernière ligne
-        if pos_y == n:  # Coin inférieur droit
-            tuples = [(m-1, n), (m-1, n-1), (m, n-1)]
-        else:
-            tuples = [(m, pos_y-1), (m-1, pos_y-1), (m-1, pos_y), (m-1, pos_y+1), (m, pos_y+1)]
-    elif pos_y == n:  # Dernière colonne
-        tuples = [(pos_x-1, n), (pos_x-1, n-1), (pos_x, n-1), (pos_x+1, n-1), (pos_x+1, n)]
-    else: 
-        tuples = [(pos_x-1, pos_y-1), (pos_x-1, pos_y), (pos_x-1, pos_y+1), (pos_x, pos_y-1), (pos_x, pos_y+1), (pos_x+1, pos_y-1), (pos_x+1, pos_y), (pos_x+1, pos_y+1)]
-    return tuples
+    if isinstance(board, ChunkedBoard):
+        return board.neighbors(pos_x, pos_y)
+    if isinstance(board, (CompactBoard, BitBoard)):
+        table = get_neighbor_table(board.n, board.m)
+    else:
+        table = get_neighbor_table(len(board[0]), len(board))
+    return [(pos_x + dx, pos_y + dy) for dx, dy in table.deltas_xy[table.row_class[pos_x]][table.col_class[pos_y]]]
 
 
-def place_mines(reference_board : list[list[str]], nbr_mines:int, first_pos_x:int, first_pos_y:int):
+@instrumented
+def place_mines(reference_board : list[list[str]], nbr_mines:int, first_pos_x:int, first_pos_y:int, rng=None, rejection:bool=False):
     """
     Place des mines aléatoirement sur le plateau après le 1er tour
     Paramètres:
@@ -163,6 +610,8 @@ def place_mines(reference_board : list[list[str]], nbr_mines:int, first_pos_x:in
         nbr_mines (int): nombre de mines
         first_pos_x (int): position en x du premier coup
         first_pos_y (int): position en y du premier coup
+        rng (random.Random): générateur aléatoire (module random par défaut), pour des parties reproductibles
+        rejection (bool): ancien tirage par rejet au lieu d'un tirage sans remise de nbr_mines cases
     Returns:
         List[tuples] : liste des mines
     """
@@ -172,81 +621,373 @@ def place_mines(reference_board : list[list[str]], nbr_mines:int, first_pos_x:in
     TAILLE = get_size(reference_board)
     NBR_LIGNES = TAILLE[1]
     NBR_COLONNES = TAILLE[0]
+    if rng is None:
+        rng = random
+
+    COMPACT = isinstance(reference_board, CompactBoard)
 
     def mine_positions():
         """
         Générateur de mines
         """
         while True:
-            x = random.randint(0, NBR_LIGNES - 1)
-            y = random.randint(0, NBR_COLONNES - 1)
-            if (x, y) not in SANS_MINES and reference_board[x][y] != 'X ':
+            x = rng.randint(0, NBR_LIGNES - 1)
+            y = rng.randint(0, NBR_COLONNES - 1)
+            if (x, y) not in SANS_MINES and not deja_mine(x, y):
                 yield (x, y)
 
+    def deja_mine(x, y):
+        if COMPACT or isinstance(reference_board, BitBoard):
+            return reference_board.is_mine(x, y)
+        return reference_board[x][y] == 'X '
+
+    def existing_mines():
+        """
+        Indices des cases qui ont déjà une mine (plateau partiellement miné)
+        """
+        if COMPACT:
+            masque = reference_board.cells.translate(_MINE_TABLE)
+            indices = set()
+            idx = masque.find(1)
+            while idx != -1:
+                indices.add(idx)
+                idx = masque.find(1, idx + 1)
+            return indices
+        if isinstance(reference_board, BitBoard):
+            return {x * NBR_COLONNES + y for x, y in reference_board.positions(reference_board.mines)}
+        return {x * NBR_COLONNES + y for x, ligne in enumerate(reference_board) if 'X ' in ligne
+                for y, case in enumerate(ligne) if case == 'X '}
+
+    def sampled_positions():
+        """
+        Tire exactement nbr_mines cases distinctes hors de la zone de départ et des mines déjà posées.
+        Sur un plateau sans mine (cas de init_game), en O(nbr_mines) ; si le tirage tombe sur trop de mines
+        existantes, le plateau est parcouru (O(cases)) pour les exclure d'un nouveau tirage.
+        """
+        nbr_cases = NBR_LIGNES * NBR_COLONNES
+        sans_mines = {x * NBR_COLONNES + y for x, y in SANS_MINES}
+        # Les premières cases autorisées d'un tirage sans remise restent un tirage uniforme sans remise
+        tirage = [idx for idx in rng.sample(range(nbr_cases), min(nbr_cases, nbr_mines + len(sans_mines)))
+                  if idx not in sans_mines and not deja_mine(*divmod(idx, NBR_COLONNES))]
+        if len(tirage) < nbr_mines:
+            interdites = sans_mines | existing_mines()
+            if nbr_mines > nbr_cases - len(interdites):
+                raise ValueError("Trop de mines pour la taille du plateau.")
+            tirage = [idx for idx in rng.sample(range(nbr_cases), nbr_mines + len(interdites)) if idx not in interdites]
+        for idx in tirage:
+            yield divmod(idx, NBR_COLONNES)
+
     mines = []
-    for x, y in mine_positions():
+    for x, y in (mine_positions() if rejection else sampled_positions()):
         if len(mines) == nbr_mines:
             break
         mines.append((x, y))
-        reference_board[x][y] = 'X '  # Placement de la mine dans le plateau de reference
+        if COMPACT:
+            reference_board.cells[reference_board.index(x, y)] |= CASE_MINE
+        elif isinstance(reference_board, BitBoard):
+            reference_board.mines |= 1 << reference_board.index(x, y)
+        else:
+            reference_board[x][y] = 'X '  # Placement de la mine dans le plateau de reference
 
     return mines
 
-def fill_in_board(reference_board : list[list[str]]):
+@instrumented
+def set_mines(reference_board : list[list[str]], mines : list[tuple[int, int]]):
+    """
+    Place des mines déjà choisies (réserve, sauvegarde...) sur un plateau de reference vierge et calcule les comptes
+    Paramètres:
+        reference_board (List[list[str]]): plateau de reference
+        mines (List[tuple[int, int]]): liste des mines
+    """
+    for x, y in mines:
+        if isinstance(reference_board, CompactBoard):
+            reference_board.cells[reference_board.index(x, y)] |= CASE_MINE
+        elif isinstance(reference_board, BitBoard):
+            reference_board.mines |= 1 << reference_board.index(x, y)
+        else:
+            reference_board[x][y] = 'X '
+    fill_in_board(reference_board)
+
+
+@instrumented
+def fill_in_board(reference_board : list[list[str]], batched:bool=True):
     """
     Calcul du nombre de mines présentes dans le voisinage de chaque case
     Paramètres:
         reference_board (List[list[str]]): plateau de reference
+        batched (bool): calcule tous les comptes en une passe (NumPy si disponible), sinon case par case
     """
+    if isinstance(reference_board, BitBoard):
+        _fill_in_bitboard(reference_board)
+        return
+    if isinstance(reference_board, CompactBoard):
+        if batched:
+            _fill_in_compact_board_batched(reference_board)
+        else:
+            _fill_in_compact_board(reference_board)
+        return
+    if batched:
+        mask = [[1 if case == 'X ' else 0 for case in ligne] for ligne in reference_board]
+        counts = neighbor_counts(mask)
+        for ligne, compte in zip(reference_board, counts):
+            ligne[:] = ['X ' if case == 'X ' else case + c for case, c in zip(ligne, compte)]
+        return
+    table = get_neighbor_table(len(reference_board[0]), len(reference_board))
     for i in range(len(reference_board)):  # i == n° de ligne
         for j in range(len(reference_board[0])):  # j == n° de colonne
             if reference_board[i][j] == 'X ':
-                vois = get_neighbors(reference_board, i, j)
-                for case in vois:  # case est une case voisine à la case actuelle à chaque itération
-                    if reference_board[case[0]][case[1]] != 'X ':
-                        reference_board[case[0]][case[1]] += 1
-    
+                for dx, dy in table.deltas_xy[table.row_class[i]][table.col_class[j]]:  # décalage vers une case voisine
+                    if reference_board[i + dx][j + dy] != 'X ':
+                        reference_board[i + dx][j + dy] += 1
+
+
+def neighbor_counts(mask):
+    """
+    Calcule en une passe le nombre de mines voisines de chaque case par sommation de tranches décalées
+    Paramètres:
+        mask (List[list[int]]): 1 pour une mine, 0 sinon
+    Returns:
+        List[list[int]]: nombre de mines voisines (la case elle-même n'est pas comptée)
+    """
+    if np is not None:
+        return _neighbor_counts_numpy(np.asarray(mask, dtype=np.uint8)).tolist()
+
+    # Somme horizontale sur 3 colonnes (case comprise), puis somme verticale sur 3 lignes
+    horiz = [[g + c + d for g, c, d in zip([0] + ligne[:-1], ligne, ligne[1:] + [0])] for ligne in mask]
+    zero = [0] * (len(mask[0]) if mask else 0)
+    counts = []
+    for i, ligne in enumerate(mask):
+        haut = horiz[i - 1] if i > 0 else zero
+        bas = horiz[i + 1] if i < len(mask) - 1 else zero
+        counts.append([h + c + b - s for h, c, b, s in zip(haut, horiz[i], bas, ligne)])
+    return counts
+
+
+def _neighbor_counts_numpy(mask):
+    """
+    Somme des 8 tranches décalées d'un masque NumPy (uint8) bordé de zéros
+    """
+    p = np.pad(mask, 1)
+    return (p[:-2, :-2] + p[:-2, 1:-1] + p[:-2, 2:] + p[1:-1, :-2]
+            + p[1:-1, 2:] + p[2:, :-2] + p[2:, 1:-1] + p[2:, 2:])
+
+
+def _fill_in_compact_board(board : CompactBoard):
+    """
+    Version de fill_in_board pour un plateau compact : le compte est stocké dans les 4 bits de poids faible
+    """
+    cells = board.cells
+    table = get_neighbor_table(board.n, board.m)
+    for idx, case in enumerate(cells):
+        if case & CASE_MINE:
+            for d in table.offsets(idx // board.n, idx % board.n):
+                if not cells[idx + d] & CASE_MINE:
+                    cells[idx + d] += 1
+
 
-def propagate_click(game_board : list[list[str]], reference_board : list[list[str]], pos_x:int, pos_y:int):
+def _fill_in_compact_board_batched(board : CompactBoard):
+    """
+    Version de fill_in_board en une passe pour un plateau compact
+    """
+    n = board.n
+    cells = board.cells
+    if np is not None:
+        grille = np.frombuffer(cells, dtype=np.uint8).reshape(board.m, n)
+        mines = (grille & CASE_MINE) >> 4
+        grille += np.where(mines, 0, _neighbor_counts_numpy(mines)).astype(np.uint8)
+        return
+    mask = [[(case & CASE_MINE) >> 4 for case in cells[i * n:(i + 1) * n]] for i in range(board.m)]
+    compte = bytes(c for ligne in neighbor_counts(mask) for c in ligne)
+    for idx, case in enumerate(cells):
+        if not case & CASE_MINE:
+            cells[idx] = case + compte[idx]
+
+
+def _fill_in_bitboard(board : BitBoard):
+    """
+    Version de fill_in_board pour un plateau en entiers : les 8 masques décalés des mines sont additionnés
+    par un additionneur en tranches de bits (4 bits de compte par case)
+    """
+    compte = [0, 0, 0, 0]
+    for retenue in board.shifts(board.mines):
+        for k in range(4):
+            compte[k], retenue = compte[k] ^ retenue, compte[k] & retenue
+            if not retenue:
+                break
+    board.counts = tuple(compte)
+    board.zeros = board.full & ~(compte[0] | compte[1] | compte[2] | compte[3] | board.mines)
+
+
+@instrumented(mesure=len)  # Cases dévoilées par clic
+def propagate_click(game_board : list[list[str]], reference_board : list[list[str]], pos_x:int, pos_y:int, counters=None):
     """
     Dévoile toutes les cases adjacentes à celle sur laquelle on a cliqué par itération.
+    Une case est dévoilée dès qu'elle est ajoutée à la file : le plateau de jeu sert de marquage des
+    cases visitées et chaque case n'est empilée qu'une seule fois.
     Paramètres:
         game_board (List[list[str]]): plateau de jeu
         reference_board (List[list[str]]): plateau de reference
         pos_x (int): position en x de la case actuelle
         pos_y (int): position en y de la case actuelle
+        counters (GameCounters): compteurs de la partie à mettre à jour (optionnel)
+    Returns:
+        List[tuple[int, int]]: cases nouvellement dévoilées (sans doublon)
     """
+    return propagate_cells(game_board, reference_board, [(pos_x, pos_y)], counters)
 
-    def neighbors_to_explore(x, y):
-        """
-        Générateur utilisé pour gérer les cases à explorer
-        """
-        for nx, ny in get_neighbors(reference_board, x, y):
-            if game_board[nx][ny] == '. ':
-                yield nx, ny
 
-    stack = [(pos_x, pos_y)]
+def propagate_cells(game_board : list[list[str]], reference_board : list[list[str]], cells : list[tuple[int, int]], counters=None):
+    """
+    Version de propagate_click à plusieurs cases de départ, en une seule passe : les zones qui se
+    recouvrent ne sont parcourues qu'une fois. Les cases de départ déjà dévoilées, sous un flag ou
+    minées sont ignorées.
+    Paramètres:
+        game_board (List[list[str]]): plateau de jeu
+        reference_board (List[list[str]]): plateau de reference
+        cells (List[tuple[int, int]]): cases de départ
+        counters (GameCounters): compteurs de la partie à mettre à jour (optionnel)
+    Returns:
+        List[tuple[int, int]]: cases nouvellement dévoilées (sans doublon)
+    """
+    if isinstance(game_board, (CompactBoard, ChunkedBoard, BitBoard)):
+        if isinstance(game_board, CompactBoard):
+            revealed = _propagate_compact(game_board, cells)
+        elif isinstance(game_board, BitBoard):
+            revealed = _propagate_bitboard(game_board, cells)
+        else:
+            revealed = _propagate_chunked(game_board, cells)
+        if counters is not None:
+            counters.hidden -= len(revealed)
+        return revealed
+
+    table = get_neighbor_table(len(game_board[0]), len(game_board))
+    revealed = []
+    stack = []
+    for pos_x, pos_y in cells:
+        if game_board[pos_x][pos_y] != '. ' or reference_board[pos_x][pos_y] == 'X ':
+            continue
+        game_board[pos_x][pos_y] = f"{reference_board[pos_x][pos_y]} "
+        revealed.append((pos_x, pos_y))
+        if reference_board[pos_x][pos_y] == 0:
+            stack.append((pos_x, pos_y))
 
     while stack:
         cx, cy = stack.pop()
-        if game_board[cx][cy] != '. ':
+        # Les voisins d'une case 0 ne sont jamais des mines
+        for dx, dy in table.deltas_xy[table.row_class[cx]][table.col_class[cy]]:
+            nx, ny = cx + dx, cy + dy
+            if game_board[nx][ny] == '. ':
+                compte = reference_board[nx][ny]
+                game_board[nx][ny] = f"{compte} "
+                revealed.append((nx, ny))
+                if compte == 0:
+                    stack.append((nx, ny))
+
+    if counters is not None:
+        counters.hidden -= len(revealed)
+    return revealed
+
+
+def _propagate_compact(board : CompactBoard, seeds : list[tuple[int, int]]):
+    """
+    Version de propagate_cells pour un plateau compact (le plateau de jeu et de reference ne font qu'un),
+    sur des indices à plat et avec le bit CASE_DEVOILEE comme marquage des cases visitées
+    """
+    cells = board.cells
+    n = board.n
+    table = get_neighbor_table(n, board.m)
+    revealed = []
+    stack = []
+    for pos_x, pos_y in seeds:
+        idx = pos_x * n + pos_y
+        case = cells[idx]
+        if case & (CASE_DEVOILEE | CASE_DRAPEAU | CASE_MINE):
             continue
+        cells[idx] = case | CASE_DEVOILEE
+        revealed.append(idx)
+        if case & CASE_COMPTE == 0:
+            stack.append(idx)
+
+    while stack:
+        idx = stack.pop()
+        for d in table.offsets(idx // n, idx % n):
+            case = cells[idx + d]
+            if not case & (CASE_DEVOILEE | CASE_DRAPEAU):
+                cells[idx + d] = case | CASE_DEVOILEE
+                revealed.append(idx + d)
+                if case & CASE_COMPTE == 0:
+                    stack.append(idx + d)
+
+    return [divmod(idx, n) for idx in revealed]
 
-        if reference_board[cx][cy] == 'X ':
+
+def _propagate_bitboard(board : BitBoard, seeds : list[tuple[int, int]]):
+    """
+    Version de propagate_cells pour un plateau en entiers : dilatations successives de la zone depuis
+    ses cases à 0 (une dilatation par niveau du parcours en largeur, sur tout le plateau à la fois)
+    """
+    zone = 0
+    for pos_x, pos_y in seeds:
+        zone |= 1 << (pos_x * board.n + pos_y)
+    zone &= ~(board.revealed | board.flags | board.mines)
+    libres = board.full & ~(board.revealed | board.flags)  # Les voisines d'une case à 0 ne sont jamais des mines
+    frontiere = zone & board.zeros
+    while frontiere:
+        nouvelles = board.dilate(frontiere) & libres & ~zone
+        zone |= nouvelles
+        frontiere = nouvelles & board.zeros
+    board.revealed |= zone
+    return board.positions(zone)
+
+
+def _propagate_chunked(board : ChunkedBoard, seeds : list[tuple[int, int]]):
+    """
+    Version de propagate_cells pour un plateau en blocs : la propagation traverse les bords des blocs
+    """
+    revealed = []
+    stack = []
+    for pos_x, pos_y in seeds:
+        case = board.cell(pos_x, pos_y)
+        if case & (CASE_DEVOILEE | CASE_DRAPEAU | CASE_MINE):
             continue
+        board.set_cell(pos_x, pos_y, case | CASE_DEVOILEE)
+        revealed.append((pos_x, pos_y))
+        if case & CASE_COMPTE == 0:
+            stack.append((pos_x, pos_y))
+
+    while stack:
+        for nx, ny in board.neighbors(*stack.pop()):
+            case = board.cell(nx, ny)
+            if not case & (CASE_DEVOILEE | CASE_DRAPEAU):
+                board.set_cell(nx, ny, case | CASE_DEVOILEE)
+                revealed.append((nx, ny))
+                if case & CASE_COMPTE == 0:
+                    stack.append((nx, ny))
+
+    return revealed
+
+
+MOVE_PATTERN = re.compile(r"^(f|\.|d|c)\s+(\d+)\s+(\d+)$")  # [action] [ligne] [colonne]
 
-        if reference_board[cx][cy] == 0:
-            game_board[cx][cy] = "0 "
-            stack.extend(neighbors_to_explore(cx, cy))
-        elif reference_board[cx][cy] > 0:
-            game_board[cx][cy] = f"{reference_board[cx][cy]} "
 
-    return
+def parse_move(texte:str):
+    """
+    Lit un coup au format de parse_input
+    Paramètres:
+        texte (str): coup saisi ou reçu
+    Returns:
+        List[str, int, int]: action + coordonnées de la case (None si le format est invalide)
+    """
+    match = MOVE_PATTERN.match(texte)
+    if not match:
+        return None
+    action, ligne, colonne = match.groups()
+    return [action, int(ligne), int(colonne)]
 
 
 def parse_input(n:int, m:int):
     """
-    Permet au joueur de dévoiler une case ou mettre un drapeau
+    Permet au joueur de dévoiler une case (ou les voisines d'une case dévoilée) ou mettre un drapeau
     Paramètres:
         n (int): nombre de colonnes
         m (int): nombre de lignes
@@ -255,12 +996,11 @@ def parse_input(n:int, m:int):
     """
     while True:
         tour = input("Action et case souhaitées (format : [action] [ligne] [colonne]): ")
-        match = re.match(r"^(f|\.|d|c)\s+(\d+)\s+(\d+)$", tour)
-        if not match:
+        coup = parse_move(tour)
+        if coup is None:
             print("Entrée invalide. Format attendu : [action] [ligne] [colonne]")
             continue
-        action, ligne, colonne = match.groups()
-        ligne, colonne = int(ligne), int(colonne)
+        action, ligne, colonne = coup
         if 0 <= ligne < m and 0 <= colonne < n:
             return [action, ligne, colonne]
         else:
@@ -269,7 +1009,139 @@ def parse_input(n:int, m:int):
     return ret
 
 
-def check_win(game_board : list[list[str]], reference_board : list[list[str]], mines_list : list[tuple[int, int]], total_flags:int):
+class GameCounters:
+    """
+    Compteurs tenus à jour coup par coup, pour savoir en O(1) si la partie est gagnée
+    """
+    __slots__ = ("hidden", "right_flags", "exploded", "nbr_mines")
+
+    def __init__(self, hidden:int, nbr_mines:int):
+        self.hidden = hidden  # nombre de cases ni dévoilées ni recouvertes d'un flag
+        self.right_flags = 0  # nombre de flags bien positionnés
+        self.exploded = False  # une mine a été dévoilée
+        self.nbr_mines = nbr_mines
+
+    def won(self):
+        """
+        Mêmes conditions de victoire que le parcours complet de check_win
+        """
+        if self.right_flags == self.nbr_mines:
+            return True
+        if self.exploded:
+            return False
+        return self.hidden == self.nbr_mines - self.right_flags
+
+
+@instrumented(mesure=len)
+def apply_move(game_board : list[list[str]], reference_board : list[list[str]], counters : GameCounters, action:str, pos_x:int, pos_y:int):
+    """
+    Joue un coup (f: flag, .: enlever un flag, autre: dévoiler, ou chord sur une case déjà dévoilée)
+    et met à jour les compteurs
+    Paramètres:
+        game_board (List[list[str]]): plateau de jeu
+        reference_board (List[list[str]]): plateau de reference
+        counters (GameCounters): compteurs de la partie
+        action (str): action du joueur (format de parse_input)
+        pos_x (int): position en x de la case
+        pos_y (int): position en y de la case
+    Returns:
+        List[tuple[int, int]]: cases dont l'affichage a changé
+    """
+    r = '\033[91m'  # rouge
+    b = '\033[0m'  # normal (blanc)
+    g = '\033[92m'  # vert
+    compact = isinstance(game_board, (CompactBoard, ChunkedBoard, BitBoard))
+    if compact:
+        case = game_board.cell(pos_x, pos_y)
+        cachee = not case & (CASE_DEVOILEE | CASE_DRAPEAU)
+        flag = bool(case & CASE_DRAPEAU)
+        mine = bool(case & CASE_MINE)
+    else:
+        cachee = game_board[pos_x][pos_y] == '. '
+        flag = game_board[pos_x][pos_y] == g+'F'+b+" "
+        mine = reference_board[pos_x][pos_y] == 'X '
+
+    if action == 'f':  # Placer un flag
+        if not cachee:
+            return []
+        if compact:
+            game_board.set_cell(pos_x, pos_y, case | CASE_DRAPEAU)
+        else:
+            game_board[pos_x][pos_y] = g+'F'+b+" "
+        counters.hidden -= 1
+        if mine:  # Si flag sur une mine
+            counters.right_flags += 1
+        return [(pos_x, pos_y)]
+    if action == '.':  # Enlever un flag
+        if not flag:
+            return []
+        if compact:
+            game_board.set_cell(pos_x, pos_y, case & ~CASE_DRAPEAU)
+        else:
+            game_board[pos_x][pos_y] = '. '
+        counters.hidden += 1
+        if mine:
+            counters.right_flags -= 1
+        return [(pos_x, pos_y)]
+    if not cachee and not flag and not mine:  # Case dévoilée : ses voisines sont dévoilées d'un coup
+        return chord(game_board, reference_board, pos_x, pos_y, counters)
+    if mine and cachee:  # Dévoiler une mine
+        if compact:
+            game_board.set_cell(pos_x, pos_y, case | CASE_DEVOILEE)
+        else:
+            game_board[pos_x][pos_y] = r+'X'+b+" "  # Place la bombe (X) sur le plateau de jeu
+        counters.hidden -= 1
+        counters.exploded = True
+        return [(pos_x, pos_y)]
+    return propagate_click(game_board, reference_board, pos_x, pos_y, counters)
+
+
+@instrumented(mesure=len)
+def chord(game_board : list[list[str]], reference_board : list[list[str]], pos_x:int, pos_y:int, counters=None):
+    """
+    Dévoile d'un coup les voisines cachées d'une case dévoilée dont le compte égale le nombre de flags
+    voisins, en une seule passe de propagate_cells. Un flag mal placé fait dévoiler les mines voisines.
+    Paramètres:
+        game_board (List[list[str]]): plateau de jeu
+        reference_board (List[list[str]]): plateau de reference
+        pos_x (int): position en x de la case dévoilée
+        pos_y (int): position en y de la case dévoilée
+        counters (GameCounters): compteurs de la partie à mettre à jour (optionnel)
+    Returns:
+        List[tuple[int, int]]: cases nouvellement dévoilées (rien si le nombre de flags ne correspond pas)
+    """
+    r = '\033[91m'  # rouge
+    b = '\033[0m'  # normal (blanc)
+    g = '\033[92m'  # vert
+    voisines = get_neighbors(game_board, pos_x, pos_y)
+    if isinstance(game_board, (CompactBoard, ChunkedBoard, BitBoard)):
+        compte = game_board.cell(pos_x, pos_y) & CASE_COMPTE
+        cases = [game_board.cell(x, y) for x, y in voisines]
+        flags = sum(1 for case in cases if case & CASE_DRAPEAU)
+        cachees = [v for v, case in zip(voisines, cases) if not case & (CASE_DEVOILEE | CASE_DRAPEAU)]
+        mines = [v for v, case in zip(voisines, cases) if case & CASE_MINE and not case & (CASE_DEVOILEE | CASE_DRAPEAU)]
+    else:
+        compte = reference_board[pos_x][pos_y]
+        flags = sum(1 for x, y in voisines if game_board[x][y] == g+'F'+b+" ")
+        cachees = [(x, y) for x, y in voisines if game_board[x][y] == '. ']
+        mines = [(x, y) for x, y in cachees if reference_board[x][y] == 'X ']
+    if flags != compte or not cachees:
+        return []
+    if mines:  # Flag mal placé : perdu
+        for x, y in mines:
+            if isinstance(game_board, list):
+                game_board[x][y] = r+'X'+b+" "
+            else:
+                game_board.set_cell(x, y, game_board.cell(x, y) | CASE_DEVOILEE)
+        if counters is not None:
+            counters.hidden -= len(mines)
+            counters.exploded = True
+        return mines
+    return propagate_cells(game_board, reference_board, cachees, counters)
+
+
+@instrumented
+def check_win(game_board : list[list[str]], reference_board : list[list[str]], mines_list : list[tuple[int, int]], total_flags:int, counters:GameCounters=None):
     """
     Renvoie True si le joueur a gagné, False sinon
     Paramètres:
@@ -277,14 +1149,30 @@ def check_win(game_board : list[list[str]], reference_board : list[list[str]], m
         reference_board (List[list[str]]): plateau de reference
         mines_list (List[tuple[int, int]]): liste des coordonnées des mines
         total_flags (int): nombre de flags biens positionnés
+        counters (GameCounters): compteurs tenus à jour ; s'ils sont fournis, pas de parcours du plateau
     Returns:
         bool: True si gagné, False si toujours pas
     """
+    if counters is not None:
+        return counters.won()
     r = '\033[91m'  # rouge
     b = '\033[0m'  # normal (blanc)
     if total_flags == len(mines_list):
         return True
     nbr_mines_sans_flag = len(mines_list) - total_flags  # mines pas recouvertes d'un flag
+    if isinstance(game_board, BitBoard):
+        if game_board.revealed & game_board.mines:  # Mine dévoilée: perdu
+            return False
+        return bin(game_board.full & ~(game_board.revealed | game_board.flags)).count("1") == nbr_mines_sans_flag
+    if isinstance(game_board, CompactBoard):
+        hide_case = 0
+        for case in game_board.cells:
+            if case & CASE_DEVOILEE:
+                if case & CASE_MINE:  # Mine dévoilée: perdu
+                    return False
+            elif not case & CASE_DRAPEAU:
+                hide_case += 1
+        return hide_case == nbr_mines_sans_flag
     hide_case = 0  # nombre de cases pas encore dévoilées
     for i in range(len(game_board)):  # i == n° de ligne
         for j in range(len(game_board[0])):  # j == n° de colonne
@@ -298,15 +1186,321 @@ def check_win(game_board : list[list[str]], reference_board : list[list[str]], m
     
 
 
-def init_game(n:int, m:int, nbr_mines:int):
+# Résultat structuré d'un coup joué dans une GameSession
+MoveResult = collections.namedtuple("MoveResult", ["action", "pos_x", "pos_y", "changed", "won", "lost"])
+
+
+_versions = itertools.count(1)  # Identifiants des coups, uniques entre toutes les parties (copies comprises)
+
+
+class GameSession:
+    """
+    Partie sans entrée/sortie, pilotable par programme (solveur, simulation, serveur...).
+    Les mines sont placées au premier dévoilement, hors de la case jouée et de ses voisines.
+    """
+
+    def __init__(self, n:int, m:int, nbr_mines:int, rng=None, compact:bool=False, no_guess:bool=False, pool=None,
+                 bitboard:bool=False):
+        """
+        Paramètres:
+            n (int): nombre de colonnes
+            m (int): nombre de lignes
+            nbr_mines (int): nombre de mines
+            rng (random.Random): générateur aléatoire du placement des mines
+            compact (bool): utilise un CompactBoard au lieu des listes de listes
+            no_guess (bool): génère un plateau qui se résout sans deviner depuis le premier clic
+            pool (BoardPool): réserve de plateaux pré-générés à utiliser en priorité (demineur_pool)
+            bitboard (bool): utilise un BitBoard (un bit par case, pour les plateaux jusqu'à quelques milliers de cases)
+        """
+        self.n = n
+        self.m = m
+        self.nbr_mines = nbr_mines
+        self.rng = rng
+        self.no_guess = no_guess
+        self.pool = pool
+        if bitboard:
+            self.game_board = self.reference_board = create_bitboard(n, m)
+        elif compact:
+            self.game_board = self.reference_board = create_compact_board(n, m)
+        else:
+            self.game_board = create_board(n, m)
+            self.reference_board = create_board(n, m, 0)
+        self.mines = None  # Placées au premier dévoilement
+        self.counters = GameCounters(n * m, nbr_mines)
+        self.last_result = None  # Résultat du dernier coup joué
+        self.moves = []  # Coups joués (action, ligne, colonne), pour la sauvegarde
+        self.undo_log = []  # Pour chaque coup joué : cases modifiées et compteurs d'avant le coup
+        self.redo_log = []  # Coups annulés (coup, version), du plus ancien au plus récent
+        self.versions = []  # Identifiant unique de chaque coup joué, pour reconnaître un historique dans restore
+
+    @property
+    def started(self):
+        return self.mines is not None
+
+    @property
+    def won(self):
+        return self.started and self.counters.won()
+
+    @property
+    def lost(self):
+        return self.counters.exploded
+
+    @property
+    def over(self):
+        return self.won or self.lost
+
+    def is_hidden(self, pos_x:int, pos_y:int):
+        """
+        Renvoie True si la case n'est ni dévoilée ni recouverte d'un flag
+        """
+        if isinstance(self.game_board, CompactBoard):
+            return not self.game_board.cells[self.game_board.index(pos_x, pos_y)] & (CASE_DEVOILEE | CASE_DRAPEAU)
+        if isinstance(self.game_board, BitBoard):
+            return not (self.game_board.revealed | self.game_board.flags) >> self.game_board.index(pos_x, pos_y) & 1
+        return self.game_board[pos_x][pos_y] == '. '
+
+    def _play(self, action:str, pos_x:int, pos_y:int):
+        if not (0 <= pos_x < self.m and 0 <= pos_y < self.n):
+            raise ValueError("Coordonnées hors limites.")
+        if action not in ("f", "."):
+            action = "c"
+            if not self.started:
+                self._place_mines(pos_x, pos_y)
+                self.counters.nbr_mines = len(self.mines)
+                self._sync_flags()
+        if self.over:
+            changed = []
+        else:
+            changed = self._apply(action, pos_x, pos_y)
+            self.redo_log.clear()
+        self.last_result = MoveResult(action, pos_x, pos_y, changed, self.won, self.lost)
+        return self.last_result
+
+    def _apply(self, action:str, pos_x:int, pos_y:int, version:int=None):
+        counters = self.counters
+        avant = (counters.hidden, counters.right_flags, counters.exploded)
+        changed = apply_move(self.game_board, self.reference_board, counters, action, pos_x, pos_y)
+        self.moves.append((action, pos_x, pos_y))
+        self.undo_log.append((changed, avant))
+        self.versions.append(next(_versions) if version is None else version)
+        return changed
+
+    def _revert(self, action:str, changed : list[tuple[int, int]]):
+        """
+        Remet les cases modifiées par un coup dans leur état d'avant (cachées, ou sous un flag pour un flag enlevé)
+        """
+        board = self.game_board
+        if isinstance(board, BitBoard):
+            masque = 0
+            for x, y in changed:
+                masque |= 1 << (x * self.n + y)
+            if action == "f":
+                board.flags &= ~masque
+            elif action == ".":
+                board.flags |= masque
+            else:
+                board.revealed &= ~masque
+        elif isinstance(board, CompactBoard):
+            cells = board.cells
+            for x, y in changed:
+                if action == ".":
+                    cells[x * self.n + y] |= CASE_DRAPEAU
+                else:
+                    cells[x * self.n + y] &= ~(CASE_DRAPEAU if action == "f" else CASE_DEVOILEE)
+        else:
+            valeur = '\033[92m'+'F'+'\033[0m'+" " if action == "." else '. '
+            for x, y in changed:
+                board[x][y] = valeur
+
+    def undo(self):
+        """
+        Annule le dernier coup en O(cases modifiées) ; les mines restent placées
+        Returns:
+            List[tuple[int, int]]: cases dont l'affichage a changé (vide s'il n'y a rien à annuler)
+        """
+        if not self.moves:
+            return []
+        coup = self.moves.pop()
+        changed, (hidden, right_flags, exploded) = self.undo_log.pop()
+        self._revert(coup[0], changed)
+        self.counters.hidden = hidden
+        self.counters.right_flags = right_flags
+        self.counters.exploded = exploded
+        self.redo_log.append((coup, self.versions.pop()))
+        self.last_result = None
+        return changed
+
+    def redo(self):
+        """
+        Rejoue le dernier coup annulé
+        Returns:
+            MoveResult: résultat du coup (None s'il n'y a rien à rejouer)
+        """
+        if not self.redo_log:
+            return None
+        (action, pos_x, pos_y), version = self.redo_log.pop()
+        changed = self._apply(action, pos_x, pos_y, version)
+        self.last_result = MoveResult(action, pos_x, pos_y, changed, self.won, self.lost)
+        return self.last_result
+
+    def snapshot(self):
+        """
+        Renvoie un repère de l'état courant, en O(1) (à passer à restore) : le nombre de coups joués
+        et l'identifiant du dernier, qui désigne un historique précis
+        """
+        return len(self.versions), self.versions[-1] if self.versions else 0
+
+    def restore(self, snapshot : tuple[int, int]):
+        """
+        Revient à l'état d'un repère de snapshot, en annulant ou en rejouant les coups qui l'en séparent.
+        Le repère doit être sur l'historique courant (coups joués ou annulés) : après un nouveau coup
+        joué depuis un état antérieur, les repères des coups annulés ne sont plus valides.
+        """
+        nbr_coups, version = snapshot
+        joues = len(self.versions)
+        if nbr_coups <= joues:
+            valide = nbr_coups == 0 or self.versions[nbr_coups - 1] == version
+        else:
+            valide = nbr_coups - joues <= len(self.redo_log) and self.redo_log[joues - nbr_coups][1] == version
+        if not valide:
+            raise ValueError("Ce repère appartient à un historique effacé.")
+        while len(self.versions) > nbr_coups:
+            self.undo()
+        while len(self.versions) < nbr_coups:
+            self.redo()
+
+    def fork(self):
+        """
+        Renvoie une copie indépendante de la partie. Seuls les plateaux compacts et les bitboards se copient à
+        peu de frais (une copie d'octets ou d'entiers) ; les listes de listes copient leurs lignes, en O(cases).
+        Avant le premier clic, la copie reçoit son propre générateur, dans le même état que celui de l'original :
+        un même premier coup y place les mêmes mines.
+        Returns:
+            GameSession: partie copiée, avec son historique d'annulation
+        """
+        copie = GameSession.__new__(GameSession)
+        copie.__dict__.update(self.__dict__)
+        if not self.started:
+            if self.rng is None:
+                self.rng = random.Random()  # Le module random ne se duplique pas
+            copie.rng = random.Random()
+            copie.rng.setstate(self.rng.getstate())
+        board = self.game_board
+        if isinstance(board, (CompactBoard, BitBoard)):
+            copie.game_board = copie.reference_board = board.copy()
+        else:
+            copie.game_board = [ligne[:] for ligne in board]
+            if not self.started:
+                copie.reference_board = [ligne[:] for ligne in self.reference_board]
+        copie.counters = GameCounters(self.counters.hidden, self.counters.nbr_mines)
+        copie.counters.right_flags = self.counters.right_flags
+        copie.counters.exploded = self.counters.exploded
+        copie.moves = self.moves[:]
+        copie.undo_log = self.undo_log[:]
+        copie.redo_log = self.redo_log[:]
+        copie.versions = self.versions[:]
+        return copie
+
+    def load_mines(self, mines : list[tuple[int, int]]):
+        """
+        Impose la position des mines avant le premier coup (partie sauvegardée, plateau choisi...)
+        Paramètres:
+            mines (List[tuple[int, int]]): liste des mines
+        """
+        if self.started:
+            raise ValueError("Les mines sont déjà placées.")
+        self.mines = list(mines)
+        set_mines(self.reference_board, self.mines)
+        self.counters.nbr_mines = len(self.mines)
+        self._sync_flags()
+
+    def _sync_flags(self):
+        """
+        Recompte les flags bien placés une fois les mines placées : ceux posés avant ne pouvaient pas l'être.
+        Les compteurs d'avant chaque coup déjà joué (pour undo) sont corrigés de la même façon.
+        """
+        mines = set(self.mines)
+        flags = set()
+        undo_log = []
+        for (action, _, _), (changed, (hidden, _, exploded)) in zip(self.moves, self.undo_log):
+            undo_log.append((changed, (hidden, len(flags & mines), exploded)))
+            if action == "f":
+                flags.update(changed)
+            elif action == ".":
+                flags.difference_update(changed)
+        self.undo_log = undo_log
+        self.counters.right_flags = len(flags & mines)
+
+    def _place_mines(self, pos_x:int, pos_y:int):
+        if self.pool is not None:
+            mines = self.pool.take(self.n, self.m, self.nbr_mines, pos_x, pos_y, self.no_guess)
+            if mines is not None:
+                self.mines = mines
+                set_mines(self.reference_board, mines)
+                return
+        if not self.no_guess:
+            self.mines = place_mines(self.reference_board, self.nbr_mines, pos_x, pos_y, rng=self.rng)
+            fill_in_board(self.reference_board)
+            return
+        import demineur_generation
+        board, self.mines = demineur_generation.generate_no_guess(self.n, self.m, self.nbr_mines, pos_x, pos_y,
+                                                                  rng=self.rng or random.Random())
+        if isinstance(self.reference_board, CompactBoard):
+            cells = self.reference_board.cells  # Garde les flags déjà posés
+            cells[:] = bytes(case | ancienne & CASE_DRAPEAU for case, ancienne in zip(board.cells, cells))
+        else:
+            set_mines(self.reference_board, self.mines)
+
+    def reveal(self, pos_x:int, pos_y:int):
+        """
+        Dévoile une case (place les mines au premier appel)
+        Returns:
+            MoveResult: cases modifiées et état de la partie après le coup
+        """
+        return self._play("c", pos_x, pos_y)
+
+    def flag(self, pos_x:int, pos_y:int):
+        """
+        Place un flag sur une case cachée
+        """
+        return self._play("f", pos_x, pos_y)
+
+    def unflag(self, pos_x:int, pos_y:int):
+        """
+        Enlève le flag d'une case
+        """
+        return self._play(".", pos_x, pos_y)
+
+    def apply_moves(self, moves):
+        """
+        Joue une suite de coups (action, ligne, colonne) au format de parse_input, jusqu'à la fin de la partie
+        Paramètres:
+            moves (Iterable[tuple[str, int, int]]): coups à jouer
+        Returns:
+            List[MoveResult]: résultat de chaque coup joué
+        """
+        results = []
+        for action, pos_x, pos_y in moves:
+            results.append(self._play(action, pos_x, pos_y))
+            if self.over:
+                break
+        return results
+
+
+RESERVE_PLATEAUX = 4  # Plateaux gardés prêts par clé de réserve quand le jeu utilise --pool
+
+
+def init_game(n:int, m:int, nbr_mines:int, pool=None):
     """
     Initialise le jeu
     Paramètres:
         n (int): nombre de colonnes
         m (int): nombre de lignes
         nbr_mines (int): nombre de mines
+        pool (BoardPool): réserve de plateaux pré-générés (demineur_pool), sinon placement après le premier clic ;
+                          chaque partie relance la génération d'un plateau pour la réserve
     Returns:
-        Tuple[List[list[str]]: game_board (plateau de jeu), List[list[str]]: reference_board (plateau de reference), List[tuple(int, int)]: LST_MINES (liste des mines)]
+        Tuple[List[list[str]]: game_board (plateau de jeu), List[list[str]]: reference_board (plateau de reference), List[tuple(int, int)]: LST_MINES (liste des mines), GameCounters: compteurs de la partie]
     """
     game_board = create_board(n, m)
     reference_board = create_board(n, m, 0)
@@ -324,46 +1518,80 @@ def init_game(n:int, m:int, nbr_mines:int):
         else:
             print("Format invalide. Réessayez.")
     
-    LST_MINES = place_mines(reference_board, nbr_mines, prem_ligne, prem_colonne)
-    fill_in_board(reference_board)
-    propagate_click(game_board, reference_board, prem_ligne, prem_colonne)
+    LST_MINES = pool.take(n, m, nbr_mines, prem_ligne, prem_colonne, refill=1) if pool is not None else None
+    if LST_MINES is not None:
+        set_mines(reference_board, LST_MINES)
+    else:
+        LST_MINES = place_mines(reference_board, nbr_mines, prem_ligne, prem_colonne)
+        fill_in_board(reference_board)
+    counters = GameCounters(n * m, len(LST_MINES))
+    propagate_click(game_board, reference_board, prem_ligne, prem_colonne, counters)
     print_board(game_board)
     print()
-    return game_board, reference_board, LST_MINES
+    return game_board, reference_board, LST_MINES, counters
 
 
 def main():
     """
     Fonction principale du programme, grâce à laquelle on peut jouer
+    (ou lancer une simulation : python demineur_modif.py simulate --games N --workers K,
+    ou revoir une partie sauvegardée : python demineur_modif.py replay fichier.dms,
+    ou héberger des parties : python demineur_modif.py serve --port P).
+    Avec --pool DOSSIER, le premier clic prend un plateau d'une réserve remplie en arrière-plan (demineur_pool).
     """
+    if len(sys.argv) > 1 and sys.argv[1] == "simulate":
+        import demineur_simulation
+        return demineur_simulation.main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "replay":
+        import demineur_sauvegarde
+        return demineur_sauvegarde.main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] in ("serve", "load"):
+        import demineur_serveur
+        return demineur_serveur.main(sys.argv[1:])
     n = int(sys.argv[1])  # Nombre de colonnes
     m = int(sys.argv[2])  # Nombre de lignes
     nbr_mines = int(sys.argv[3])  # Nombre de mines
-    TOUR1 = init_game(n, m, nbr_mines)
+    pool = None
+    if "--pool" in sys.argv:
+        import demineur_pool
+        pool = demineur_pool.BoardPool(sys.argv[sys.argv.index("--pool") + 1])
+        for x, y in [(0, 0), (0, n // 2), (m // 2, 0), (m // 2, n // 2)]:  # Clés des clics au bord et au centre
+            key, _ = demineur_pool.pool_key(n, m, nbr_mines, x, y)
+            pool.fill(key, max(0, RESERVE_PLATEAUX - pool.available(key)))
+    try:
+        return play_game(n, m, nbr_mines, pool)
+    finally:
+        if pool is not None:
+            pool.close()  # Sauvegarde les plateaux restants pour la prochaine partie
+
+
+def play_game(n:int, m:int, nbr_mines:int, pool=None):
+    """
+    Joue une partie dans le terminal
+    Paramètres:
+        n (int): nombre de colonnes
+        m (int): nombre de lignes
+        nbr_mines (int): nombre de mines
+        pool (BoardPool): réserve de plateaux pré-générés (demineur_pool)
+    Returns:
+        int: 1 si gagné, 0 si perdu
+    """
+    TOUR1 = init_game(n, m, nbr_mines, pool)
     game_board = TOUR1[0]
     reference_board = TOUR1[1]
     LST_MINES = TOUR1[2]
-    right_flags = 0  # Nombre de flags bien positionnés
+    counters = TOUR1[3]  # Cases cachées, flags bien positionnés, mine dévoilée
     r = '\033[91m'  # rouge
     b = '\033[0m'  # normal (blanc)
     g = '\033[92m'  # vert
-    while not check_win(game_board, reference_board, LST_MINES, right_flags):  # Tant qu'une des conditions de victoire n'est pas remplie
+    while not check_win(game_board, reference_board, LST_MINES, counters.right_flags, counters):  # Tant qu'une des conditions de victoire n'est pas remplie
         tour = parse_input(n, m)  # Coup du joueur
-        if tour[0] == 'f':  # Action souhaitée: placer un flag
-            game_board[tour[1]][tour[2]] = g+'F'+b+" "
-            if reference_board[tour[1]][tour[2]] == 'X ':  # Si flag sur une mine
-                right_flags += 1
-        elif tour[0] == '.':  # Action souhaitée: enlever un flag
-            if game_board[tour[1]][tour[2]] == g+'F'+b+" ":  # Si flag sur la case
-                game_board[tour[1]][tour[2]] = '. '
-        else:  # Action souhaitée: dévoiler une case
-            if (tour[1], tour[2]) in LST_MINES:  # Si la case est une mine
-                game_board[tour[1]][tour[2]] = r+'X'+b+" "  # Place la bombe (X) sur le plateau de jeu
-                break  # Condition de défaite remplie: sortie de la boucle while
-            propagate_click(game_board, reference_board, tour[1], tour[2])  # Si la case n'est pas une mine, on dévoile les cases adjacentes
+        apply_move(game_board, reference_board, counters, tour[0], tour[1], tour[2])
+        if counters.exploded:  # Condition de défaite remplie: sortie de la boucle while
+            break
         print_board(game_board)
         print()
-    if check_win(game_board, reference_board, LST_MINES, right_flags):  # Si gagné
+    if check_win(game_board, reference_board, LST_MINES, counters.right_flags, counters):  # Si gagné
         print(g+'Bravo ! Vous avez trouvé toutes les mines'+b)
         return 1
     else:  # Si perdu
@@ -373,5 +1601,382 @@ def main():
         return 0
 
 
+class DemineurTestCase(unittest.TestCase):
+
+    def test_compact_board_matches_lists(self):
+        """Le plateau compact donne les mêmes comptes et le même dévoilement que les listes"""
+        random.seed(4)
+        game_board = create_board(12, 9)
+        reference_board = create_board(12, 9, 0)
+        mines = place_mines(reference_board, 20, 4, 5)
+        fill_in_board(reference_board)
+        propagate_click(game_board, reference_board, 4, 5)
+
+        compact = create_compact_board(12, 9)
+        for x, y in mines:
+            compact.cells[compact.index(x, y)] |= CASE_MINE
+        fill_in_board(compact)
+        propagate_click(compact, compact, 4, 5)
+
+        self.assertEqual(compact.to_lists(), (game_board, reference_board))
+        self.assertEqual(check_win(compact, compact, mines, 0), check_win(game_board, reference_board, mines, 0))
+
+    def test_batched_fill_matches_naive(self):
+        """Le calcul des comptes en une passe donne exactement le même plateau que le calcul case par case"""
+        for n, m, nbr_mines in [(10, 10, 10), (23, 7, 80), (5, 30, 100)]:
+            random.seed(n * m)
+            reference_board = create_board(n, m, 0)
+            place_mines(reference_board, nbr_mines, 2, 2)
+            attendu = [ligne[:] for ligne in reference_board]
+            fill_in_board(attendu, batched=False)
+            fill_in_board(reference_board)
+            self.assertEqual(reference_board, attendu)
+
+            compact = create_compact_board(n, m)
+            compact_naif = create_compact_board(n, m)
+            for x in range(m):
+                for y in range(n):
+                    if attendu[x][y] == 'X ':
+                        compact.cells[compact.index(x, y)] |= CASE_MINE
+                        compact_naif.cells[compact.index(x, y)] |= CASE_MINE
+            fill_in_board(compact)
+            fill_in_board(compact_naif, batched=False)
+            self.assertEqual(compact.cells, compact_naif.cells)
+
+    def test_compact_place_mines(self):
+        """place_mines respecte la zone de départ sur un plateau compact"""
+        compact = create_compact_board(8, 8)
+        mines = place_mines(compact, 30, 0, 0)
+        self.assertEqual(len(set(mines)), 30)
+        self.assertEqual(sum(1 for case in compact.cells if case & CASE_MINE), 30)
+        for x, y in [(0, 0), (0, 1), (1, 0), (1, 1)]:
+            self.assertFalse(compact.is_mine(x, y))
+
+    def test_get_neighbors_edge_cases(self):
+        """Les voisins sont corrects sur les plateaux 1xN, Nx1 et 1x1"""
+        def attendu(n, m, x, y):
+            return {(x + dx, y + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                    if (dx or dy) and 0 <= x + dx < m and 0 <= y + dy < n}
+
+        for n, m in [(1, 1), (5, 1), (1, 5), (2, 1), (1, 2), (2, 2), (7, 4)]:
+            board = create_board(n, m)
+            compact = create_compact_board(n, m)
+            for x in range(m):
+                for y in range(n):
+                    voisins = get_neighbors(board, x, y)
+                    self.assertEqual(len(voisins), len(set(voisins)))
+                    self.assertEqual(set(voisins), attendu(n, m, x, y))
+                    self.assertEqual(get_neighbors(compact, x, y), voisins)
+                    decalages = get_neighbor_table(n, m).offsets(x, y)
+                    self.assertEqual({divmod(x * n + y + d, n) for d in decalages}, set(voisins))
+
+    def test_propagate_click_returns_revealed(self):
+        """propagate_click renvoie exactement les cases qu'il vient de dévoiler"""
+        random.seed(11)
+        game_board = create_board(30, 20)
+        reference_board = create_board(30, 20, 0)
+        place_mines(reference_board, 60, 10, 10)
+        fill_in_board(reference_board)
+        game_board[0][0] = '\033[92mF\033[0m '  # Un drapeau n'est jamais dévoilé
+        avant = [ligne[:] for ligne in game_board]
+        revealed = propagate_click(game_board, reference_board, 10, 10)
+        changees = [(x, y) for x in range(20) for y in range(30) if game_board[x][y] != avant[x][y]]
+        self.assertEqual(len(revealed), len(set(revealed)))
+        self.assertEqual(sorted(revealed), changees)
+        self.assertEqual(propagate_click(game_board, reference_board, 10, 10), [])
+
+    def test_counters_match_full_scan(self):
+        """Les compteurs incrémentaux donnent le même résultat que le parcours complet sur des parties aléatoires"""
+        for graine in range(20):
+            rng = random.Random(graine)
+            for compact in (False, True):
+                if compact:
+                    game_board = reference_board = create_compact_board(9, 7)
+                else:
+                    game_board = create_board(9, 7)
+                    reference_board = create_board(9, 7, 0)
+                mines = place_mines(reference_board, 10, 3, 4, rng=rng)
+                fill_in_board(reference_board)
+                counters = GameCounters(9 * 7, len(mines))
+                propagate_click(game_board, reference_board, 3, 4, counters)
+                for _ in range(60):
+                    apply_move(game_board, reference_board, counters, rng.choice("f.c"), rng.randrange(7), rng.randrange(9))
+                    self.assertEqual(check_win(game_board, reference_board, mines, counters.right_flags, counters),
+                                     check_win(game_board, reference_board, mines, counters.right_flags))
+                    if counters.exploded:
+                        break
+
+    def test_render_board(self):
+        """Affichage en une chaîne : format inchangé pour les petits plateaux, toutes largeurs acceptées"""
+        board = create_board(3, 2)
+        board[1][2] = "1 "
+        self.assertEqual(render_board(board), "   0  1  2  \n"
+                                              "  ------------\n"
+                                              "0 |.  .  .  |\n"
+                                              "1 |.  .  1  |\n"
+                                              "  ------------")
+        lines = render_board(create_board(120, 3)).split("\n")
+        self.assertEqual(len(lines), 3 + 1 + 3 + 1)
+        self.assertEqual(lines[0][4 + 3 * 100], "1")
+        self.assertEqual(lines[1][4 + 3 * 119], "1")
+        self.assertEqual(lines[2][4 + 3 * 119], "9")
+        self.assertTrue(all(len(ligne) == 4 + 3 * 120 + 1 for ligne in lines[4:7]))
+
+    def test_board_renderer_diff(self):
+        """En mode différentiel, seules les lignes modifiées sont réécrites"""
+        renderer = BoardRenderer()
+        board = create_board(4, 4)
+        self.assertEqual(renderer.frame(board), render_board(board))
+        self.assertEqual(renderer.frame(board), "")
+        board[1][2] = "3 "
+        diff = renderer.frame(board)
+        self.assertIn("1 |.  .  3  .  |", diff)
+        self.assertNotIn("0 |", diff)
+        self.assertEqual(diff.count("\033[K"), 1)
+
+    def test_game_session(self):
+        """Une GameSession joue sans entrée/sortie et renvoie des résultats structurés"""
+        session = GameSession(8, 8, 10, rng=random.Random(3))
+        first = session.reveal(4, 4)
+        self.assertTrue(session.started)
+        self.assertIn((4, 4), first.changed)
+        self.assertNotIn((4, 4), session.mines)
+        x, y = session.mines[0]
+        self.assertEqual(session.flag(x, y).changed, [(x, y)])
+        self.assertEqual(session.counters.right_flags, 1)
+        self.assertEqual(session.unflag(x, y).changed, [(x, y)])
+        safe = [(i, j) for i in range(8) for j in range(8) if (i, j) not in session.mines]
+        results = session.apply_moves([("c", i, j) for i, j in safe] + [("c", x, y)])
+        self.assertTrue(results[-1].won)
+        self.assertFalse(results[-1].lost)
+        self.assertLessEqual(len(results), len(safe))
+        with self.assertRaises(ValueError):
+            session.reveal(8, 0)
+
+        lost = GameSession(8, 8, 10, rng=random.Random(3), compact=True)
+        lost.reveal(4, 4)
+        result = lost.reveal(*lost.mines[0])
+        self.assertTrue(result.lost and lost.over)
+
+    def test_flags_before_first_reveal(self):
+        """Les flags posés avant le placement des mines sont comptés, et leur retrait n'annonce pas de victoire"""
+        drapeaux = [(4, 2), (0, 0), (4, 4), (0, 4)]
+        for options in ({}, {"compact": True}, {"bitboard": True}, {"compact": True, "no_guess": True}):
+            for graine in range(1, 8):
+                session = GameSession(5, 5, 5 if options.get("no_guess") else 12, rng=random.Random(graine), **options)
+                for x, y in drapeaux:
+                    session.flag(x, y)
+                session.reveal(2, 2)
+                self.assertEqual(session.counters.right_flags, len(set(drapeaux) & set(session.mines)))
+                if session.over:
+                    continue
+                for x, y in drapeaux:
+                    session.unflag(x, y)
+                self.assertEqual(session.counters.right_flags, 0)
+                self.assertFalse(session.won)
+                while session.moves:
+                    session.undo()
+                self.assertEqual(session.counters.right_flags, 0)
+
+    def test_place_mines_sampling(self):
+        """Le tirage sans remise est reproductible et remplit le plateau jusqu'à la zone de départ"""
+        mines1 = place_mines(create_board(10, 10, 0), 91, 5, 5, rng=random.Random(7))
+        mines2 = place_mines(create_board(10, 10, 0), 91, 5, 5, rng=random.Random(7))
+        self.assertEqual(mines1, mines2)
+        self.assertEqual(len(set(mines1)), 91)
+        self.assertTrue(set(mines1).isdisjoint(get_neighbors(create_board(10, 10), 5, 5) + [(5, 5)]))
+        with self.assertRaises(ValueError):
+            place_mines(create_board(10, 10, 0), 92, 5, 5)
+
+    def test_place_mines_on_partly_mined_board(self):
+        """Les mines déjà présentes ne comptent pas parmi les nouvelles, sur chaque moteur"""
+        for fabrique in (lambda: create_board(10, 10, 0), lambda: create_compact_board(10, 10), lambda: create_bitboard(10, 10)):
+            board = fabrique()
+            anciennes = place_mines(board, 40, 5, 5, rng=random.Random(3))
+            nouvelles = place_mines(board, 51, 5, 5, rng=random.Random(4))
+            self.assertEqual(len(set(anciennes) | set(nouvelles)), 91)
+            with self.assertRaises(ValueError):
+                place_mines(board, 1, 5, 5)
+
+    def test_chord(self):
+        """Le chord dévoile les voisines d'un nombre entouré de ses flags, sur chaque moteur, et explose sur un flag faux"""
+        reference = create_board(9, 9, 0)
+        mines = [(0, 1), (2, 2), (6, 6), (7, 2)]
+        set_mines(reference, mines)
+        fabriques = [lambda: (create_board(9, 9), [ligne[:] for ligne in reference]),
+                     lambda: (create_compact_board(9, 9),) * 2, lambda: (create_bitboard(9, 9),) * 2]
+        resultats = []
+        for fabrique in fabriques:
+            game_board, reference_board = fabrique()
+            if not isinstance(game_board, list):
+                set_mines(reference_board, mines)
+            counters = GameCounters(81, len(mines))
+            self.assertEqual(apply_move(game_board, reference_board, counters, "c", 1, 1), [(1, 1)])  # Compte 2
+            self.assertEqual(apply_move(game_board, reference_board, counters, "d", 1, 1), [])  # Pas assez de flags
+            apply_move(game_board, reference_board, counters, "f", 0, 1)
+            apply_move(game_board, reference_board, counters, "f", 2, 2)
+            revealed = apply_move(game_board, reference_board, counters, "d", 1, 1)
+            self.assertEqual(len(revealed), len(set(revealed)))  # Zones qui se recouvrent parcourues une fois
+            resultats.append(sorted(revealed))
+            self.assertFalse(counters.exploded)
+            self.assertEqual(counters.hidden, 81 - 1 - 2 - len(revealed))
+
+            game_board, reference_board = fabrique()  # Flag mal placé à côté d'un 1 : le chord dévoile la mine
+            if not isinstance(game_board, list):
+                set_mines(reference_board, mines)
+            counters = GameCounters(81, len(mines))
+            apply_move(game_board, reference_board, counters, "c", 8, 3)
+            apply_move(game_board, reference_board, counters, "f", 8, 4)
+            self.assertEqual(apply_move(game_board, reference_board, counters, "c", 8, 3), [(7, 2)])
+            self.assertTrue(counters.exploded)
+        self.assertEqual(resultats[0], resultats[1])
+        self.assertEqual(resultats[0], resultats[2])
+        self.assertIn((0, 0), resultats[0])
+
+    def test_undo_redo_and_fork(self):
+        """Annuler puis rejouer redonne exactement les mêmes états, et une copie évolue indépendamment"""
+        for options in ({}, {"compact": True}, {"bitboard": True}):
+            session = GameSession(12, 10, 18, rng=random.Random(5), **options)
+            session.reveal(5, 5)
+            etats = [render_board(session.game_board)]
+            compteurs = [(session.counters.hidden, session.counters.right_flags, session.counters.exploded)]
+            repere = session.snapshot()
+            reperes = [repere]
+            x, y = session.mines[0]
+            for action, i, j in [("f", x, y), ("c", 0, 0), (".", x, y), ("c", 9, 11), ("c", x, y)]:
+                session._play(action, i, j)
+                etats.append(render_board(session.game_board))
+                reperes.append(session.snapshot())
+                compteurs.append((session.counters.hidden, session.counters.right_flags, session.counters.exploded))
+            self.assertTrue(session.lost)
+
+            copie = session.fork()
+            for k in range(len(etats) - 2, -1, -1):
+                session.undo()
+                self.assertEqual(render_board(session.game_board), etats[k])
+                self.assertEqual((session.counters.hidden, session.counters.right_flags, session.counters.exploded), compteurs[k])
+            self.assertIn((5, 5), session.undo())  # Premier coup : les mines restent placées
+            self.assertEqual((session.snapshot(), session.counters.hidden), ((0, 0), 120))
+            self.assertEqual(session.undo(), [])
+            session.restore(reperes[3])
+            self.assertEqual(render_board(session.game_board), etats[3])
+            session.redo()
+            self.assertEqual(render_board(session.game_board), etats[4])
+            session._play("c", 0, 11)  # Un nouveau coup efface les coups annulés
+            self.assertIsNone(session.redo())
+            with self.assertRaises(ValueError):
+                session.restore(reperes[5])  # Branche abandonnée
+
+            self.assertTrue(copie.lost and not session.lost)
+            self.assertEqual(render_board(copie.game_board), etats[-1])
+            copie.restore(repere)
+            self.assertEqual(render_board(copie.game_board), etats[0])
+            self.assertNotEqual(render_board(session.game_board), etats[0])
+
+    def test_fork_before_first_click(self):
+        """Une copie faite avant le premier clic place les mêmes mines que l'original, quel que soit l'ordre des clics"""
+        for options in ({}, {"compact": True}, {"bitboard": True}):
+            for rng in (random.Random(1), None):
+                session = GameSession(9, 9, 10, rng=rng, **options)
+                copie = session.fork()
+                copie.reveal(4, 4)
+                session.reveal(4, 4)
+                self.assertEqual(sorted(copie.mines), sorted(session.mines))
+                self.assertEqual(render_board(copie.game_board), render_board(session.game_board))
+
+    def test_restore_after_branching(self):
+        """Un repère désigne un historique : celui d'une branche abandonnée est refusé, pas rejoué à tort"""
+        session = GameSession(9, 9, 10, rng=random.Random(2), compact=True)
+        session.reveal(4, 4)
+        depart = session.snapshot()
+        cachees = [(x, y) for x in range(9) for y in range(9) if session.is_hidden(x, y)]
+        session.flag(*cachees[0])
+        etat_a = render_board(session.game_board)
+        repere_a = session.snapshot()
+
+        session.restore(depart)
+        session.restore(repere_a)  # Toujours sur l'historique : rejoué
+        self.assertEqual(render_board(session.game_board), etat_a)
+
+        session.restore(depart)
+        session.flag(*cachees[1])
+        etat_b = render_board(session.game_board)
+        with self.assertRaises(ValueError):
+            session.restore(repere_a)
+        self.assertEqual(render_board(session.game_board), etat_b)  # Rien n'a été modifié
+
+        copie = session.fork()
+        copie.flag(*cachees[2])
+        with self.assertRaises(ValueError):
+            session.restore(copie.snapshot())  # Un coup d'une copie n'est pas sur l'historique de l'original
+        session.restore(depart)
+        self.assertEqual(session.snapshot(), depart)
+
+    def test_bitboard_matches_compact(self):
+        """Le plateau en entiers donne les mêmes comptes, le même dévoilement et la même fin de partie"""
+        for n, m, nbr_mines, clics in [(9, 9, 10, [(4, 4), (0, 0)]), (30, 16, 60, [(8, 15), (0, 29), (15, 0)]),
+                                       (64, 64, 300, [(32, 32), (63, 63), (0, 5)])]:
+            bits = create_bitboard(n, m)
+            compact = create_compact_board(n, m)
+            mines = place_mines(bits, nbr_mines, *clics[0], rng=random.Random(n))
+            set_mines(compact, mines)
+            fill_in_board(bits)
+            self.assertEqual(bits.to_compact().cells, compact.cells)
+            apply_move(bits, bits, GameCounters(n * m, nbr_mines), "f", *mines[0])
+            apply_move(compact, compact, GameCounters(n * m, nbr_mines), "f", *mines[0])
+            for x, y in clics:
+                self.assertEqual(propagate_click(bits, bits, x, y), sorted(propagate_click(compact, compact, x, y)))
+                self.assertEqual(bits.to_compact().cells, compact.cells)
+                self.assertEqual(check_win(bits, bits, mines, 0), check_win(compact, compact, mines, 0))
+            copie = bits.copy()
+            propagate_click(copie, copie, *mines[0])  # Sous un flag : rien ne change
+            apply_move(copie, copie, GameCounters(n * m, nbr_mines), ".", *mines[0])
+            self.assertNotEqual(copie.state(), bits.state())
+            self.assertEqual(bits.to_compact().cells, compact.cells)
+
+        session = GameSession(8, 8, 10, rng=random.Random(3), bitboard=True)
+        session.reveal(4, 4)
+        safe = [(i, j) for i in range(8) for j in range(8) if (i, j) not in session.mines]
+        self.assertTrue(session.apply_moves([("c", i, j) for i, j in safe])[-1].won)
+
+    def test_chunked_board_matches_compact(self):
+        """Un plateau en blocs borné se comporte comme le plateau compact qui a les mêmes mines"""
+        chunked = ChunkedBoard(3, 0.2, 37, 21, chunk_size=8, cache_size=4)
+        chunked.set_safe_zone(10, 17)
+        compact = create_compact_board(37, 21)
+        for x in range(21):
+            for y in range(37):
+                compact.cells[compact.index(x, y)] = chunked.cell(x, y) & CASE_MINE
+        self.assertEqual(sum(map(bool, compact.cells)), chunked.total_mines())
+        fill_in_board(compact)
+        self.assertEqual(chunked.window(0, 0, 21, 37).cells, compact.cells)  # Comptes au bord des blocs
+
+        counters = GameCounters(37 * 21, chunked.total_mines())
+        self.assertEqual(propagate_click(chunked, chunked, 10, 17, counters), propagate_click(compact, compact, 10, 17))
+        apply_move(chunked, chunked, counters, "f", 0, 0)
+        apply_move(compact, compact, counters, "f", 0, 0)
+        self.assertEqual(chunked.window(0, 0, 21, 37).cells, compact.cells)
+        self.assertEqual(get_neighbors(chunked, 0, 36), get_neighbors(compact, 0, 36))
+
+    def test_chunked_board_infinite(self):
+        """Un plateau infini est reproductible, traverse les bords des blocs et ne garde que la zone jouée"""
+        board = ChunkedBoard("graine", 0.2, chunk_size=16, cache_size=8)
+        board.set_safe_zone(0, 1024)
+        revealed = propagate_click(board, board, 0, 1024)
+        self.assertGreater(len(revealed), 1)
+        self.assertGreater(len({(x // 16, y // 16) for x, y in revealed}), 1)
+        self.assertLessEqual(len(board._chunks), 8)
+        self.assertLessEqual(len(board.state), len(board._chunks) + len(revealed))
+        self.assertEqual(len(get_neighbors(board, 0, 1024)), 8)
+
+        autre = ChunkedBoard("graine", 0.2, chunk_size=16)
+        autre.set_safe_zone(0, 1024)
+        for x, y in revealed:
+            self.assertEqual(autre.count(x, y), board.count(x, y))
+            self.assertTrue(board.is_revealed(x, y) and not autre.is_revealed(x, y))
+        with self.assertRaises(ValueError):
+            ChunkedBoard(0, 0.12)  # Trop proche du seuil de percolation
+
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
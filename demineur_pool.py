@@ -0,0 +1,301 @@
+"""
+Réserve de plateaux pré-générés, remplie en arrière-plan et sauvegardée sur disque
+(un fichier par clé, un bitset de mines par plateau, lu par mmap au démarrage)
+"""
+
+import mmap
+import os
+import random
+import struct
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import demineur_modif as dm
+
+MAGIC = b"DMPL"
+VERSION = 1
+# magic, version, sans hasard, colonnes, lignes, mines, ligne et colonne du clic de génération
+HEADER = struct.Struct("<4sBBIIIII")
+
+
+def pool_key(n:int, m:int, nbr_mines:int, pos_x:int, pos_y:int, no_guess:bool=False):
+    """
+    Renvoie la clé de réserve d'un premier clic et la transformation qui amène le plateau stocké sur ce clic.
+    Un plateau aléatoire est stocké pour un clic au bord (ligne/colonne 0) ou au centre : un miroir puis
+    un décalage circulaire (qui garde un tirage uniforme) le ramènent sur la case cliquée. Un plateau
+    sans hasard n'accepte que les miroirs : il est stocké pour la case du quart supérieur gauche.
+    Returns:
+        Tuple[tuple, tuple]: clé (n, m, nbr_mines, no_guess, ligne, colonne) et (miroir x, miroir y, décalage x, décalage y)
+    """
+    def dimension(pos, taille):
+        if no_guess:
+            canonique = min(pos, taille - 1 - pos)
+            return canonique, pos != canonique, 0
+        if pos == 0 or pos == taille - 1:  # Bord : la zone sans mine est coupée
+            return 0, pos != 0, 0
+        return taille // 2, False, pos - taille // 2
+
+    gx, miroir_x, dx = dimension(pos_x, m)
+    gy, miroir_y, dy = dimension(pos_y, n)
+    return (n, m, nbr_mines, no_guess, gx, gy), (miroir_x, miroir_y, dx, dy)
+
+
+def mines_to_bitset(mines, n:int, m:int):
+    """
+    Code une liste de mines en bitset (bit idx % 8 de l'octet idx // 8, idx = ligne * n + colonne)
+    """
+    bits = bytearray((n * m + 7) // 8)
+    for x, y in mines:
+        idx = x * n + y
+        bits[idx >> 3] |= 1 << (idx & 7)
+    return bytes(bits)
+
+
+def bitset_to_mines(bits, n:int, transformation=(False, False, 0, 0), m:int=None):
+    """
+    Décode un bitset en liste de mines, en appliquant la transformation de pool_key
+    """
+    miroir_x, miroir_y, dx, dy = transformation
+    if m is None:
+        m = len(bits) * 8 // n
+    mines = []
+    for octet_idx, octet in enumerate(bits):
+        while octet:
+            bit = octet & -octet
+            x, y = divmod(octet_idx * 8 + bit.bit_length() - 1, n)
+            if miroir_x:
+                x = m - 1 - x
+            if miroir_y:
+                y = n - 1 - y
+            mines.append(((x + dx) % m, (y + dy) % n))
+            octet ^= bit
+    return mines
+
+
+def _generate_bitset(args):
+    """
+    Tâche d'un processus : génère un plateau pour le clic de génération d'une clé
+    """
+    (n, m, nbr_mines, no_guess, gx, gy), seed = args
+    rng = random.Random(seed)
+    if no_guess:
+        import demineur_generation
+        mines = demineur_generation.generate_no_guess(n, m, nbr_mines, gx, gy, rng=rng)[1]
+    else:
+        mines = dm.place_mines(dm.CompactBoard(n, m), nbr_mines, gx, gy, rng=rng)
+    return mines_to_bitset(mines, n, m)
+
+
+class BoardPool:
+    """
+    Réserve de plateaux par clé (colonnes, lignes, mines, sans hasard, forme de la zone de départ)
+    """
+
+    def __init__(self, directory:str):
+        """
+        Paramètres:
+            directory (str): dossier des fichiers de réserve (créé si besoin), lus par mmap
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.stored = {}  # clé -> [mmap, nombre de plateaux encore disponibles dans le fichier]
+        self.fresh = {}  # clé -> bitsets générés depuis le démarrage
+        self.executor = None
+        self.workers = 0  # Processus de l'executor en cours
+        self.retired = []  # Executors remplacés, dont les tâches se terminent
+        for nom in os.listdir(directory):
+            if nom.endswith(".pool"):
+                self._map(os.path.join(directory, nom))
+
+    def _map(self, chemin:str):
+        with open(chemin, "rb") as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                return
+            vue = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, no_guess, n, m, nbr_mines, gx, gy = HEADER.unpack_from(vue)
+        if magic != MAGIC or version != VERSION:
+            vue.close()
+            return
+        nombre = (len(vue) - HEADER.size) // ((n * m + 7) // 8)
+        self.stored[(n, m, nbr_mines, bool(no_guess), gx, gy)] = [vue, nombre]
+
+    def __len__(self):
+        with self.lock:
+            return sum(nombre for _, nombre in self.stored.values()) + sum(map(len, self.fresh.values()))
+
+    def available(self, key:tuple):
+        with self.lock:
+            return self.stored.get(key, [None, 0])[1] + len(self.fresh.get(key, ()))
+
+    def take(self, n:int, m:int, nbr_mines:int, pos_x:int, pos_y:int, no_guess:bool=False, refill:int=0):
+        """
+        Prend un plateau prêt, transformé pour que la zone sans mine entoure la case cliquée
+        Paramètres:
+            refill (int): nombre de plateaux à relancer en arrière-plan pour cette clé (voir fill), même si la réserve était vide
+        Returns:
+            List[tuple[int, int]]: liste des mines (None si la réserve est vide pour cette clé)
+        """
+        key, transformation = pool_key(n, m, nbr_mines, pos_x, pos_y, no_guess)
+        if refill:
+            self.fill(key, refill)
+        with self.lock:
+            if self.fresh.get(key):
+                bits = self.fresh[key].pop()
+            elif self.stored.get(key, [None, 0])[1]:
+                vue, nombre = self.stored[key]
+                taille = (n * m + 7) // 8
+                debut = HEADER.size + (nombre - 1) * taille
+                bits = vue[debut:debut + taille]
+                self.stored[key][1] = nombre - 1
+            else:
+                return None
+        return bitset_to_mines(bits, n, transformation, m)
+
+    def fill(self, key:tuple, count:int, workers:int=None, seed=None):
+        """
+        Lance en arrière-plan la génération de count plateaux pour une clé (voir pool_key).
+        Paramètres:
+            workers (int): nombre de processus ; un nombre différent du précédent remplace l'executor (les tâches
+                           déjà lancées se terminent), None garde l'executor en cours (1 processus à sa création)
+        Returns:
+            List[Future]: tâches en cours
+        """
+        if workers is None:
+            workers = self.workers or 1
+        if self.executor is None or workers != self.workers:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False)
+                self.retired.append(self.executor)
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+            self.workers = workers
+        if seed is None:
+            seed = random.randrange(1 << 30)
+
+        def ranger(future):
+            with self.lock:
+                self.fresh.setdefault(key, []).append(future.result())
+
+        futures = []
+        for i in range(count):
+            future = self.executor.submit(_generate_bitset, (key, f"{seed}-{i}"))
+            future.add_done_callback(ranger)
+            futures.append(future)
+        return futures
+
+    def save(self):
+        """
+        Réécrit sur disque les plateaux encore disponibles de chaque clé, puis les relit par mmap
+        """
+        with self.lock:
+            cles = set(self.stored) | set(self.fresh)
+            for key in cles:
+                n, m, nbr_mines, no_guess, gx, gy = key
+                taille = (n * m + 7) // 8
+                vue, nombre = self.stored.pop(key, [None, 0])
+                chemin = os.path.join(self.directory, f"{n}x{m}_{nbr_mines}_{'ng' if no_guess else 'u'}_{gx}_{gy}.pool")
+                temporaire = chemin + ".tmp"
+                with open(temporaire, "wb") as f:
+                    f.write(HEADER.pack(MAGIC, VERSION, no_guess, n, m, nbr_mines, gx, gy))
+                    if vue is not None:
+                        f.write(vue[HEADER.size:HEADER.size + nombre * taille])
+                    for bits in self.fresh.pop(key, []):
+                        f.write(bits)
+                if vue is not None:
+                    vue.close()
+                os.replace(temporaire, chemin)
+                self._map(chemin)
+
+    def close(self):
+        """
+        Attend les générations en cours, sauvegarde et libère les mmap
+        """
+        for executor in self.retired + [self.executor]:
+            if executor is not None:
+                executor.shutdown(wait=True)
+        self.executor = None
+        self.workers = 0
+        self.retired.clear()
+        self.save()
+        with self.lock:
+            for vue, _ in self.stored.values():
+                vue.close()
+            self.stored.clear()
+
+
+class PoolTestCase(unittest.TestCase):
+
+    def test_take_moves_safe_zone(self):
+        """Un plateau de la réserve est ramené sur n'importe quelle case cliquée"""
+        with tempfile.TemporaryDirectory() as dossier:
+            pool = BoardPool(dossier)
+            for x, y in [(0, 0), (8, 15), (4, 0), (0, 7), (3, 11), (8, 6)]:
+                key, _ = pool_key(16, 9, 30, x, y)
+                pool.fresh[key] = [_generate_bitset((key, 1))]
+                mines = pool.take(16, 9, 30, x, y)
+                self.assertEqual(len(set(mines)), 30)
+                zone = set(dm.get_neighbors(dm.create_board(16, 9), x, y)) | {(x, y)}
+                self.assertTrue(zone.isdisjoint(mines))
+            self.assertIsNone(pool.take(16, 9, 30, 4, 4))
+
+    def test_save_and_reload(self):
+        """Les plateaux non utilisés sont sauvegardés et relus par mmap"""
+        with tempfile.TemporaryDirectory() as dossier:
+            pool = BoardPool(dossier)
+            key, _ = pool_key(9, 9, 10, 4, 4)
+            pool.fill(key, 3, workers=1, seed=5)
+            pool.close()
+            self.assertEqual(BoardPool(dossier).available(key), 3)
+            pool = BoardPool(dossier)
+            premier = pool.take(9, 9, 10, 4, 4)
+            pool.close()
+            pool = BoardPool(dossier)
+            self.assertEqual(pool.available(key), 2)
+            self.assertNotEqual(pool.take(9, 9, 10, 4, 4), None)
+            pool.close()
+            self.assertEqual(len(premier), 10)
+
+    def test_take_refills(self):
+        """Prendre un plateau en relance la génération, même sur une réserve vide, avec le nombre de processus demandé"""
+        with tempfile.TemporaryDirectory() as dossier:
+            pool = BoardPool(dossier)
+            key, _ = pool_key(9, 9, 10, 4, 4)
+            self.assertIsNone(pool.take(9, 9, 10, 4, 4, refill=2))
+            for future in pool.fill(key, 1, workers=2, seed=1):
+                future.result()
+            self.assertEqual(pool.workers, 2)
+            self.assertEqual(len(pool.take(9, 9, 10, 4, 4, refill=1)), 10)
+            self.assertEqual(pool.workers, 2)
+            pool.close()
+            self.assertEqual(BoardPool(dossier).available(key), 3)
+
+    def test_game_session_uses_pool(self):
+        """Une GameSession prend son plateau dans la réserve"""
+        with tempfile.TemporaryDirectory() as dossier:
+            pool = BoardPool(dossier)
+            key, _ = pool_key(9, 9, 10, 0, 8)
+            pool.fresh[key] = [mines_to_bitset([(8, i) for i in range(9)] + [(7, 0)], 9, 9)]
+            session = dm.GameSession(9, 9, 10, pool=pool)
+            session.reveal(0, 8)  # Miroir des colonnes
+            self.assertEqual(sorted(session.mines), sorted([(8, 8 - i) for i in range(9)] + [(7, 8)]))
+            self.assertEqual(pool.available(key), 0)
+
+    def test_no_guess_mirror(self):
+        """Un plateau sans hasard n'est que retourné en miroir et reste résoluble"""
+        import demineur_generation
+        import demineur_solveur
+        key, transformation = pool_key(16, 16, 40, 13, 2, no_guess=True)
+        self.assertEqual(key[4:], (2, 2))
+        mines = bitset_to_mines(_generate_bitset((key, 3)), 16, transformation, 16)
+        board = dm.CompactBoard(16, 16)
+        for x, y in mines:
+            board.cells[board.index(x, y)] |= dm.CASE_MINE
+        dm.fill_in_board(board)
+        solver = demineur_solveur.Solver(16, 16, 40)
+        self.assertTrue(demineur_generation.solve_from_state(board, solver, dm.propagate_click(board, board, 13, 2)))
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,316 @@
+"""
+Sauvegarde et relecture de parties : format binaire compact, lu en flux (une archive peut dépasser la mémoire)
+Utilisation : python demineur_modif.py replay fichier.dms [--game K] [--move N] [--stats]
+
+Format : b"DMSV", version, puis pour chaque partie :
+    varint colonnes, varint lignes, varint graine, bitset des mines (voir demineur_pool.mines_to_bitset),
+    coups en varint ((ligne * colonnes + colonne) << 2 | action), terminés par FIN
+"""
+
+import argparse
+import io
+import itertools
+import random
+import sys
+import time
+import unittest
+
+import demineur_modif as dm
+from demineur_pool import bitset_to_mines, mines_to_bitset
+
+MAGIC = b"DMSV"
+VERSION = 1
+TAILLE_BLOC = 1 << 16  # Lecture du fichier par blocs de 64 Kio
+
+# Codes des actions dans le journal des coups
+DEVOILER = 0
+DRAPEAU = 1
+ENLEVER_DRAPEAU = 2
+FIN = 3
+ACTION_CODES = {"c": DEVOILER, "f": DRAPEAU, ".": ENLEVER_DRAPEAU}
+CODE_ACTIONS = ("c", "f", ".")
+
+
+def _varint(valeur:int, sortie:bytearray):
+    """
+    Ajoute un entier positif en varint (7 bits par octet, bit de poids fort : la suite continue)
+    """
+    while valeur > 0x7F:
+        sortie.append(valeur & 0x7F | 0x80)
+        valeur >>= 7
+    sortie.append(valeur)
+
+
+def encode_game(n:int, m:int, mines : list[tuple[int, int]], moves, seed:int=0):
+    """
+    Code une partie (sans l'en-tête du fichier)
+    Paramètres:
+        n (int): nombre de colonnes
+        m (int): nombre de lignes
+        mines (List[tuple[int, int]]): liste des mines
+        moves (Iterable[tuple[str, int, int]]): coups joués (action, ligne, colonne)
+        seed (int): graine de la partie (0 si inconnue)
+    Returns:
+        bytes: partie codée
+    """
+    sortie = bytearray()
+    _varint(n, sortie)
+    _varint(m, sortie)
+    _varint(seed, sortie)
+    sortie += mines_to_bitset(mines, n, m)
+    for action, pos_x, pos_y in moves:
+        _varint((pos_x * n + pos_y) << 2 | ACTION_CODES.get(action, DEVOILER), sortie)
+    sortie.append(FIN)
+    return bytes(sortie)
+
+
+def write_header(f):
+    """
+    Écrit l'en-tête d'une archive (une seule fois, avant la première partie)
+    """
+    f.write(MAGIC + bytes([VERSION]))
+
+
+def save_session(f, session : dm.GameSession, seed:int=0):
+    """
+    Ajoute une partie commencée à une archive ouverte en écriture binaire
+    """
+    if not session.started:
+        raise ValueError("La partie n'a pas commencé : aucune mine à sauvegarder.")
+    f.write(encode_game(session.n, session.m, session.mines, session.moves, seed))
+
+
+class _Reader:
+    """
+    Lecture en flux d'un fichier binaire, par blocs de TAILLE_BLOC octets
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = b""
+        self.pos = 0
+
+    def _fill(self, besoin:int):
+        """
+        Garde au moins besoin octets non lus dans le tampon (moins en fin de fichier)
+        """
+        reste = self.buffer[self.pos:]
+        while len(reste) < besoin:
+            bloc = self.f.read(max(TAILLE_BLOC, besoin))
+            if not bloc:
+                break
+            reste += bloc
+        self.buffer = reste
+        self.pos = 0
+        return len(reste) >= besoin
+
+    def read(self, taille:int):
+        if self.pos + taille > len(self.buffer) and not self._fill(taille):
+            raise ValueError("Archive tronquée.")
+        donnees = self.buffer[self.pos:self.pos + taille]
+        self.pos += taille
+        return donnees
+
+    def read_varint(self):
+        buffer, pos = self.buffer, self.pos
+        valeur = decalage = 0
+        while True:
+            if pos >= len(buffer):
+                self.pos = pos
+                if not self._fill(1):
+                    raise ValueError("Archive tronquée.")
+                buffer, pos = self.buffer, 0
+            octet = buffer[pos]
+            pos += 1
+            valeur |= (octet & 0x7F) << decalage
+            if octet < 0x80:
+                self.pos = pos
+                return valeur
+            decalage += 7
+
+    def at_end(self):
+        return self.pos >= len(self.buffer) and not self._fill(1)
+
+
+class SavedGame:
+    """
+    Partie lue dans une archive. Les coups sont lus à la demande (une seule fois, dans l'ordre) :
+    ceux qui n'ont pas été lus sont sautés au passage à la partie suivante.
+    """
+
+    def __init__(self, reader : _Reader, index:int):
+        self.index = index
+        self.n = reader.read_varint()
+        self.m = reader.read_varint()
+        self.seed = reader.read_varint()
+        self.bitset = reader.read((self.n * self.m + 7) // 8)
+        self._reader = reader
+        self._finished = False
+        self.moves = self._moves()
+
+    @property
+    def mines(self):
+        return bitset_to_mines(self.bitset, self.n, m=self.m)
+
+    def _moves(self):
+        read_varint = self._reader.read_varint
+        n = self.n
+        while True:
+            code = read_varint()
+            action = code & 3
+            if action == FIN:
+                self._finished = True
+                return
+            yield CODE_ACTIONS[action], *divmod(code >> 2, n)
+
+    def skip(self):
+        """
+        Saute les coups non lus (appelé avant de lire la partie suivante)
+        """
+        if not self._finished:
+            for _ in self.moves:
+                pass
+
+
+def iter_games(f):
+    """
+    Parcourt en flux les parties d'une archive ouverte en lecture binaire
+    Yields:
+        SavedGame: partie (en-tête lu, coups lus à la demande)
+    """
+    reader = _Reader(f)
+    if reader.read(len(MAGIC) + 1) != MAGIC + bytes([VERSION]):
+        raise ValueError("Ce fichier n'est pas une archive de parties (ou sa version n'est pas prise en charge).")
+    for index in itertools.count():
+        if reader.at_end():
+            return
+        game = SavedGame(reader, index)
+        yield game
+        game.skip()
+
+
+def replay(game : SavedGame, upto:int=None, compact:bool=True):
+    """
+    Reconstruit l'état d'une partie sauvegardée
+    Paramètres:
+        game (SavedGame): partie lue par iter_games (ses coups ne doivent pas avoir été lus)
+        upto (int): nombre de coups à rejouer (None : toute la partie)
+        compact (bool): utilise un CompactBoard (plus rapide) au lieu des listes de listes
+    Returns:
+        GameSession: partie après les coups rejoués
+    """
+    session = dm.GameSession(game.n, game.m, 0, compact=compact)
+    session.load_mines(game.mines)
+    session.apply_moves(game.moves if upto is None else itertools.islice(game.moves, upto))
+    return session
+
+
+def replay_stats(f):
+    """
+    Rejoue toutes les parties d'une archive
+    Returns:
+        dict: nombre de parties, victoires, coups et durée
+    """
+    debut = time.perf_counter()
+    parties = victoires = coups = 0
+    for game in iter_games(f):
+        session = replay(game)
+        parties += 1
+        victoires += session.won
+        coups += len(session.moves)
+    duree = time.perf_counter() - debut
+    return {"games": parties, "wins": victoires, "moves": coups, "seconds": duree,
+            "games_per_minute": parties * 60 / duree if duree else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="demineur_modif.py replay", description="Relecture de parties sauvegardées")
+    parser.add_argument("archive", help="fichier de parties sauvegardées")
+    parser.add_argument("--game", type=int, default=0, help="numéro de la partie à afficher (à partir de 0)")
+    parser.add_argument("--move", type=int, default=None, help="nombre de coups à rejouer (par défaut : tous)")
+    parser.add_argument("--stats", action="store_true", help="rejoue toute l'archive et affiche des statistiques")
+    args = parser.parse_args(argv)
+
+    with open(args.archive, "rb") as f:
+        if args.stats:
+            stats = replay_stats(f)
+            print(f"Parties : {stats['games']} (taux de victoire : {stats['wins'] / max(stats['games'], 1):.2%}, {stats['moves']} coups)")
+            print(f"Durée : {stats['seconds']:.2f} s ({stats['games_per_minute']:,.0f} parties/min)")
+            return stats
+        for game in iter_games(f):
+            if game.index == args.game:
+                session = replay(game, args.move, compact=False)
+                dm.print_board(session.game_board)
+                print()
+                print(f"Partie {game.index} ({game.n}x{game.m}, graine {game.seed}), {len(session.moves)} coups rejoués")
+                return session
+    print(f"Partie {args.game} absente de l'archive.", file=sys.stderr)
+    return None
+
+
+class SauvegardeTestCase(unittest.TestCase):
+
+    def _archive(self, nbr_parties:int):
+        rng = random.Random(4)
+        archive = io.BytesIO()
+        write_header(archive)
+        sessions = []
+        for i in range(nbr_parties):
+            session = dm.GameSession(9, 7, 10, rng=rng, compact=True)
+            session.flag(6, 8)
+            session.unflag(6, 8)
+            cases = [(x, y) for x in range(7) for y in range(9)]
+            rng.shuffle(cases)
+            session.apply_moves(("c", x, y) for x, y in cases)
+            save_session(archive, session, seed=i)
+            sessions.append(session)
+        archive.seek(0)
+        return archive, sessions
+
+    def test_round_trip(self):
+        """Une partie relue redonne les mêmes mines, les mêmes coups et le même plateau"""
+        archive, sessions = self._archive(20)
+        lues = 0
+        for game, session in zip(iter_games(archive), sessions):
+            self.assertEqual((game.n, game.m, game.seed), (9, 7, game.index))
+            self.assertEqual(sorted(game.mines), sorted(session.mines))
+            rejouee = replay(game)
+            self.assertEqual(rejouee.moves, session.moves)
+            self.assertEqual(rejouee.game_board.cells, session.game_board.cells)
+            self.assertEqual((rejouee.won, rejouee.lost), (session.won, session.lost))
+            lues += 1
+        self.assertEqual(lues, 20)
+
+    def test_partial_replay_and_skip(self):
+        """On peut rejouer le début d'une partie et sauter les parties non lues"""
+        archive, sessions = self._archive(5)
+        games = iter_games(archive)
+        next(games)
+        game = next(games)
+        self.assertEqual(game.index, 1)
+        debut = replay(game, upto=2, compact=False)
+        self.assertEqual(debut.moves, sessions[1].moves[:2])
+        self.assertEqual(debut.game_board, dm.create_board(9, 7))  # Flag posé puis enlevé
+        self.assertEqual([g.index for g in games], [2, 3, 4])
+
+    def test_streaming_small_blocks(self):
+        """La lecture par blocs ne dépend pas de la taille des blocs"""
+        global TAILLE_BLOC
+        archive, _ = self._archive(10)
+        attendu = [list(g.moves) for g in iter_games(archive)]
+        archive.seek(0)
+        ancienne, TAILLE_BLOC = TAILLE_BLOC, 3
+        try:
+            self.assertEqual([list(g.moves) for g in iter_games(archive)], attendu)
+        finally:
+            TAILLE_BLOC = ancienne
+
+    def test_invalid_archive(self):
+        with self.assertRaises(ValueError):
+            list(iter_games(io.BytesIO(b"PAS UNE ARCHIVE")))
+        with self.assertRaises(ValueError):
+            list(iter_games(io.BytesIO(MAGIC + bytes([VERSION]) + encode_game(9, 9, [(0, 0)], [("c", 4, 4)])[:-2])))
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,423 @@
+"""
+Serveur de parties de démineur (asyncio, protocole ligne par ligne sur TCP) et client de charge
+Utilisation : python demineur_modif.py serve [--port P]
+              python demineur_modif.py load [--sessions N --connections C --port P --spawn]
+
+Protocole (une commande par ligne, une réponse par ligne) :
+    NEW colonnes lignes mines       -> OK id
+    id [action] [ligne] [colonne]   -> OK id état ligne,colonne,valeur ... [+K]  (cases modifiées par le coup)
+    MORE id                         -> OK id état ligne,colonne,valeur ... [+K]  (suite des cases modifiées)
+    QUIT id                         -> OK id
+    en cas d'erreur                 -> ERR message
+état : EN_COURS, GAGNE ou PERDU ; valeur : compte, X (mine), F (flag) ou . (case cachée)
+Une réponse donne au plus CASES_REPONSE cases : +K indique K cases de plus, à demander avec MORE.
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import subprocess
+import sys
+import time
+import unittest
+
+import demineur_modif as dm
+
+EN_COURS = "EN_COURS"
+GAGNE = "GAGNE"
+PERDU = "PERDU"
+IDLE_TIMEOUT = 300.0  # Secondes sans coup avant qu'une partie soit libérée
+MAX_SESSIONS = 100000  # Parties simultanées (chacune coûte aussi ses cases, voir CASES_MAX)
+CASES_MAX = 1 << 28  # Cases de toutes les parties hébergées (un octet chacune : 256 Mio)
+TAILLE_MAX = 1000  # Côté maximal d'un plateau
+CASES_THREAD = 10000  # À partir de cette taille, les coups qui dévoilent sont joués hors de la boucle d'événements
+CASES_REPONSE = 4096  # Cases modifiées données au plus par réponse (la suite avec MORE)
+
+
+class _Entry:
+    """
+    Partie hébergée par le serveur
+    """
+    __slots__ = ("session", "lock", "last_used", "pending", "sent")
+
+    def __init__(self, session : dm.GameSession):
+        self.session = session
+        self.lock = asyncio.Lock()  # Un coup à la fois par partie, même depuis plusieurs connexions
+        self.last_used = time.monotonic()
+        self.pending = []  # Cases modifiées par le dernier coup
+        self.sent = 0  # Nombre de ces cases déjà envoyées
+
+
+def _valeur(board : dm.CompactBoard, pos_x:int, pos_y:int):
+    case = board.cell(pos_x, pos_y)
+    if case & dm.CASE_DRAPEAU:
+        return "F"
+    if not case & dm.CASE_DEVOILEE:
+        return "."
+    if case & dm.CASE_MINE:
+        return "X"
+    return str(case & dm.CASE_COMPTE)
+
+
+class GameServer:
+    """
+    Héberge des milliers de GameSession (plateaux compacts) dans un seul processus
+    """
+
+    def __init__(self, idle_timeout:float=IDLE_TIMEOUT, max_sessions:int=MAX_SESSIONS, max_cells:int=CASES_MAX):
+        """
+        Paramètres:
+            idle_timeout (float): secondes sans coup avant qu'une partie soit libérée
+            max_sessions (int): nombre maximal de parties simultanées
+            max_cells (int): nombre maximal de cases de l'ensemble des parties (borne la mémoire des plateaux)
+        """
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.max_cells = max_cells
+        self.cells = 0  # Cases des parties hébergées
+        self.sessions = {}  # id -> _Entry
+        self.ids = itertools.count(1)
+        self.server = None
+        self._evictor = None
+
+    async def start(self, host:str="127.0.0.1", port:int=0):
+        """
+        Ouvre le port d'écoute (0 : port libre choisi par le système) et lance la libération des parties inactives
+        Returns:
+            int: port d'écoute
+        """
+        self.server = await asyncio.start_server(self._handle, host, port)
+        self._evictor = asyncio.create_task(self._evict_loop())
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._evictor is not None:
+            self._evictor.cancel()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def evict_idle(self, now:float=None):
+        """
+        Libère les parties sans coup depuis plus de idle_timeout secondes
+        Returns:
+            int: nombre de parties libérées
+        """
+        limite = (time.monotonic() if now is None else now) - self.idle_timeout
+        inactives = [sid for sid, entry in self.sessions.items() if entry.last_used < limite and not entry.lock.locked()]
+        for sid in inactives:
+            self._drop(sid)
+        return len(inactives)
+
+    def _drop(self, sid:str):
+        """
+        Libère une partie
+        Returns:
+            bool: False si la partie n'existe pas
+        """
+        entry = self.sessions.pop(sid, None)
+        if entry is None:
+            return False
+        self.cells -= entry.session.n * entry.session.m
+        return True
+
+    async def _evict_loop(self):
+        while True:
+            await asyncio.sleep(min(self.idle_timeout, 60.0) / 2 or 1.0)
+            self.evict_idle()
+
+    async def _handle(self, reader : asyncio.StreamReader, writer : asyncio.StreamWriter):
+        try:
+            while True:
+                ligne = await reader.readline()
+                if not ligne:
+                    break
+                writer.write((await self.handle_line(ligne.decode("utf-8", "replace").strip()) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle_line(self, ligne:str):
+        """
+        Traite une commande du protocole
+        Returns:
+            str: réponse (sans retour à la ligne)
+        """
+        mots = ligne.split(maxsplit=1)
+        if not mots:
+            return "ERR commande vide"
+        if mots[0] == "NEW":
+            return self._new(mots[1] if len(mots) > 1 else "")
+        if mots[0] == "QUIT":
+            sid = mots[1] if len(mots) > 1 else ""
+            return f"OK {sid}" if self._drop(sid) else f"ERR partie inconnue {sid}"
+        if mots[0] == "MORE":
+            sid = mots[1] if len(mots) > 1 else ""
+            entry = self.sessions.get(sid)
+            if entry is None:
+                return f"ERR partie inconnue {sid}"
+            async with entry.lock:
+                return self._reply(sid, entry)
+        entry = self.sessions.get(mots[0])
+        if entry is None:
+            return f"ERR partie inconnue {mots[0]}"
+        coup = dm.parse_move(mots[1]) if len(mots) > 1 else None
+        if coup is None:
+            return "ERR format attendu : id [action] [ligne] [colonne]"
+        return await self._move(mots[0], entry, *coup)
+
+    def _new(self, arguments:str):
+        try:
+            n, m, nbr_mines = map(int, arguments.split())
+        except ValueError:
+            return "ERR format attendu : NEW colonnes lignes mines"
+        if not (0 < n <= TAILLE_MAX and 0 < m <= TAILLE_MAX and 0 <= nbr_mines <= n * m - 9):
+            return "ERR dimensions ou nombre de mines invalides"
+        if len(self.sessions) >= self.max_sessions or self.cells + n * m > self.max_cells:
+            self.evict_idle()
+            if len(self.sessions) >= self.max_sessions or self.cells + n * m > self.max_cells:
+                return "ERR trop de parties en cours"
+        sid = str(next(self.ids))
+        self.sessions[sid] = _Entry(dm.GameSession(n, m, nbr_mines, compact=True))
+        self.cells += n * m
+        return f"OK {sid}"
+
+    async def _move(self, sid:str, entry : _Entry, action:str, pos_x:int, pos_y:int):
+        async with entry.lock:
+            session = entry.session
+            entry.last_used = time.monotonic()
+            try:
+                if action in ("f", ".") or session.n * session.m < CASES_THREAD:
+                    result = session._play(action, pos_x, pos_y)
+                else:  # Placement des mines et propagation longs sur un grand plateau : hors de la boucle d'événements
+                    result = await asyncio.get_running_loop().run_in_executor(None, session._play, action, pos_x, pos_y)
+            except ValueError as e:
+                return f"ERR {e}"
+            entry.pending = result.changed
+            entry.sent = 0
+            return self._reply(sid, entry)
+
+    def _reply(self, sid:str, entry : _Entry):
+        """
+        Réponse à un coup : état de la partie et au plus CASES_REPONSE cases modifiées, les autres restent à envoyer
+        """
+        session = entry.session
+        etat = GAGNE if session.won else PERDU if session.lost else EN_COURS
+        board = session.game_board
+        debut, entry.sent = entry.sent, min(entry.sent + CASES_REPONSE, len(entry.pending))
+        mots = [f"OK {sid} {etat}"] + [f"{x},{y},{_valeur(board, x, y)}" for x, y in entry.pending[debut:entry.sent]]
+        if entry.sent < len(entry.pending):
+            mots.append(f"+{len(entry.pending) - entry.sent}")
+        return " ".join(mots)
+
+
+async def serve(host:str="127.0.0.1", port:int=8765, idle_timeout:float=IDLE_TIMEOUT):
+    server = GameServer(idle_timeout)
+    port = await server.start(host, port)
+    print(f"Serveur de démineur en écoute sur {host}:{port}", flush=True)
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+async def load_test(host:str, port:int, nbr_sessions:int=10000, nbr_connexions:int=100, nbr_coups:int=20,
+                    n:int=9, m:int=9, nbr_mines:int=10, seed:int=0):
+    """
+    Ouvre nbr_sessions parties réparties sur nbr_connexions connexions, puis joue nbr_coups tours :
+    à chaque tour, chaque partie joue un coup au hasard (une partie terminée est remplacée par une nouvelle)
+    Returns:
+        dict: nombre de coups, latences p50/p99 et maximale en secondes, coups par seconde
+    """
+    latences = []
+
+    async def client(k:int, nbr:int):
+        reader, writer = await asyncio.open_connection(host, port)
+
+        async def requete(ligne:str):
+            writer.write(ligne.encode() + b"\n")
+            await writer.drain()
+            reponse = (await reader.readline()).decode().split()
+            if not reponse or reponse[0] != "OK":
+                raise RuntimeError(f"Réponse inattendue à {ligne!r} : {' '.join(reponse)}")
+            return reponse
+
+        rng = random.Random(f"{seed}-{k}")
+        ids = [(await requete(f"NEW {n} {m} {nbr_mines}"))[1] for _ in range(nbr)]
+        for _ in range(nbr_coups):
+            for i, sid in enumerate(ids):
+                debut = time.perf_counter()
+                reponse = await requete(f"{sid} c {rng.randrange(m)} {rng.randrange(n)}")
+                latences.append(time.perf_counter() - debut)
+                if reponse[2] != EN_COURS:
+                    await requete(f"QUIT {sid}")
+                    ids[i] = (await requete(f"NEW {n} {m} {nbr_mines}"))[1]
+        writer.close()
+
+    debut = time.perf_counter()
+    parts = [nbr_sessions // nbr_connexions + (k < nbr_sessions % nbr_connexions) for k in range(nbr_connexions)]
+    await asyncio.gather(*(client(k, nbr) for k, nbr in enumerate(parts) if nbr))
+    duree = time.perf_counter() - debut
+    latences.sort()
+    return {"moves": len(latences), "p50": latences[len(latences) // 2],
+            "p99": latences[min(len(latences) - 1, len(latences) * 99 // 100)], "max": latences[-1],
+            "moves_per_second": len(latences) / duree}
+
+
+async def _wait_for_server(host:str, port:int, delai:float=10.0):
+    limite = time.monotonic() + delai
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > limite:
+                raise
+            await asyncio.sleep(0.05)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="demineur_modif.py", description="Serveur de parties de démineur et client de charge")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+    serveur = commandes.add_parser("serve", help="lance le serveur")
+    charge = commandes.add_parser("load", help="mesure la latence des coups sous charge")
+    for sous in (serveur, charge):
+        sous.add_argument("--host", default="127.0.0.1", help="adresse d'écoute")
+        sous.add_argument("--port", type=int, default=8765, help="port d'écoute")
+    serveur.add_argument("--idle", type=float, default=IDLE_TIMEOUT, help="secondes avant de libérer une partie inactive")
+    charge.add_argument("--sessions", type=int, default=10000, help="parties simultanées")
+    charge.add_argument("--connections", type=int, default=100, help="connexions au serveur")
+    charge.add_argument("--moves", type=int, default=20, help="coups joués par partie")
+    charge.add_argument("--spawn", action="store_true", help="lance le serveur dans un processus séparé")
+    args = parser.parse_args(argv)
+
+    if args.commande == "serve":
+        try:
+            asyncio.run(serve(args.host, args.port, args.idle))
+        except KeyboardInterrupt:
+            pass
+        return None
+
+    processus = None
+    if args.spawn:
+        processus = subprocess.Popen([sys.executable, __file__, "serve", "--host", args.host, "--port", str(args.port)],
+                                     stdout=subprocess.DEVNULL)
+    try:
+        if processus is not None:
+            asyncio.run(_wait_for_server(args.host, args.port))
+        stats = asyncio.run(load_test(args.host, args.port, args.sessions, args.connections, args.moves))
+    finally:
+        if processus is not None:
+            processus.terminate()
+            processus.wait()
+    print(f"{stats['moves']} coups sur {args.sessions} parties ({args.connections} connexions) : "
+          f"{stats['moves_per_second']:,.0f} coups/s")
+    print(f"Latence : p50 {stats['p50'] * 1e3:.2f} ms, p99 {stats['p99'] * 1e3:.2f} ms, max {stats['max'] * 1e3:.2f} ms")
+    return stats
+
+
+class ServeurTestCase(unittest.TestCase):
+
+    def test_protocol(self):
+        """Une partie se joue ligne par ligne et seules les cases modifiées sont renvoyées"""
+        async def scenario():
+            server = GameServer()
+            sid = (await server.handle_line("NEW 9 9 10")).split()[1]
+            reponse = (await server.handle_line(f"{sid} c 4 4")).split()
+            self.assertEqual(reponse[:3], ["OK", sid, EN_COURS])
+            session = server.sessions[sid].session
+            self.assertEqual(sorted(tuple(map(int, c.split(",")[:2])) for c in reponse[3:]),
+                             sorted(session.last_result.changed))
+            x, y = session.mines[0]
+            self.assertEqual(await server.handle_line(f"{sid} f {x} {y}"), f"OK {sid} {EN_COURS} {x},{y},F")
+            self.assertEqual(await server.handle_line(f"{sid} f {x} {y}"), f"OK {sid} {EN_COURS}")
+            self.assertEqual(await server.handle_line(f"{sid} c {x} {y}"), f"OK {sid} {EN_COURS}")  # Case sous un flag
+            self.assertEqual(await server.handle_line(f"{sid} . {x} {y}"), f"OK {sid} {EN_COURS} {x},{y},.")
+            self.assertEqual(await server.handle_line(f"{sid} c {x} {y}"), f"OK {sid} {PERDU} {x},{y},X")
+            self.assertTrue((await server.handle_line(f"{sid} c 9 0")).startswith("ERR"))
+            self.assertTrue((await server.handle_line(f"{sid} x 1 1")).startswith("ERR"))
+            self.assertTrue((await server.handle_line("NEW 3 3 5")).startswith("ERR"))
+            self.assertEqual(await server.handle_line(f"QUIT {sid}"), f"OK {sid}")
+            self.assertTrue((await server.handle_line(f"{sid} c 0 0")).startswith("ERR"))
+        asyncio.run(scenario())
+
+    def test_large_board_replies(self):
+        """Sur un grand plateau, les réponses sont bornées et les dévoilements se jouent hors de la boucle d'événements"""
+        async def scenario():
+            global CASES_REPONSE
+            ancienne, CASES_REPONSE = CASES_REPONSE, 100
+            boucle = asyncio.get_running_loop()
+            threads = []
+            executeur = boucle.run_in_executor
+
+            def run_in_executor(executor, func, *args):
+                threads.append(args[0])
+                return executeur(executor, func, *args)
+
+            boucle.run_in_executor = run_in_executor
+            try:
+                server = GameServer()
+                sid = (await server.handle_line("NEW 200 200 1")).split()[1]
+                recues = []
+                reponse = (await server.handle_line(f"{sid} c 100 100")).split()
+                while True:
+                    self.assertLessEqual(len(reponse) - 3, CASES_REPONSE + 1)
+                    recues += [c for c in reponse[3:] if not c.startswith("+")]
+                    if not reponse[-1].startswith("+"):
+                        break
+                    reponse = (await server.handle_line(f"MORE {sid}")).split()
+                session = server.sessions[sid].session
+                changed = session.last_result.changed
+                self.assertGreater(len(changed), 10 * CASES_REPONSE)
+                self.assertEqual(recues, [f"{x},{y},{_valeur(session.game_board, x, y)}" for x, y in changed])
+                await server.handle_line(f"{sid} f {session.mines[0][0]} {session.mines[0][1]}")
+                self.assertEqual(threads, ["c"])  # Le flag se joue dans la boucle
+            finally:
+                CASES_REPONSE = ancienne
+                del boucle.run_in_executor
+        asyncio.run(scenario())
+
+    def test_cell_budget(self):
+        """Le nombre de parties est aussi borné par le total de leurs cases"""
+        async def scenario():
+            server = GameServer(max_cells=1000)
+            sid = (await server.handle_line("NEW 30 30 10")).split()[1]
+            self.assertTrue((await server.handle_line("NEW 11 11 10")).startswith("ERR"))
+            self.assertTrue((await server.handle_line("NEW 9 9 10")).startswith("OK"))
+            await server.handle_line(f"QUIT {sid}")
+            self.assertEqual(server.cells, 81)
+            self.assertTrue((await server.handle_line("NEW 30 30 10")).startswith("OK"))
+        asyncio.run(scenario())
+
+    def test_idle_eviction(self):
+        """Les parties inactives sont libérées, pas celles qui viennent de jouer"""
+        async def scenario():
+            server = GameServer(idle_timeout=10.0, max_sessions=3)
+            ids = [(await server.handle_line("NEW 9 9 10")).split()[1] for _ in range(3)]
+            self.assertTrue((await server.handle_line("NEW 9 9 10")).startswith("ERR"))
+            server.sessions[ids[0]].last_used -= 60
+            self.assertEqual(server.evict_idle(), 1)
+            self.assertEqual(sorted(server.sessions), sorted(ids[1:]))
+            self.assertTrue((await server.handle_line("NEW 9 9 10")).startswith("OK"))
+        asyncio.run(scenario())
+
+    def test_load_over_localhost(self):
+        """Le client de charge joue sur un vrai serveur en local"""
+        async def scenario():
+            server = GameServer()
+            port = await server.start()
+            try:
+                stats = await load_test("127.0.0.1", port, nbr_sessions=50, nbr_connexions=5, nbr_coups=5)
+            finally:
+                await server.close()
+            self.assertEqual(stats["moves"], 250)
+            self.assertLessEqual(stats["p50"], stats["p99"])
+        asyncio.run(scenario())
+
+
+if __name__ == '__main__':
+    main()
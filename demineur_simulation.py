@@ -0,0 +1,165 @@
+"""
+Simulation Monte-Carlo de parties de démineur sur plusieurs processus
+Utilisation : python demineur_modif.py simulate --games N --workers K [--cols C --rows R --mines M --policy P]
+"""
+
+import argparse
+import importlib
+import random
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import demineur_modif as dm
+import demineur_solveur
+
+
+def random_policy(session : dm.GameSession, rng : random.Random):
+    """
+    Politique de référence : dévoile les cases cachées dans un ordre aléatoire
+    Paramètres:
+        session (GameSession): partie en cours (lue entre deux coups)
+        rng (random.Random): générateur aléatoire du processus
+    Yields:
+        tuple[str, int, int]: coup à jouer
+    """
+    cases = [(x, y) for x in range(session.m) for y in range(session.n)]
+    rng.shuffle(cases)
+    for x, y in cases:
+        if session.is_hidden(x, y):
+            yield ("c", x, y)
+
+
+# Politiques disponibles par nom ; "module:fonction" permet d'en charger une autre
+POLICIES = {
+    "random": random_policy,
+    "solver": demineur_solveur.solver_policy,
+}
+
+
+def get_policy(name:str):
+    """
+    Renvoie la politique de jeu correspondant à un nom de POLICIES ou à un chemin "module:fonction"
+    """
+    if name in POLICIES:
+        return POLICIES[name]
+    module, _, fonction = name.partition(":")
+    if not fonction:
+        raise ValueError(f"Politique inconnue : {name}")
+    return getattr(importlib.import_module(module), fonction)
+
+
+def simulate_games(n:int, m:int, nbr_mines:int, nbr_parties:int, seed, policy_name:str="random", no_guess:bool=False):
+    """
+    Joue des parties complètes dans le processus courant
+    Paramètres:
+        n (int): nombre de colonnes
+        m (int): nombre de lignes
+        nbr_mines (int): nombre de mines
+        nbr_parties (int): nombre de parties à jouer
+        seed: graine du générateur aléatoire de ce lot de parties
+        policy_name (str): politique de jeu (voir get_policy)
+        no_guess (bool): plateaux qui se résolvent sans deviner
+    Returns:
+        dict: parties, victoires, cases dévoilées, coups et durée totale (s)
+    """
+    policy = get_policy(policy_name)
+    rng = random.Random(seed)
+    stats = {"games": 0, "wins": 0, "revealed": 0, "moves": 0, "seconds": 0.0}
+    debut = time.perf_counter()
+    for _ in range(nbr_parties):
+        session = dm.GameSession(n, m, nbr_mines, rng=rng, compact=True, no_guess=no_guess)
+        results = session.apply_moves(policy(session, rng))
+        stats["games"] += 1
+        stats["wins"] += session.won
+        stats["moves"] += len(results)
+        stats["revealed"] += sum(len(result.changed) for result in results if result.action == "c")
+    stats["seconds"] = time.perf_counter() - debut
+    return stats
+
+
+def _simulate_chunk(args):
+    return simulate_games(*args)
+
+
+def _sum_stats(resultats):
+    """
+    Additionne les statistiques des lots
+    """
+    total = {"games": 0, "wins": 0, "revealed": 0, "moves": 0, "seconds": 0.0}
+    for stats in resultats:
+        for cle in total:
+            total[cle] += stats[cle]
+    return total
+
+
+TAILLE_LOT = 250  # Parties par tâche envoyée à un processus
+
+
+def simulate(n:int, m:int, nbr_mines:int, nbr_parties:int, workers:int=1, seed:int=0, policy_name:str="random", no_guess:bool=False):
+    """
+    Répartit les parties en lots sur un ProcessPoolExecutor et agrège les statistiques
+    Chaque lot a sa propre graine (seed, numéro du lot) : le résultat ne dépend pas du nombre de processus.
+    Returns:
+        dict: statistiques agrégées (voir simulate_games) plus win_rate, mean_revealed et games_per_second
+    """
+    lots = [(n, m, nbr_mines, min(TAILLE_LOT, nbr_parties - debut), f"{seed}-{i}", policy_name, no_guess)
+            for i, debut in enumerate(range(0, nbr_parties, TAILLE_LOT))]
+
+    debut = time.perf_counter()
+    if workers <= 1:
+        total = _sum_stats(map(_simulate_chunk, lots))
+    else:
+        # Le bloc with arrête les processus même si un lot échoue ou sur Ctrl-C
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            total = _sum_stats(executor.map(_simulate_chunk, lots))
+    duree = time.perf_counter() - debut
+
+    total["win_rate"] = total["wins"] / total["games"] if total["games"] else 0.0
+    total["mean_revealed"] = total["revealed"] / total["games"] if total["games"] else 0.0
+    total["wall_seconds"] = duree
+    total["games_per_second"] = total["games"] / duree if duree else 0.0
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="demineur_modif.py simulate", description="Simulation Monte-Carlo de parties de démineur")
+    parser.add_argument("--games", type=int, default=10000, help="nombre de parties")
+    parser.add_argument("--workers", type=int, default=1, help="nombre de processus")
+    parser.add_argument("--cols", type=int, default=9, help="nombre de colonnes")
+    parser.add_argument("--rows", type=int, default=9, help="nombre de lignes")
+    parser.add_argument("--mines", type=int, default=10, help="nombre de mines")
+    parser.add_argument("--seed", type=int, default=0, help="graine des générateurs aléatoires")
+    parser.add_argument("--policy", default="random", help="politique de jeu (nom ou module:fonction)")
+    parser.add_argument("--no-guess", action="store_true", help="plateaux qui se résolvent sans deviner")
+    args = parser.parse_args(argv)
+
+    stats = simulate(args.cols, args.rows, args.mines, args.games, args.workers, args.seed, args.policy, args.no_guess)
+    print(f"Parties : {stats['games']} ({args.cols}x{args.rows}, {args.mines} mines, politique {args.policy})")
+    print(f"Taux de victoire : {stats['win_rate']:.2%}")
+    print(f"Cases dévoilées par partie : {stats['mean_revealed']:.1f}")
+    print(f"Durée : {stats['wall_seconds']:.2f} s ({stats['games_per_second']:,.0f} parties/s, {stats['seconds']:.2f} s cumulées)")
+    return stats
+
+
+class SimulationTestCase(unittest.TestCase):
+
+    def test_simulate_independent_of_workers(self):
+        """Les statistiques ne dépendent que de la graine, pas du nombre de processus"""
+        seul = simulate(6, 6, 5, 300, workers=1, seed=2)
+        multi = simulate(6, 6, 5, 300, workers=2, seed=2)
+        for cle in ("games", "wins", "revealed", "moves"):
+            self.assertEqual(seul[cle], multi[cle])
+        self.assertEqual(seul["games"], 300)
+        self.assertTrue(0 <= seul["win_rate"] <= 1)
+
+    def test_get_policy(self):
+        """Une politique se charge par nom ou par chemin module:fonction"""
+        self.assertIs(get_policy("random"), random_policy)
+        self.assertIs(get_policy("demineur_simulation:random_policy"), random_policy)
+        with self.assertRaises(ValueError):
+            get_policy("inconnue")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,368 @@
+"""
+Solveur du démineur par propagation de contraintes, à partir du plateau visible uniquement
+"""
+
+import collections
+import random
+import unittest
+
+import demineur_modif as dm
+
+# État d'une case connu du solveur (0 à 8 : case dévoilée et son nombre de mines voisines)
+INCONNUE = 9  # case cachée, rien de déduit
+MINE = 10  # flag ou mine certaine
+SURE = 11  # case cachée sans mine certaine
+
+# Conseil donné par le solveur : kind vaut "safe", "mine" ou "guess"
+Hint = collections.namedtuple("Hint", ["kind", "pos_x", "pos_y", "probability"])
+
+
+def read_cell(game_board : list[list[str]], pos_x:int, pos_y:int):
+    """
+    Lit l'état visible d'une case (sans regarder les mines cachées d'un plateau compact)
+    Paramètres:
+        game_board (List[list[str]]): plateau de jeu (ou plateau compact)
+        pos_x (int): position en x de la case
+        pos_y (int): position en y de la case
+    Returns:
+        int: nombre de mines voisines si la case est dévoilée, MINE pour un flag ou une mine dévoilée, INCONNUE sinon
+    """
+    if isinstance(game_board, (dm.CompactBoard, dm.BitBoard)):
+        case = game_board.cell(pos_x, pos_y)
+        if case & dm.CASE_DRAPEAU:
+            return MINE
+        if not case & dm.CASE_DEVOILEE:
+            return INCONNUE
+        return MINE if case & dm.CASE_MINE else case & dm.CASE_COMPTE
+    case = game_board[pos_x][pos_y]
+    if case == '. ':
+        return INCONNUE
+    if case[0].isdigit():
+        return int(case[0])
+    return MINE  # Flag (F) ou mine dévoilée (X) en couleur
+
+
+class Solver:
+    """
+    Déduit les cases sûres et les mines certaines avec la règle d'une case (reste de mines nul ou égal
+    au nombre de voisines inconnues) et la règle des paires (inclusion des voisines inconnues de deux
+    cases). Seules les cases modifiées depuis la dernière mise à jour et leurs voisines sont réévaluées.
+    """
+
+    def __init__(self, n:int, m:int, nbr_mines:int=None):
+        """
+        Paramètres:
+            n (int): nombre de colonnes
+            m (int): nombre de lignes
+            nbr_mines (int): nombre total de mines, utilisé pour les probabilités hors frontière
+        """
+        self.n = n
+        self.m = m
+        self.nbr_mines = nbr_mines
+        self.table = dm.get_neighbor_table(n, m)
+        self.state = bytearray([INCONNUE]) * (n * m)
+        self.safe = set()  # cases sûres pas encore dévoilées
+        self.mines = set()  # mines certaines pas encore flaggées
+        self.frontier = set()  # cases dévoilées qui ont peut-être encore des voisines inconnues
+        self.paired = {}  # contrainte (nombre d'inconnues, reste) lors de la dernière règle des paires
+
+    def _neighbors(self, idx:int):
+        return [idx + d for d in self.table.offsets(idx // self.n, idx % self.n)]
+
+    def update(self, game_board : list[list[str]], changed=None):
+        """
+        Met à jour le solveur après un coup et relance les déductions sur les cases touchées
+        Paramètres:
+            game_board (List[list[str]]): plateau de jeu
+            changed (Iterable[tuple[int, int]]): cases modifiées (résultat de propagate_click) ; None relit tout le plateau
+        """
+        if changed is None:
+            self.state = bytearray([INCONNUE]) * (self.n * self.m)
+            self.safe.clear()
+            self.mines.clear()
+            self.frontier.clear()
+            self.paired.clear()
+            changed = ((x, y) for x in range(self.m) for y in range(self.n))
+        queue = set()
+        for pos_x, pos_y in changed:
+            idx = pos_x * self.n + pos_y
+            valeur = read_cell(game_board, pos_x, pos_y)
+            avant = self.state[idx]
+            if valeur == INCONNUE:
+                if avant == MINE and idx not in self.mines:  # Flag enlevé : les déductions sont recalculées
+                    return self.update(game_board)
+                continue
+            self.mines.discard(idx)
+            if valeur == avant:  # Flag posé sur une mine déjà déduite
+                continue
+            self.state[idx] = valeur
+            self.safe.discard(idx)
+            if valeur <= 8:
+                self.frontier.add(idx)
+                queue.add(idx)
+            queue.update(v for v in self._neighbors(idx) if self.state[v] <= 8)
+        self._propagate(queue)
+
+    def _constraint(self, idx:int):
+        """
+        Renvoie les voisines inconnues d'une case dévoilée et le nombre de mines qu'il reste à y placer
+        """
+        inconnues = []
+        state = self.state
+        reste = state[idx]
+        for d in self.table.offsets(idx // self.n, idx % self.n):
+            etat = state[idx + d]
+            if etat == INCONNUE:
+                inconnues.append(idx + d)
+            elif etat == MINE:
+                reste -= 1
+        return inconnues, reste
+
+    def _mark(self, idx:int, etat:int, queue:set):
+        if self.state[idx] != INCONNUE:
+            return
+        self.state[idx] = etat
+        (self.safe if etat == SURE else self.mines).add(idx)
+        queue.update(v for v in self._neighbors(idx) if self.state[v] <= 8)
+
+    def _propagate(self, queue:set):
+        while queue:
+            idx = queue.pop()
+            inconnues, reste = self._constraint(idx)
+            if not inconnues:
+                self.frontier.discard(idx)
+                self.paired.pop(idx, None)
+                continue
+            if reste == 0:
+                for v in inconnues:
+                    self._mark(v, SURE, queue)
+            elif reste == len(inconnues):
+                for v in inconnues:
+                    self._mark(v, MINE, queue)
+            elif self.paired.get(idx) != (len(inconnues), reste):
+                # Contrainte inchangée depuis la dernière règle des paires : une voisine modifiée
+                # sera elle-même réévaluée, la paire est donc testée de son côté
+                self.paired[idx] = (len(inconnues), reste)
+                self._pairs(idx, set(inconnues), reste, queue)
+
+    def _pairs(self, idx:int, inconnues:set, reste:int, queue:set):
+        """
+        Règle des paires avec les cases dévoilées qui partagent au moins une voisine inconnue
+        """
+        autres = {v + d for v in inconnues for d in self.table.offsets(v // self.n, v % self.n)}
+        autres.discard(idx)
+        for autre in autres:
+            if self.state[autre] > 8:
+                continue
+            liste, reste_autre = self._constraint(autre)
+            inconnues_autre = set(liste)
+            for petit, r_petit, grand, r_grand in ((inconnues, reste, inconnues_autre, reste_autre),
+                                                   (inconnues_autre, reste_autre, inconnues, reste)):
+                if petit and petit < grand:
+                    difference = grand - petit
+                    if r_grand == r_petit:
+                        for v in difference:
+                            self._mark(v, SURE, queue)
+                    elif r_grand - r_petit == len(difference):
+                        for v in difference:
+                            self._mark(v, MINE, queue)
+
+    def probabilities(self, max_component:int=20):
+        """
+        Probabilité de mine des cases inconnues de la frontière, par énumération des configurations
+        de chaque composante (configurations supposées équiprobables). Les composantes trop grandes
+        reçoivent la plus forte densité locale de leurs contraintes.
+        Paramètres:
+            max_component (int): nombre maximal de cases énumérées par composante
+        Returns:
+            Tuple[dict[int, float], float]: probabilités par indice de case, probabilité hors frontière
+        """
+        contraintes = []
+        for idx in list(self.frontier):
+            inconnues, reste = self._constraint(idx)
+            if inconnues:
+                contraintes.append((inconnues, reste))
+            else:
+                self.frontier.discard(idx)
+
+        # Composantes connexes : deux contraintes sont liées si elles partagent une case inconnue
+        parent = {}
+
+        def racine(v):
+            while parent[v] != v:
+                parent[v] = parent[parent[v]]
+                v = parent[v]
+            return v
+
+        for inconnues, _ in contraintes:
+            for v in inconnues:
+                parent.setdefault(v, v)
+            for v in inconnues[1:]:
+                parent[racine(v)] = racine(inconnues[0])
+        composantes = collections.defaultdict(list)
+        for c in contraintes:
+            composantes[racine(c[0][0])].append(c)
+
+        probas = {}
+        mines_attendues = 0.0
+        for liste in composantes.values():
+            cases = sorted({v for inconnues, _ in liste for v in inconnues})
+            if len(cases) <= max_component:
+                probas_composante = _enumerate(cases, liste)
+            else:
+                probas_composante = {}
+                for inconnues, reste in liste:
+                    for v in inconnues:
+                        probas_composante[v] = max(probas_composante.get(v, 0.0), reste / len(inconnues))
+            probas.update(probas_composante)
+            mines_attendues += sum(probas_composante.values())
+
+        interieures = self.state.count(INCONNUE) - len(probas)
+        if self.nbr_mines is None or interieures <= 0:
+            autre = 1.0 if interieures <= 0 else 0.5
+        else:
+            restantes = self.nbr_mines - self.state.count(MINE) - mines_attendues
+            autre = min(1.0, max(0.0, restantes / interieures))
+        return probas, autre
+
+    def hint(self):
+        """
+        Renvoie un conseil : une case sûre, sinon une mine certaine, sinon la case la moins risquée
+        Returns:
+            Hint: conseil (None si plus aucune case inconnue)
+        """
+        if self.safe:
+            idx = next(iter(self.safe))
+            return Hint("safe", idx // self.n, idx % self.n, 0.0)
+        if self.mines:
+            idx = next(iter(self.mines))
+            return Hint("mine", idx // self.n, idx % self.n, 1.0)
+        probas, autre = self.probabilities()
+        choix, proba = None, 2.0
+        if probas:
+            choix, proba = min(probas.items(), key=lambda item: item[1])
+        if autre < proba:
+            idx = self.state.find(INCONNUE)
+            while idx != -1 and idx in probas:
+                idx = self.state.find(INCONNUE, idx + 1)
+            if idx != -1:
+                choix, proba = idx, autre
+        if choix is None:
+            return None
+        return Hint("guess", choix // self.n, choix % self.n, proba)
+
+
+def _enumerate(cases:list, contraintes:list):
+    """
+    Énumère par retour arrière les placements de mines compatibles avec les contraintes d'une composante
+    Returns:
+        dict[int, float]: proportion des placements où chaque case est une mine
+    """
+    position = {v: i for i, v in enumerate(cases)}
+    locales = [([position[v] for v in inconnues], reste) for inconnues, reste in contraintes]
+    par_case = [[] for _ in cases]  # contraintes portant sur chaque case
+    for k, (inconnues, _) in enumerate(locales):
+        for i in inconnues:
+            par_case[i].append(k)
+    mines = [reste for _, reste in locales]  # mines encore à placer par contrainte
+    libres = [len(inconnues) for inconnues, _ in locales]  # cases non affectées par contrainte
+    affectation = [0] * len(cases)
+    compte = [0] * len(cases)
+    total = 0
+
+    def explorer(i):
+        nonlocal total
+        if i == len(cases):
+            total += 1
+            for j, a in enumerate(affectation):
+                compte[j] += a
+            return
+        for valeur in (0, 1):
+            possible = True
+            for k in par_case[i]:
+                libres[k] -= 1
+                mines[k] -= valeur
+                if mines[k] < 0 or mines[k] > libres[k]:
+                    possible = False
+            if possible:
+                affectation[i] = valeur
+                explorer(i + 1)
+            for k in par_case[i]:
+                libres[k] += 1
+                mines[k] += valeur
+        affectation[i] = 0
+
+    explorer(0)
+    if total == 0:
+        return {v: 0.5 for v in cases}
+    return {v: compte[i] / total for i, v in enumerate(cases)}
+
+
+def solver_policy(session : dm.GameSession, rng):
+    """
+    Politique de simulation guidée par le solveur : cases sûres, flags sur les mines certaines,
+    sinon la case la moins risquée. Le premier coup est joué au centre.
+    """
+    solver = Solver(session.n, session.m, session.nbr_mines)
+    yield ("c", session.m // 2, session.n // 2)
+    solver.update(session.game_board, session.last_result.changed)
+    while True:
+        hint = solver.hint()
+        if hint is None:
+            return
+        yield ("f" if hint.kind == "mine" else "c", hint.pos_x, hint.pos_y)
+        solver.update(session.game_board, session.last_result.changed)
+
+
+class SolverTestCase(unittest.TestCase):
+
+    def test_single_cell_rules(self):
+        """Un 1 dans un coin avec une seule voisine inconnue désigne une mine, puis ses voisines sûres"""
+        game_board = [["1 ", "1 ", "1 "],
+                      ["1 ", ". ", ". "],
+                      [". ", ". ", ". "]]
+        solver = Solver(3, 3)
+        solver.update(game_board)
+        self.assertEqual(solver.mines, {4})  # case (1, 1)
+        self.assertEqual(solver.safe, {5, 6, 7})
+
+    def test_pair_rule(self):
+        """Motif 1-2-1 contre un bord : seules les mines aux extrémités sont possibles"""
+        game_board = [["1 ", "2 ", "1 "],
+                      [". ", ". ", ". "]]
+        solver = Solver(3, 2)
+        solver.update(game_board)
+        self.assertEqual(solver.mines, {3, 5})
+        self.assertEqual(solver.safe, {4})
+
+    def test_deductions_are_correct(self):
+        """Sur des parties réelles, les déductions incrémentales ne se trompent jamais"""
+        for graine in range(10):
+            session = dm.GameSession(16, 16, 40, rng=random.Random(graine))
+            solver = Solver(16, 16, 40)
+            session.reveal(8, 8)
+            solver.update(session.game_board, session.last_result.changed)
+            while not session.over and (solver.safe or solver.mines):
+                mines = set(session.mines)
+                for idx in solver.safe:
+                    self.assertNotIn(divmod(idx, 16), mines)
+                for idx in solver.mines:
+                    self.assertIn(divmod(idx, 16), mines)
+                hint = solver.hint()
+                result = session.flag(hint.pos_x, hint.pos_y) if hint.kind == "mine" else session.reveal(hint.pos_x, hint.pos_y)
+                self.assertFalse(result.lost)
+                solver.update(session.game_board, result.changed)
+
+    def test_probabilities(self):
+        """Deux cases pour une mine : probabilité 1/2 chacune"""
+        game_board = [["1 ", ". "],
+                      ["1 ", ". "]]
+        solver = Solver(2, 2, 1)
+        solver.update(game_board)
+        probas, autre = solver.probabilities()
+        self.assertEqual(probas, {1: 0.5, 3: 0.5})
+        self.assertEqual(solver.hint().kind, "guess")
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
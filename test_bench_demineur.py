@@ -0,0 +1,136 @@
+"""
+Tests de performance des chemins chauds du démineur (pytest-benchmark)
+Utilisation : python test_bench_demineur.py --save base              (enregistre une référence JSON)
+              python test_bench_demineur.py --compare base --seuil 10 (échoue si un chemin ralentit de plus de 10 %)
+Sans pytest-benchmark, les tests sont ignorés par pytest.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import random
+import sys
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import demineur_modif as dm
+
+TAILLES = [10, 100, 500]  # Côtés des plateaux carrés mesurés
+DENSITES = [0.1, 0.5, 0.9]
+STOCKAGE = ".benchmarks"  # Dossier des références JSON
+SEUIL = 10  # Ralentissement toléré (en % entier de la moyenne) par défaut
+
+
+def _reference_board(cote:int, densite:float, compact:bool=False):
+    """
+    Plateau de reference avec mines, sans les comptes
+    """
+    board = dm.create_compact_board(cote, cote) if compact else dm.create_board(cote, cote, 0)
+    dm.place_mines(board, int(cote * cote * densite), 0, 0, rng=random.Random(cote))
+    return board
+
+
+def _copy(board):
+    if isinstance(board, dm.CompactBoard):
+        copie = dm.CompactBoard(board.n, board.m)
+        copie.cells[:] = board.cells
+        return copie
+    return [ligne[:] for ligne in board]
+
+
+@pytest.mark.parametrize("cote", TAILLES)
+def test_create_board(benchmark, cote):
+    board = benchmark(dm.create_board, cote, cote)
+    assert len(board) == cote
+
+
+@pytest.mark.parametrize("densite", DENSITES)
+@pytest.mark.parametrize("cote", TAILLES[1:])
+def test_place_mines(benchmark, cote, densite):
+    nbr_mines = int(cote * cote * densite)
+    rng = random.Random(0)
+    mines = benchmark.pedantic(dm.place_mines, setup=lambda: ((dm.create_board(cote, cote, 0), nbr_mines, 0, 0), {"rng": rng}),
+                               rounds=10)
+    assert len(mines) == nbr_mines
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["listes", "compact"])
+@pytest.mark.parametrize("cote", TAILLES)
+def test_fill_in_board(benchmark, cote, compact):
+    board = _reference_board(cote, 0.2, compact)
+    benchmark.pedantic(dm.fill_in_board, setup=lambda: ((_copy(board),), {}), rounds=10)
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["listes", "compact"])
+@pytest.mark.parametrize("cote", TAILLES)
+def test_propagate_click_open_board(benchmark, cote, compact):
+    """Pire cas : plateau sans mine, un seul clic dévoile toutes les cases"""
+    def setup():
+        if compact:
+            board = dm.create_compact_board(cote, cote)
+            return (board, board, cote // 2, cote // 2), {}
+        return (dm.create_board(cote, cote), dm.create_board(cote, cote, 0), cote // 2, cote // 2), {}
+
+    revealed = benchmark.pedantic(dm.propagate_click, setup=setup, rounds=5)
+    assert len(revealed) == cote * cote
+
+
+@pytest.mark.parametrize("cote", TAILLES)
+def test_check_win_full_scan(benchmark, cote):
+    """Parcours complet (sans compteurs) d'un plateau dévoilé hors mines"""
+    reference_board = _reference_board(cote, 0.2)
+    mines = [(x, y) for x in range(cote) for y in range(cote) if reference_board[x][y] == 'X ']
+    dm.fill_in_board(reference_board)
+    game_board = [[". " if case == 'X ' else f"{case} " for case in ligne] for ligne in reference_board]
+    assert benchmark(dm.check_win, game_board, reference_board, mines, 0)
+
+
+@pytest.mark.parametrize("cote", TAILLES)
+def test_print_board(benchmark, cote):
+    """Affichage complet, écrit dans un StringIO"""
+    game_board = dm.create_board(cote, cote)
+    sortie = io.StringIO()
+
+    def afficher():
+        sortie.seek(0)
+        sortie.truncate()
+        with contextlib.redirect_stdout(sortie):
+            dm.print_board(game_board)
+
+    benchmark(afficher)
+    assert sortie.getvalue().count("\n") >= cote
+
+
+def _reference_id(stockage:str, nom:str):
+    """
+    Renvoie le numéro (0001...) de la dernière référence enregistrée sous ce nom, que pytest-benchmark attend
+    """
+    chemins = sorted(glob.glob(os.path.join(stockage, "*", f"[0-9][0-9][0-9][0-9]_{nom}.json")), key=os.path.basename)
+    if not chemins:
+        raise SystemExit(f"Aucune référence {nom!r} dans {stockage}")
+    return os.path.basename(chemins[-1])[:4]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tests de performance du démineur (pytest-benchmark)")
+    parser.add_argument("--save", metavar="NOM", help="enregistre les mesures comme référence NOM")
+    parser.add_argument("--compare", metavar="NOM", nargs="?", const="", help="compare à la référence NOM (par défaut la dernière)")
+    parser.add_argument("--seuil", type=int, default=SEUIL, help="ralentissement toléré en %% entier de la moyenne (pytest-benchmark)")
+    parser.add_argument("--stockage", default=STOCKAGE, help="dossier des références JSON")
+    args, reste = parser.parse_known_args(argv)
+
+    options = [__file__, "--benchmark-only", f"--benchmark-storage={args.stockage}"]
+    if args.save:
+        options.append(f"--benchmark-save={args.save}")
+    if args.compare is not None:
+        options += [f"--benchmark-compare={_reference_id(args.stockage, args.compare)}" if args.compare else "--benchmark-compare",
+                    f"--benchmark-compare-fail=mean:{args.seuil}%"]
+    return pytest.main(options + reste)
+
+
+if __name__ == '__main__':
+    sys.exit(main())